@@ -1,5 +1,6 @@
 # context_processors.py
 from .models import FraseMotivacional
+from .utils import nombres_grupos
 import random
 
 def frase_del_dia(request):
@@ -20,10 +21,12 @@ def frase_del_dia(request):
 def grupo_usuario(request):
     if not request.user.is_authenticated:
         return {}
+    grupos = nombres_grupos(request.user)
     return {
-        'es_asociacion': request.user.groups.filter(name='Asociacion').exists(),
-        'es_administrador': request.user.groups.filter(name='Administrador').exists(),
-        'es_almacen': request.user.groups.filter(name='Almacen').exists(),
+        'es_asociacion': 'Asociacion' in grupos,
+        'es_administrador': 'Administrador' in grupos,
+        'es_almacen': 'Almacen' in grupos,
+        'grupos_usuario': sorted(grupos),
     }
 
 
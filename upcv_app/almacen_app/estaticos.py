@@ -0,0 +1,267 @@
+"""Publicación de archivos estáticos: solo los referenciados, con huella y precomprimidos."""
+import fnmatch
+import gzip
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+from pathlib import Path
+from urllib.parse import unquote
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+RE_STATIC_TAG = re.compile(r"""{%\s*static\s+['"]([^'"]+)['"]""")
+RE_CSS_URL = re.compile(r"""url\(\s*['"]?([^'")]+?)['"]?\s*\)|@import\s+['"]([^'"]+)['"]""")
+RE_HUELLA = re.compile(r"\.[0-9a-f]{12}\.")
+
+EXTENSIONES_COMPRIMIBLES = {
+    ".css", ".js", ".mjs", ".json", ".map", ".svg", ".html", ".txt", ".xml", ".ttf", ".otf", ".eot", ".ico",
+}
+TAMANO_MINIMO_COMPRESION = 512
+CACHE_INMUTABLE = "public, max-age=31536000, immutable"
+CACHE_SIN_HUELLA = "public, max-age=3600"
+
+
+def directorios_plantillas():
+    directorios = []
+    for motor in settings.TEMPLATES:
+        directorios.extend(Path(directorio) for directorio in motor.get("DIRS", []))
+        if motor.get("APP_DIRS"):
+            for app_config in apps.get_app_configs():
+                directorio = Path(app_config.path) / "templates"
+                if directorio.is_dir():
+                    directorios.append(directorio)
+    return directorios
+
+
+def referencias_en_plantillas():
+    """Rutas usadas con ``{% static %}`` en todas las plantillas del proyecto."""
+    referencias = set()
+    for directorio in directorios_plantillas():
+        for ruta in directorio.rglob("*"):
+            if not ruta.is_file() or ruta.suffix not in {".html", ".txt", ".xml"}:
+                continue
+            contenido = ruta.read_text(encoding="utf-8", errors="ignore")
+            for match in RE_STATIC_TAG.findall(contenido):
+                # ``icon-sprite.svg#stroke-home`` apunta al mismo archivo que ``icon-sprite.svg``.
+                referencias.add(match.split("?", 1)[0].split("#", 1)[0].strip().lstrip("/"))
+    return referencias
+
+
+def dependencias_css(ruta_relativa, contenido):
+    """Archivos estáticos a los que apunta una hoja de estilos mediante ``url()`` o ``@import``."""
+    dependencias = set()
+    base = posixpath.dirname(ruta_relativa)
+    for url, importada in RE_CSS_URL.findall(contenido):
+        destino = (url or importada).strip()
+        if not destino or destino.startswith(("data:", "#", "http:", "https:", "//")):
+            continue
+        destino = unquote(destino.split("?", 1)[0].split("#", 1)[0])
+        if destino.startswith("/"):
+            static_url = settings.STATIC_URL.lstrip("/")
+            destino = destino.lstrip("/")
+            if not destino.startswith(static_url):
+                continue
+            destino = destino[len(static_url):]
+        else:
+            destino = posixpath.normpath(posixpath.join(base, destino))
+        if not destino.startswith(".."):
+            dependencias.add(destino)
+    return dependencias
+
+
+def archivos_referenciados(buscadores):
+    """Cierre transitivo de las referencias de las plantillas sobre las hojas de estilo."""
+    pendientes = set(referencias_en_plantillas())
+    patrones = getattr(settings, "ESTATICOS_INCLUIR_SIEMPRE", [])
+    if patrones:
+        for buscador in buscadores:
+            for ruta, _storage in buscador.list([]):
+                ruta = ruta.replace(os.sep, "/")
+                if any(fnmatch.fnmatch(ruta, patron) for patron in patrones):
+                    pendientes.add(ruta)
+    encontrados = {}
+    while pendientes:
+        ruta = pendientes.pop()
+        if ruta in encontrados:
+            continue
+        absoluta = _buscar(buscadores, ruta)
+        if not absoluta:
+            continue
+        encontrados[ruta] = absoluta
+        if ruta.endswith(".css"):
+            contenido = Path(absoluta).read_text(encoding="utf-8", errors="ignore")
+            pendientes.update(dependencias_css(ruta, contenido) - encontrados.keys())
+    return encontrados
+
+
+def _buscar(buscadores, ruta):
+    for buscador in buscadores:
+        resultado = buscador.find(ruta)
+        if resultado:
+            return resultado
+    return None
+
+
+class ReferenciadosFinder(finders.BaseFinder):
+    """Envuelve los finders de Django; ``collectstatic`` solo recibe los archivos referenciados.
+
+    ``find`` no filtra nada, así que ``runserver`` sigue sirviendo todo el árbol en desarrollo.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.finders = [
+            finders.get_finder(ruta)
+            for ruta in getattr(
+                settings,
+                "ESTATICOS_FINDERS_BASE",
+                [
+                    "django.contrib.staticfiles.finders.FileSystemFinder",
+                    "django.contrib.staticfiles.finders.AppDirectoriesFinder",
+                ],
+            )
+        ]
+
+    def check(self, **kwargs):
+        errores = []
+        for finder in self.finders:
+            errores.extend(finder.check(**kwargs))
+        return errores
+
+    def find(self, path, find_all=False, **kwargs):
+        encontrados = []
+        for finder in self.finders:
+            resultado = finder.find(path, find_all=find_all, **kwargs)
+            if resultado and not find_all:
+                return resultado
+            if find_all:
+                encontrados.extend(resultado)
+        return encontrados
+
+    def list(self, ignore_patterns):
+        referenciados = set(archivos_referenciados(self.finders))
+        vistos = set()
+        for finder in self.finders:
+            for ruta, storage in finder.list(ignore_patterns):
+                ruta_posix = ruta.replace(os.sep, "/")
+                if ruta_posix in referenciados and ruta_posix not in vistos:
+                    vistos.add(ruta_posix)
+                    yield ruta, storage
+
+
+class EstaticosComprimidosStorage(ManifestStaticFilesStorage):
+    """Manifest con huellas en el nombre y hermanos ``.gz``/``.br`` para servir sin recomprimir."""
+
+    manifest_strict = False
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            # Referencias rotas dentro de hojas de estilo de terceros: se dejan como estaban.
+            if content is not None:
+                raise
+            return name
+
+    def stored_name(self, name):
+        if self.hash_key(self.clean_name(name.split("?", 1)[0].split("#", 1)[0])) not in self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        # El original y su copia con huella suelen ser idénticos: se comprime una sola vez.
+        comprimidos = {}
+        for nombre in list(paths) + list(self.hashed_files.values()):
+            self.comprimir(nombre, comprimidos)
+
+    def comprimir(self, nombre, comprimidos=None):
+        if posixpath.splitext(nombre)[1].lower() not in EXTENSIONES_COMPRIMIBLES or not self.exists(nombre):
+            return
+        with self.open(nombre) as archivo:
+            contenido = archivo.read()
+        if len(contenido) < TAMANO_MINIMO_COMPRESION:
+            return
+        clave = hashlib.sha256(contenido).digest()
+        variantes = (comprimidos or {}).get(clave)
+        if variantes is None:
+            variantes = {".gz": gzip.compress(contenido, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variantes[".br"] = brotli.compress(contenido, quality=11)
+            if comprimidos is not None:
+                comprimidos[clave] = variantes
+        for extension, comprimido in variantes.items():
+            if len(comprimido) >= len(contenido):
+                continue
+            destino = nombre + extension
+            if self.exists(destino):
+                self.delete(destino)
+            self.save(destino, ContentFile(comprimido))
+
+
+def codificaciones_aceptadas(request):
+    aceptadas = {}
+    for parte in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        codificacion, _, parametros = parte.strip().partition(";")
+        calidad = 1.0
+        if parametros.strip().startswith("q="):
+            try:
+                calidad = float(parametros.strip()[2:])
+            except ValueError:
+                calidad = 0.0
+        if codificacion:
+            aceptadas[codificacion.lower()] = calidad
+    return {codificacion for codificacion, calidad in aceptadas.items() if calidad > 0}
+
+
+def servir_estatico(request, path):
+    """Sirve ``STATIC_ROOT`` con caché de larga duración y negociación de ``Content-Encoding``.
+
+    Pensado para instalaciones sin proxy delante; con IIS o nginx sirviendo ``/static/`` no se usa.
+    """
+    path = posixpath.normpath(path).lstrip("/")
+    try:
+        ruta = Path(safe_join(settings.STATIC_ROOT, path))
+    except ValueError:
+        raise Http404
+    if not ruta.is_file():
+        raise Http404
+
+    aceptadas = codificaciones_aceptadas(request)
+    servida, codificacion = ruta, None
+    for nombre_codificacion, extension in (("br", ".br"), ("gzip", ".gz")):
+        hermana = ruta.with_name(ruta.name + extension)
+        if nombre_codificacion in aceptadas and hermana.is_file():
+            servida, codificacion = hermana, nombre_codificacion
+            break
+
+    estado = servida.stat()
+    if not was_modified_since(request.META.get("HTTP_IF_MODIFIED_SINCE"), estado.st_mtime):
+        response = HttpResponseNotModified()
+    else:
+        tipo, _ = mimetypes.guess_type(str(ruta))
+        response = FileResponse(servida.open("rb"), content_type=tipo or "application/octet-stream")
+        response["Content-Length"] = estado.st_size
+        if codificacion:
+            response["Content-Encoding"] = codificacion
+    response["Last-Modified"] = http_date(estado.st_mtime)
+    response["Vary"] = "Accept-Encoding"
+    response["Cache-Control"] = CACHE_INMUTABLE if RE_HUELLA.search(ruta.name) else CACHE_SIN_HUELLA
+    return response
@@ -114,9 +114,7 @@ class UserEditForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         self.fields['username'].required = False
         if self.instance and self.instance.pk:
-            groups = self.instance.groups.all()
-            if groups.exists():
-                self.fields['group'].initial = groups.first()
+            self.fields['group'].initial = self.instance.groups.first()
 
 
 class UserForm(forms.ModelForm):
@@ -1,6 +1,5 @@
 from django.db import transaction
 from decimal import Decimal
-import pandas as pd
 import math  # Para manejar NaN en floats
 from almacen_app.models import (
     form1h, Proveedor, Articulo, DetalleFactura, Categoria, UnidadDeMedida,
@@ -17,6 +16,8 @@ class Command(BaseCommand):
 
     @transaction.atomic
     def handle(self, *args, **kwargs):
+        import pandas as pd  # solo se carga al ejecutar la carga masiva
+
         archivo = kwargs['archivo_excel']
         df = pd.read_excel(archivo)
 
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from almacen_app.miniaturas import generar_variantes_instancia
+from almacen_app.models import Institucion, Perfil
+
+
+class Command(BaseCommand):
+    help = 'Genera las miniaturas faltantes de fotos de perfil y logotipos ya cargados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--forzar', action='store_true', help='Regenera también las variantes existentes')
+
+    def handle(self, *args, **options):
+        total = 0
+        for perfil in Perfil.objects.exclude(foto='').exclude(foto__isnull=True).iterator():
+            total += generar_variantes_instancia(perfil, forzar=options['forzar'])
+        for institucion in Institucion.objects.all():
+            total += generar_variantes_instancia(institucion, forzar=options['forzar'])
+        self.stdout.write(self.style.SUCCESS(f'{total} variantes verificadas o generadas.'))
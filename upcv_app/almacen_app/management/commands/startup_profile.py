@@ -0,0 +1,121 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Librerías pesadas que solo deben cargarse dentro de las vistas o comandos que las usan.
+MODULOS_PESADOS = ("weasyprint", "xhtml2pdf", "reportlab", "openpyxl", "pandas", "numpy", "pypdf")
+
+SCRIPT_ARRANQUE = """
+import json, os, sys, time
+inicio = time.perf_counter()
+import django
+django.setup()
+setup_ms = (time.perf_counter() - inicio) * 1000
+from django.urls import get_resolver
+get_resolver().url_patterns
+total_ms = (time.perf_counter() - inicio) * 1000
+
+def rss_kb():
+    try:
+        with open("/proc/self/status") as status:
+            for linea in status:
+                if linea.startswith("VmRSS:"):
+                    return int(linea.split()[1])
+    except OSError:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        return None
+
+print(json.dumps({
+    "setup_ms": setup_ms,
+    "total_ms": total_ms,
+    "rss_kb": rss_kb(),
+    "modulos": sorted(sys.modules),
+}))
+"""
+
+
+def parsear_importtime(salida):
+    """Convierte la salida de ``-X importtime`` en ``[{modulo, propio_us, acumulado_us, nivel}]``."""
+    registros = []
+    for linea in salida.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        try:
+            propio, acumulado, nombre = linea[len("import time:"):].split("|", 2)
+            registros.append(
+                {
+                    "modulo": nombre.strip(),
+                    "propio_us": int(propio),
+                    "acumulado_us": int(acumulado),
+                    "nivel": (len(nombre) - len(nombre.lstrip())) // 2,
+                }
+            )
+        except ValueError:
+            continue
+    return registros
+
+
+def perfilar_arranque(settings_module=None):
+    entorno = os.environ.copy()
+    entorno["DJANGO_SETTINGS_MODULE"] = settings_module or entorno.get("DJANGO_SETTINGS_MODULE") or settings.SETTINGS_MODULE
+    entorno["PYTHONPATH"] = os.pathsep.join(filter(None, [str(settings.BASE_DIR), entorno.get("PYTHONPATH")]))
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT_ARRANQUE],
+        capture_output=True,
+        text=True,
+        cwd=str(settings.BASE_DIR),
+        env=entorno,
+    )
+    if proceso.returncode != 0:
+        raise CommandError(f"No se pudo iniciar Django:\n{proceso.stderr[-2000:]}")
+    resultado = json.loads(proceso.stdout.strip().splitlines()[-1])
+    modulos = resultado.pop("modulos")
+    resultado["importaciones"] = parsear_importtime(proceso.stderr)
+    resultado["modulos_cargados"] = len(modulos)
+    resultado["pesados_cargados"] = sorted(
+        {nombre.split(".")[0] for nombre in modulos if nombre.split(".")[0] in MODULOS_PESADOS}
+    )
+    return resultado
+
+
+class Command(BaseCommand):
+    help = "Mide el costo de arranque de un worker: tiempo de importación por módulo y memoria residente"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=25, help="Cantidad de módulos a mostrar")
+        parser.add_argument("--json", type=str, help="Guarda el resultado completo en este archivo")
+
+    def handle(self, *args, **options):
+        resultado = perfilar_arranque()
+
+        self.stdout.write(f"django.setup(): {resultado['setup_ms']:.1f} ms")
+        self.stdout.write(f"setup + URLs:   {resultado['total_ms']:.1f} ms")
+        self.stdout.write(f"RSS:            {resultado['rss_kb']} KB")
+        self.stdout.write(f"Módulos:        {resultado['modulos_cargados']}")
+        self.stdout.write("")
+        self.stdout.write(f"{'acumulado ms':>12} {'propio ms':>10}  módulo")
+        importaciones = sorted(resultado["importaciones"], key=lambda registro: registro["acumulado_us"], reverse=True)
+        for registro in importaciones[: options["top"]]:
+            self.stdout.write(
+                f"{registro['acumulado_us'] / 1000:>12.1f} {registro['propio_us'] / 1000:>10.1f}  "
+                f"{'  ' * registro['nivel']}{registro['modulo']}"
+            )
+
+        if resultado["pesados_cargados"]:
+            self.stdout.write(
+                self.style.WARNING(f"Librerías pesadas cargadas al arrancar: {', '.join(resultado['pesados_cargados'])}")
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS("Ninguna librería pesada se carga al arrancar."))
+
+        if options["json"]:
+            with open(options["json"], "w", encoding="utf-8") as archivo:
+                json.dump(resultado, archivo, indent=2)
@@ -0,0 +1,130 @@
+"""Variantes redimensionadas de fotos de perfil y logotipos.
+
+Cada variante se guarda junto al original con un nombre determinista
+(``logos/escudo.png`` -> ``logos/escudo_png__logo_web.png``), de modo que basta con
+el nombre del archivo original para encontrarla o regenerarla. La extensión del
+original forma parte del nombre: ``escudo.jpg`` no reutiliza la variante de
+``escudo.png``.
+"""
+import logging
+import posixpath
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import Optional
+
+from django.core.files.base import ContentFile
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Variante:
+    ancho: int
+    alto: int
+    recortar: bool
+    formato: str
+
+
+VARIANTES = {
+    # Avatares: doble resolución de lo que se muestra (36 px en la barra, 120 px en la edición)
+    'avatar_sm': Variante(72, 72, True, 'JPEG'),
+    'avatar_md': Variante(240, 240, True, 'JPEG'),
+    # Logotipos: PNG para conservar la transparencia
+    'logo_web': Variante(480, 120, False, 'PNG'),
+    'logo_impresion': Variante(1200, 400, False, 'PNG'),
+}
+
+EXTENSIONES = {'JPEG': 'jpg', 'PNG': 'png'}
+
+# Qué variantes se generan al subir cada campo de imagen
+VARIANTES_POR_CAMPO = {
+    ('Perfil', 'foto'): ('avatar_sm', 'avatar_md'),
+    ('Institucion', 'logo'): ('logo_web', 'logo_impresion'),
+    ('Institucion', 'logo2'): ('logo_web', 'logo_impresion'),
+}
+
+
+def nombre_variante(nombre: str, variante: str) -> str:
+    base, extension = posixpath.splitext(nombre)
+    if extension:
+        base = f'{base}_{extension[1:].lower()}'
+    return f'{base}__{variante}.{EXTENSIONES[VARIANTES[variante].formato]}'
+
+
+def generar_variante(archivo, variante: str, forzar: bool = False) -> Optional[str]:
+    """Crea la variante si falta (o siempre con ``forzar``) y devuelve su nombre en el storage."""
+    if not archivo:
+        return None
+    from PIL import Image, ImageOps
+
+    definicion = VARIANTES[variante]
+    storage = archivo.storage
+    destino = nombre_variante(archivo.name, variante)
+    if not forzar and storage.exists(destino):
+        return destino
+    try:
+        with storage.open(archivo.name, 'rb') as original:
+            imagen = ImageOps.exif_transpose(Image.open(original))
+            imagen.load()
+    except (OSError, ValueError):
+        logger.warning('No se pudo leer la imagen %s para la variante %s.', archivo.name, variante)
+        return None
+
+    tamano = (definicion.ancho, definicion.alto)
+    if definicion.recortar:
+        imagen = ImageOps.fit(imagen, tamano, Image.Resampling.LANCZOS)
+    else:
+        imagen.thumbnail(tamano, Image.Resampling.LANCZOS)
+
+    salida = BytesIO()
+    if definicion.formato == 'JPEG':
+        if imagen.mode != 'RGB':
+            fondo = Image.new('RGB', imagen.size, 'white')
+            imagen = imagen.convert('RGBA')
+            fondo.paste(imagen, mask=imagen.getchannel('A'))
+            imagen = fondo
+        imagen.save(salida, format='JPEG', quality=85, optimize=True, progressive=True)
+    else:
+        if imagen.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+            imagen = imagen.convert('RGBA')
+        imagen.save(salida, format='PNG', optimize=True)
+
+    if storage.exists(destino):
+        storage.delete(destino)
+    return storage.save(destino, ContentFile(salida.getvalue()))
+
+
+def campos_con_imagen(instancia):
+    return [campo for modelo, campo in VARIANTES_POR_CAMPO if instancia.__class__.__name__ == modelo]
+
+
+def generar_variantes_instancia(instancia, forzar: bool = False, forzar_campos=()) -> int:
+    """Genera las variantes de cada campo de imagen; ``forzar_campos`` regenera solo esos campos."""
+    generadas = 0
+    for (modelo, campo), variantes in VARIANTES_POR_CAMPO.items():
+        if instancia.__class__.__name__ != modelo:
+            continue
+        archivo = getattr(instancia, campo)
+        for variante in variantes:
+            if generar_variante(archivo, variante, forzar=forzar or campo in forzar_campos):
+                generadas += 1
+    return generadas
+
+
+def url_miniatura(archivo, variante: str) -> str:
+    if not archivo:
+        return ''
+    nombre = generar_variante(archivo, variante)
+    return archivo.storage.url(nombre) if nombre else archivo.url
+
+
+def uri_miniatura(archivo, variante: str) -> str:
+    """Ruta ``file://`` de la variante, para que el motor PDF la lea del disco sin pasar por HTTP."""
+    if not archivo:
+        return ''
+    nombre = generar_variante(archivo, variante) or archivo.name
+    try:
+        return Path(archivo.storage.path(nombre)).as_uri()
+    except NotImplementedError:
+        return archivo.storage.url(nombre)
@@ -1,7 +1,25 @@
 # signals.py
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from django.db import IntegrityError
 
+from .miniaturas import campos_con_imagen, generar_variantes_instancia
+from .models import Institucion, Perfil
 
+
+@receiver(pre_save, sender=Perfil)
+@receiver(pre_save, sender=Institucion)
+def marcar_imagenes_nuevas(sender, instance, **kwargs):
+    # Un archivo recién subido aún no está en el storage; puede quedar con el nombre de uno anterior
+    instance._imagenes_nuevas = {
+        campo for campo in campos_con_imagen(instance)
+        if getattr(instance, campo) and not getattr(instance, campo)._committed
+    }
+
+
+@receiver(post_save, sender=Perfil)
+@receiver(post_save, sender=Institucion)
+def generar_miniaturas(sender, instance, **kwargs):
+    # Las variantes de un archivo ya existente no se vuelven a generar; las de uno recién subido, siempre
+    generar_variantes_instancia(instance, forzar_campos=getattr(instance, '_imagenes_nuevas', ()))
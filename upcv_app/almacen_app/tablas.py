@@ -0,0 +1,187 @@
+"""Listados paginados, ordenados y filtrados en el servidor con el protocolo de DataTables."""
+import json
+from dataclasses import dataclass
+from itertools import count
+from typing import Callable, Optional, Sequence
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils.html import conditional_escape, format_html
+
+LARGO_PREDETERMINADO = 25
+LARGO_MAXIMO = 100
+
+
+def si_no(valor) -> str:
+    return "Sí" if valor else "No"
+
+
+def _entero(valor, predeterminado: int) -> int:
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return predeterminado
+
+
+@dataclass(frozen=True)
+class Columna:
+    """Columna de una ``TablaServidor``.
+
+    ``campo`` es la ruta ORM con la que se ordena, se busca y se poda el SELECT; ``valor`` calcula la
+    celda a partir del objeto cuando no basta con el campo y ``buscar_en`` amplía la búsqueda a otros
+    campos. Las celdas se escapan salvo que ``valor`` devuelva HTML marcado como seguro (``format_html``).
+    """
+
+    titulo: str
+    campo: Optional[str] = None
+    ordenable: bool = True
+    buscable: bool = False
+    valor: Optional[Callable] = None
+    buscar_en: Sequence[str] = ()
+
+    @property
+    def es_ordenable(self) -> bool:
+        return self.ordenable and self.campo is not None
+
+    def celda(self, obj):
+        if self.valor is not None:
+            valor = self.valor(obj)
+        else:
+            valor = obj
+            for parte in self.campo.split("__"):
+                valor = getattr(valor, parte, None)
+        if valor is None:
+            return ""
+        if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            return valor
+        return conditional_escape(valor)
+
+
+class TablaServidor:
+    """Listado servido por páginas a un DataTables con ``serverSide: true``.
+
+    Las subclases declaran ``columnas`` y qué relaciones cargar; la vista pasa el queryset ya filtrado
+    por permisos. Solo se ordena y busca por los campos declarados en las columnas: los índices que
+    manda el navegador se traducen a esa lista y nunca se usan nombres de campo recibidos.
+    """
+
+    columnas: Sequence[Columna] = ()
+    select_related: Sequence[str] = ()
+    prefetch_related: Sequence[str] = ()
+    # Campos que leen los ``valor`` de las columnas además de los declarados en ``campo``.
+    campos_extra: Sequence[str] = ()
+    orden_inicial: Sequence[tuple] = ((0, "asc"),)
+    largo = LARGO_PREDETERMINADO
+    vacio = "No hay registros."
+
+    def __init__(self, queryset, identificador: str = "tabla"):
+        self.queryset = queryset
+        self.identificador = identificador
+
+    @staticmethod
+    def es_peticion(request) -> bool:
+        return "draw" in request.GET
+
+    @property
+    def orden_json(self) -> str:
+        return json.dumps([list(orden) for orden in self.orden_inicial])
+
+    def campos(self) -> list:
+        """Campos a cargar con ``only()``: los de las columnas, los extra y las relaciones de ``select_related``."""
+        modelo = self.queryset.model
+        # Las claves foráneas se cargan siempre: son baratas y los managers relacionados
+        # (``anio.asociaciones``) las leen en cada fila; diferidas causarían una consulta por fila.
+        campos = [campo.name for campo in modelo._meta.concrete_fields if campo.is_relation]
+        campos += [*self.select_related, *self.campos_extra]
+        for columna in self.columnas:
+            for campo in (columna.campo, *columna.buscar_en):
+                if campo is None:
+                    continue
+                try:
+                    modelo._meta.get_field(campo.split("__")[0])
+                except FieldDoesNotExist:
+                    continue
+                campos.append(campo)
+        return list(dict.fromkeys(campos))
+
+    def ordenar(self, queryset, parametros):
+        orden = []
+        for indice in count():
+            if f"order[{indice}][column]" not in parametros:
+                break
+            posicion = _entero(parametros[f"order[{indice}][column]"], -1)
+            if not 0 <= posicion < len(self.columnas) or not self.columnas[posicion].es_ordenable:
+                continue
+            signo = "-" if parametros.get(f"order[{indice}][dir]") == "desc" else ""
+            orden.append(f"{signo}{self.columnas[posicion].campo}")
+        if not orden:
+            orden = list(queryset.query.order_by or queryset.model._meta.ordering)
+        return queryset.order_by(*orden, "pk")
+
+    def buscar(self, queryset, texto: str):
+        """Cada palabra de ``texto`` debe aparecer en alguna columna buscable."""
+        campos = [
+            campo
+            for columna in self.columnas
+            if columna.buscable
+            for campo in (columna.buscar_en or [columna.campo])
+            if campo
+        ]
+        for palabra in texto.split():
+            condicion = Q()
+            for campo in campos:
+                condicion |= Q(**{f"{campo}__icontains": palabra})
+            queryset = queryset.filter(condicion)
+        return queryset
+
+    def fila(self, obj) -> list:
+        return [columna.celda(obj) for columna in self.columnas]
+
+    def datos(self, parametros) -> dict:
+        inicio = max(_entero(parametros.get("start"), 0), 0)
+        largo = _entero(parametros.get("length"), self.largo)
+        if not 0 < largo <= LARGO_MAXIMO:
+            largo = LARGO_MAXIMO
+
+        base = self.queryset.only(*self.campos())
+        if self.select_related:
+            base = base.select_related(*self.select_related)
+        total = base.count()
+        filtrado = base
+        texto = parametros.get("search[value]", "").strip()
+        if texto:
+            filtrado = self.buscar(base, texto)
+        filtrados = filtrado.count() if texto else total
+
+        pagina = self.ordenar(filtrado, parametros).prefetch_related(*self.prefetch_related)
+        pagina = pagina[inicio:inicio + largo]
+        return {
+            "draw": _entero(parametros.get("draw"), 0),
+            "recordsTotal": total,
+            "recordsFiltered": filtrados,
+            "data": [self.fila(obj) for obj in pagina],
+        }
+
+    def respuesta(self, request) -> JsonResponse:
+        return JsonResponse(self.datos(request.GET))
+
+
+class UsuariosTabla(TablaServidor):
+    columnas = (
+        Columna("ID", "id"),
+        Columna("Nombre de Usuario", "username", buscable=True),
+        Columna("Nombre", "first_name", buscable=True),
+        Columna("Apellido", "last_name", buscable=True),
+        Columna("Correo Electrónico", "email", buscable=True),
+        Columna("Grupo", valor=lambda user: ", ".join(grupo.name for grupo in user.groups.all())),
+        Columna(
+            "Acciones",
+            valor=lambda user: format_html(
+                '<a href="{}" class="btn btn-primary btn-sm">Editar</a>', reverse("almacen:user_edit", args=[user.id])
+            ),
+        ),
+    )
+    prefetch_related = ("groups",)
+    vacio = "No hay usuarios registrados."
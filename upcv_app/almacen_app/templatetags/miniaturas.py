@@ -0,0 +1,15 @@
+from django import template
+
+from almacen_app.miniaturas import uri_miniatura, url_miniatura
+
+register = template.Library()
+
+
+@register.filter(name='miniatura')
+def miniatura(archivo, variante):
+    return url_miniatura(archivo, variante)
+
+
+@register.filter(name='miniatura_pdf')
+def miniatura_pdf(archivo, variante):
+    return uri_miniatura(archivo, variante)
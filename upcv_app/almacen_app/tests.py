@@ -1,3 +1,278 @@
-from django.test import TestCase
+import gzip
+import shutil
+import tempfile
+from io import BytesIO
+from pathlib import Path
 
-# Create your tests here.
+from django.contrib.auth.models import Group, User
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .estaticos import (
+    ReferenciadosFinder,
+    brotli,
+    dependencias_css,
+    referencias_en_plantillas,
+    servir_estatico,
+)
+from .miniaturas import nombre_variante
+from .models import Institucion
+from .tablas import LARGO_MAXIMO, UsuariosTabla
+from .management.commands.startup_profile import parsear_importtime, perfilar_arranque
+
+
+class StartupProfileTests(SimpleTestCase):
+    def test_parsear_importtime(self):
+        salida = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     encodings.aliases\n"
+            "import time:       300 |        420 |   encodings\n"
+        )
+        registros = parsear_importtime(salida)
+        self.assertEqual(registros[1], {"modulo": "encodings", "propio_us": 300, "acumulado_us": 420, "nivel": 1})
+        self.assertEqual(registros[0]["nivel"], 2)
+
+    def test_arranque_no_carga_librerias_pesadas(self):
+        resultado = perfilar_arranque()
+        self.assertEqual(resultado["pesados_cargados"], [])
+        self.assertTrue(resultado["importaciones"])
+
+
+class EstaticosTests(SimpleTestCase):
+    def setUp(self):
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root, ignore_errors=True)
+        override = override_settings(STATIC_ROOT=self.static_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.contenido = b"body { color: red; }\n" * 100
+        css = Path(self.static_root) / "css"
+        css.mkdir()
+        (css / "app.0123456789ab.css").write_bytes(self.contenido)
+        (css / "app.0123456789ab.css.gz").write_bytes(gzip.compress(self.contenido))
+        (css / "app.css").write_bytes(self.contenido)
+
+    def test_referencias_incluyen_plantilla_base(self):
+        self.assertIn("assets/css/style.css", referencias_en_plantillas())
+
+    def test_dependencias_css_relativas_y_absolutas(self):
+        contenido = (
+            "@font-face { src: url('../fonts/icofont.woff?v=1#iefix'); }\n"
+            ".a { background: url(\"/static/images/fondo.png\"); }\n"
+            ".b { background: url(data:image/png;base64,AAAA); }\n"
+            "@import 'vendors/bootstrap.css';"
+        )
+        self.assertEqual(
+            dependencias_css("assets/css/style.css", contenido),
+            {"assets/fonts/icofont.woff", "images/fondo.png", "assets/css/vendors/bootstrap.css"},
+        )
+
+    def test_sirve_version_comprimida_con_cache_inmutable(self):
+        request = RequestFactory().get("/static/css/app.0123456789ab.css", HTTP_ACCEPT_ENCODING="br, gzip")
+        response = servir_estatico(request, "css/app.0123456789ab.css")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), self.contenido)
+
+    def test_sin_huella_ni_gzip_aceptado(self):
+        request = RequestFactory().get("/static/css/app.css", HTTP_ACCEPT_ENCODING="gzip;q=0")
+        response = servir_estatico(request, "css/app.css")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertNotIn("immutable", response["Cache-Control"])
+        self.assertEqual(b"".join(response.streaming_content), self.contenido)
+
+
+class CollectstaticTests(SimpleTestCase):
+    """``collectstatic`` completo sobre un árbol de estáticos y plantillas temporal."""
+
+    def setUp(self):
+        raiz = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, raiz, ignore_errors=True)
+        fuentes = raiz / "static"
+        plantillas = raiz / "templates"
+        self.static_root = raiz / "staticfiles"
+        for carpeta in ("css", "img", "json", "svg"):
+            (fuentes / carpeta).mkdir(parents=True)
+        plantillas.mkdir()
+        self.css = b".fondo { background: url('../img/fondo.png'); }\n" + b"body { color: red; }\n" * 50
+        (fuentes / "css" / "app.css").write_bytes(self.css)
+        (fuentes / "css" / "suelto.css").write_bytes(b"body { color: blue; }\n" * 50)
+        (fuentes / "img" / "fondo.png").write_bytes(imagen_de_prueba(4, 4))
+        (fuentes / "json" / "idioma.json").write_text('{"sSearch": "Buscar:"}')
+        (fuentes / "svg" / "sprite.svg").write_text("<svg></svg>")
+        (plantillas / "base.html").write_text(
+            "{% load static %}"
+            "<link rel=\"stylesheet\" href=\"{% static 'css/app.css' %}\">"
+            "<svg><use href=\"{% static 'svg/sprite.svg#stroke-home' %}\"></use></svg>"
+        )
+        override = override_settings(
+            STATIC_ROOT=str(self.static_root),
+            STATICFILES_DIRS=[str(fuentes)],
+            ESTATICOS_FINDERS_BASE=["django.contrib.staticfiles.finders.FileSystemFinder"],
+            ESTATICOS_INCLUIR_SIEMPRE=["json/*.json"],
+            TEMPLATES=[{"BACKEND": "django.template.backends.django.DjangoTemplates", "DIRS": [str(plantillas)]}],
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_finder_solo_lista_lo_referenciado(self):
+        rutas = {ruta for ruta, _storage in ReferenciadosFinder().list([])}
+        self.assertEqual(rutas, {"css/app.css", "img/fondo.png", "json/idioma.json", "svg/sprite.svg"})
+
+    def test_collectstatic_publica_con_huella_y_comprimidos(self):
+        call_command("collectstatic", interactive=False, verbosity=0)
+
+        publicado = staticfiles_storage.stored_name("css/app.css")
+        self.assertRegex(publicado, r"^css/app\.[0-9a-f]{12}\.css$")
+        self.assertTrue((self.static_root / publicado).is_file())
+        self.assertTrue((self.static_root / (publicado + ".gz")).is_file())
+        if brotli is not None:
+            self.assertTrue((self.static_root / (publicado + ".br")).is_file())
+        # La dependencia de la hoja de estilos se publica y la url() queda apuntando a su huella.
+        fondo = staticfiles_storage.stored_name("img/fondo.png")
+        self.assertNotEqual(fondo, "img/fondo.png")
+        self.assertIn(fondo.rsplit("/", 1)[-1], (self.static_root / publicado).read_text())
+        self.assertTrue((self.static_root / "json" / "idioma.json").is_file())
+        self.assertTrue((self.static_root / "svg" / "sprite.svg").is_file())
+        self.assertFalse((self.static_root / "css" / "suelto.css").exists())
+        self.assertFalse(list(self.static_root.glob("css/suelto.*")))
+
+
+def imagen_de_prueba(ancho, alto, formato="PNG", color=(200, 30, 30)):
+    from PIL import Image
+
+    salida = BytesIO()
+    Image.new("RGBA" if formato == "PNG" else "RGB", (ancho, alto), color).save(salida, format=formato)
+    return salida.getvalue()
+
+
+class MiniaturasTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def crear_institucion(self):
+        return Institucion.objects.create(
+            nombre="UPCV",
+            direccion="Zona 1",
+            telefono="22222222",
+            logo=SimpleUploadedFile("escudo.png", imagen_de_prueba(2400, 1200), content_type="image/png"),
+        )
+
+    def test_subir_logo_genera_variantes_reducidas(self):
+        from PIL import Image
+
+        institucion = self.crear_institucion()
+        storage = institucion.logo.storage
+        for variante, limite in (("logo_web", (480, 120)), ("logo_impresion", (1200, 400))):
+            nombre = nombre_variante(institucion.logo.name, variante)
+            self.assertTrue(storage.exists(nombre))
+            with storage.open(nombre) as archivo:
+                tamano = Image.open(archivo).size
+            self.assertLessEqual(tamano[0], limite[0])
+            self.assertLessEqual(tamano[1], limite[1])
+        self.assertLess(storage.size(nombre_variante(institucion.logo.name, "logo_web")), storage.size(institucion.logo.name))
+
+    def test_filtro_regenera_variante_faltante(self):
+        institucion = self.crear_institucion()
+        nombre = nombre_variante(institucion.logo.name, "logo_web")
+        institucion.logo.storage.delete(nombre)
+        html = Template("{% load miniaturas %}{{ logo|miniatura:'logo_web' }}").render(Context({"logo": institucion.logo}))
+        self.assertTrue(html.endswith("__logo_web.png"))
+        self.assertTrue(institucion.logo.storage.exists(nombre))
+
+    def color_avatar(self, perfil):
+        from PIL import Image
+
+        with perfil.foto.storage.open(nombre_variante(perfil.foto.name, "avatar_sm")) as archivo:
+            return Image.open(archivo).convert("RGB").getpixel((0, 0))
+
+    def test_reemplazar_foto_regenera_la_variante(self):
+        perfil = User.objects.create_user(username="ana").perfil
+        perfil.foto = SimpleUploadedFile("foto.png", imagen_de_prueba(300, 300), content_type="image/png")
+        perfil.save()
+        anterior = nombre_variante(perfil.foto.name, "avatar_sm")
+
+        perfil.foto = SimpleUploadedFile("foto.jpg", imagen_de_prueba(300, 300, "JPEG", (20, 20, 220)), content_type="image/jpeg")
+        perfil.save()
+        self.assertNotEqual(nombre_variante(perfil.foto.name, "avatar_sm"), anterior)
+        self.assertGreater(self.color_avatar(perfil)[2], 200)
+
+        # Mismo nombre que el archivo borrado: la variante vieja no se reutiliza.
+        perfil.foto.delete(save=False)
+        perfil.foto = SimpleUploadedFile("foto.jpg", imagen_de_prueba(300, 300, "JPEG", (20, 220, 20)), content_type="image/jpeg")
+        perfil.save()
+        self.assertTrue(perfil.foto.name.endswith("/foto.jpg"))
+        self.assertGreater(self.color_avatar(perfil)[1], 200)
+
+    def test_filtro_sin_archivo_devuelve_cadena_vacia(self):
+        html = Template("{% load miniaturas %}{{ logo|miniatura:'logo_web' }}").render(Context({"logo": None}))
+        self.assertEqual(html, "")
+
+
+class TablaServidorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username="admin", first_name="Ana", last_name="Zapata")
+        cls.admin.groups.add(Group.objects.create(name="Administrador"))
+        for numero in range(12):
+            User.objects.create_user(
+                username=f"usuario{numero:02d}",
+                first_name="Luis" if numero % 2 else "Marta",
+                last_name="Pérez" if numero < 6 else "<b>Gómez</b>",
+            )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def pedir(self, **parametros):
+        response = self.client.get(reverse("almacen:user_create"), {"draw": "4", **parametros})
+        self.assertEqual(response["Content-Type"], "application/json")
+        return response.json()
+
+    def test_pagina_y_ordena_por_varias_columnas(self):
+        datos = self.pedir(**{
+            "start": 2, "length": 3,
+            "order[0][column]": 2, "order[0][dir]": "desc",
+            "order[1][column]": 1, "order[1][dir]": "asc",
+        })
+        esperados = list(User.objects.order_by("-first_name", "username").values_list("username", flat=True)[2:5])
+        self.assertEqual(datos["draw"], 4)
+        self.assertEqual((datos["recordsTotal"], datos["recordsFiltered"]), (13, 13))
+        self.assertEqual([fila[1] for fila in datos["data"]], esperados)
+
+    def test_busca_cada_palabra_en_las_columnas_buscables(self):
+        datos = self.pedir(**{"search[value]": "luis pérez", "length": 50})
+        self.assertEqual(datos["recordsFiltered"], 3)
+        self.assertEqual({fila[1] for fila in datos["data"]}, {"usuario01", "usuario03", "usuario05"})
+        self.assertEqual(self.pedir(**{"search[value]": "Administrador"})["recordsFiltered"], 0)
+
+    def test_ignora_columnas_no_permitidas_y_limita_el_largo(self):
+        datos = self.pedir(**{"order[0][column]": 5, "order[1][column]": 99, "order[2][column]": "x"})
+        self.assertEqual([fila[0] for fila in datos["data"]], sorted(User.objects.values_list("pk", flat=True)))
+
+        User.objects.bulk_create([User(username=f"masivo{numero}") for numero in range(LARGO_MAXIMO)])
+        for largo in ("-1", str(LARGO_MAXIMO * 10)):
+            datos = UsuariosTabla(User.objects.all()).datos({"draw": "1", "length": largo})
+            self.assertEqual(len(datos["data"]), LARGO_MAXIMO)
+            self.assertEqual(datos["recordsTotal"], LARGO_MAXIMO + 13)
+
+    def test_escapa_celdas_y_renderiza_acciones(self):
+        fila = self.pedir(**{"search[value]": "usuario11"})["data"][0]
+        self.assertEqual(fila[3], "&lt;b&gt;Gómez&lt;/b&gt;")
+        self.assertIn(reverse("almacen:user_edit", args=[User.objects.get(username="usuario11").pk]), fila[6])
+
+    def test_la_pagina_no_incluye_filas(self):
+        response = self.client.get(reverse("almacen:user_create"))
+        self.assertContains(response, "data-tabla-servidor")
+        self.assertNotContains(response, "usuario11")
+        self.assertContains(response, "jquery.dataTables.min.js")
@@ -31,12 +31,23 @@ def reservar_lineas(cantidad, form1h_instance):
     return lineas_reservadas
 
 
-def grupo_requerido(*nombres_grupos):
+def nombres_grupos(user):
+    """Nombres de los grupos del usuario, consultados una sola vez por request."""
+    if not user.is_authenticated:
+        return frozenset()
+    nombres = getattr(user, '_nombres_grupos', None)
+    if nombres is None:
+        nombres = frozenset(user.groups.values_list('name', flat=True))
+        user._nombres_grupos = nombres
+    return nombres
+
+
+def grupo_requerido(*nombres_grupos_permitidos):
     def decorador(view_func):
         @wraps(view_func)
         def _wrapped_view(request, *args, **kwargs):
             if request.user.is_authenticated and (
-                request.user.groups.filter(name__in=nombres_grupos).exists() or request.user.is_superuser
+                nombres_grupos(request.user).intersection(nombres_grupos_permitidos) or request.user.is_superuser
             ):
                 return view_func(request, *args, **kwargs)
             # Redirigir a la vista de acceso denegado
@@ -29,6 +29,8 @@ from django.contrib import messages
 import json
 from django.contrib.auth.models import Group
 from .utils import grupo_requerido
+from .tablas import UsuariosTabla
+from asociaciones_app.analitica import resumen_revisiones
 from django.views.decorators.http import require_GET
 from django.db.models.functions import Coalesce
 from django.db import transaction
@@ -38,23 +40,15 @@ from django.shortcuts import render
 from django.template.loader import render_to_string
 from django.template.loader import get_template
 from django.http import HttpResponse
-from xhtml2pdf import pisa
-from weasyprint import HTML
 from django.db.models.functions import Cast, TruncWeek
 from django.utils import timezone
 from datetime import timedelta
-from reportlab.lib.pagesizes import landscape, letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
 import datetime
 from django.core.mail import send_mail
 from django.conf import settings
 from django.utils.html import strip_tags
 from decimal import Decimal
 from datetime import datetime  
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Alignment, Font
 import re
 
 
@@ -106,12 +100,17 @@ def user_create(request):
     else:
         form = UserCreateForm()
 
-    users = User.objects.all()
-    return render(request, 'almacen/user_form_create.html', {'form': form, 'users': users})
+    tabla = UsuariosTabla(User.objects.all(), 'tabla-usuarios')
+    if tabla.es_peticion(request):
+        return tabla.respuesta(request)
+    return render(request, 'almacen/user_form_create.html', {'form': form, 'tabla': tabla})
 
 @login_required
 @grupo_requerido('Administrador', 'Almacen')
 def user_edit(request, user_id):
+    tabla = UsuariosTabla(User.objects.all(), 'tabla-usuarios')
+    if tabla.es_peticion(request):
+        return tabla.respuesta(request)
     user = get_object_or_404(User, pk=user_id)
     try:
         perfil = user.perfil
@@ -144,7 +143,7 @@ def user_edit(request, user_id):
     context = {
         'form': form_user,
         'perfil_form': form_perfil,
-        'users': User.objects.all(),
+        'tabla': tabla,
     }
     return render(request, 'almacen/user_form_edit.html', context)
 
@@ -190,9 +189,8 @@ import json
 @login_required
 @grupo_requerido('Administrador', 'Almacen')
 def dahsboard(request):
-  
-
-    return render(request, 'almacen/dashboard.html')
+    # Solo lee el resumen de ciclos; lo mantiene al día la tarea programada actualizar_ciclos_revision.
+    return render(request, 'almacen/dashboard.html', resumen_revisiones())
 
 
 
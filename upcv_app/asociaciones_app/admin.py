@@ -1,24 +1,68 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 
+from .apertura import abrir_anio
 from .models import (
     Anio,
     Asociacion,
     AsociacionUsuario,
+    AvanceCicloRevision,
+    CicloRevision,
     ExpedienteCAIMUS,
     ItemChecklistCAIMUS,
     ExpedienteEstadoHistorial,
     InformeEstadoHistorial,
     InformeMensual,
     ResolucionExpediente,
+    ResumenAsociacion,
 )
+from .revision import aprobar_expedientes
 
 
-admin.site.register(Anio)
 admin.site.register(Asociacion)
 admin.site.register(AsociacionUsuario)
-admin.site.register(ExpedienteCAIMUS)
 admin.site.register(ItemChecklistCAIMUS)
 admin.site.register(ExpedienteEstadoHistorial)
 admin.site.register(InformeMensual)
 admin.site.register(InformeEstadoHistorial)
 admin.site.register(ResolucionExpediente)
+admin.site.register(CicloRevision)
+admin.site.register(AvanceCicloRevision)
+admin.site.register(ResumenAsociacion)
+
+
+@admin.register(ExpedienteCAIMUS)
+class ExpedienteCAIMUSAdmin(admin.ModelAdmin):
+    list_display = ("asociacion", "estado", "actualizado_en")
+    list_filter = ("estado", "asociacion__anio")
+    actions = ["aprobar"]
+
+    @admin.action(description="Aprobar y emitir resolución")
+    def aprobar(self, request, queryset):
+        try:
+            resultados = aprobar_expedientes(queryset.values_list("pk", flat=True), request.user)
+        except ValueError as exc:
+            self.message_user(request, str(exc), messages.ERROR)
+            return
+        aprobados = sum(resultado.aplicado for resultado in resultados)
+        self.message_user(request, f"{aprobados} de {len(resultados)} expedientes aprobados.", messages.SUCCESS)
+
+
+@admin.register(Anio)
+class AnioAdmin(admin.ModelAdmin):
+    list_display = ("anio", "activo")
+    actions = ["abrir_siguiente"]
+
+    @admin.action(description="Abrir el año siguiente con sus asociaciones")
+    def abrir_siguiente(self, request, queryset):
+        for anio in queryset.order_by("anio"):
+            try:
+                totales = abrir_anio(anio.anio, anio.anio + 1, request.user)
+            except ValueError as exc:
+                self.message_user(request, str(exc), messages.ERROR)
+                continue
+            self.message_user(
+                request,
+                f"Año {anio.anio + 1}: {totales['asociaciones']} asociaciones y {totales['asignaciones']} asignaciones "
+                f"copiadas ({totales['omitidas']} ya existían).",
+                messages.SUCCESS,
+            )
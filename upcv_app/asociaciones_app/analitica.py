@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, Min, Q, Window
+from django.db.models.functions import Lag, TruncWeek
+from django.utils import timezone
+
+from .models import (
+    AvanceCicloRevision,
+    CicloRevision,
+    ExpedienteEstadoHistorial,
+    InformeEstadoHistorial,
+    InformeMensual,
+)
+
+# Expedientes e informes comparten los nombres de estado.
+EN_REVISION = InformeMensual.ESTADO_EN_REVISION
+APROBADO = InformeMensual.ESTADO_APROBADO
+RECHAZADO = InformeMensual.ESTADO_RECHAZADO
+DECISIONES = (APROBADO, RECHAZADO)
+
+FUENTES = {
+    CicloRevision.TIPO_EXPEDIENTE: (ExpedienteEstadoHistorial, "expediente_id"),
+    CicloRevision.TIPO_INFORME: (InformeEstadoHistorial, "informe_id"),
+}
+# Filas del historial (por rango de id) que se procesan en cada vuelta.
+LOTE = 5000
+# Antigüedad mínima del historial que se procesa. Los ids se asignan al insertar, no al confirmar:
+# una transacción abierta puede confirmar después una fila con id menor que el último visible, y
+# el avance ya la habría dejado atrás. Solo una transacción más larga que el margen puede perderse;
+# ``actualizar_ciclos_revision --reconstruir`` la recupera.
+MARGEN = timedelta(minutes=10)
+SEMANAS_RENDIMIENTO = 12
+
+
+def _transiciones(historial, campo: str, desde: int, hasta: int):
+    """Entradas y salidas de ``EN_REVISION`` con ids en ``(desde, hasta]``, en orden.
+
+    ``LAG`` sobre el mismo objeto trae la transición anterior del lote: para una salida, su entrada;
+    para una entrada, la decisión previa y quién la tomó.
+    """
+    anterior = {"partition_by": [F(campo)], "order_by": F("id").asc()}
+    return (
+        historial.objects.filter(id__gt=desde, id__lte=hasta)
+        .filter(Q(estado_nuevo=EN_REVISION) | Q(estado_anterior=EN_REVISION))
+        .exclude(estado_nuevo=F("estado_anterior"))
+        .annotate(
+            objeto_id=F(campo),
+            previo_id=Window(Lag("id"), **anterior),
+            previo_estado=Window(Lag("estado_nuevo"), **anterior),
+            previo_por=Window(Lag("cambiado_por_id"), **anterior),
+        )
+        .order_by("id")
+        .values("id", "objeto_id", "estado_nuevo", "cambiado_por_id", "cambiado_en", "previo_id", "previo_estado", "previo_por")
+    )
+
+
+def _aplicar(tipo: str, filas: List[dict]) -> None:
+    """Abre un ciclo por cada entrada a revisión y cierra el ciclo abierto con cada salida."""
+    sin_previo = {fila["objeto_id"] for fila in filas if fila["previo_id"] is None}
+    pendientes = CicloRevision.objects.filter(tipo=tipo, objeto_id__in=sin_previo)
+    abiertos = {ciclo.objeto_id: ciclo for ciclo in pendientes.filter(salida__isnull=True)}
+    # Último revisor de cada objeto, heredado por su siguiente entrada a revisión.
+    revisores = dict(
+        pendientes.filter(salida__isnull=False).order_by("id").values_list("objeto_id", "revisor_id")
+    )
+
+    nuevos: Dict[int, CicloRevision] = {}
+    cerrados: List[CicloRevision] = []
+    for fila in filas:
+        objeto_id = fila["objeto_id"]
+        if fila["estado_nuevo"] == EN_REVISION:
+            revisor_id = fila["previo_por"] if fila["previo_id"] is not None else revisores.get(objeto_id)
+            nuevos[fila["id"]] = CicloRevision(
+                tipo=tipo,
+                objeto_id=objeto_id,
+                historial_id=fila["id"],
+                entrada=fila["cambiado_en"],
+                revisor_id=revisor_id,
+            )
+            continue
+
+        if fila["previo_estado"] == EN_REVISION:
+            ciclo = nuevos[fila["previo_id"]]
+        elif objeto_id in abiertos:
+            ciclo = abiertos.pop(objeto_id)
+            cerrados.append(ciclo)
+        else:
+            # La entrada a revisión no quedó en el historial: se cuenta la decisión sin duración.
+            ciclo = nuevos.setdefault(-fila["id"], CicloRevision(tipo=tipo, objeto_id=objeto_id))
+        ciclo.salida = fila["cambiado_en"]
+        ciclo.resultado = fila["estado_nuevo"]
+        ciclo.revisor_id = fila["cambiado_por_id"]
+        if ciclo.entrada is not None:
+            ciclo.segundos = max(int((ciclo.salida - ciclo.entrada).total_seconds()), 0)
+
+    CicloRevision.objects.bulk_create(nuevos.values())
+    CicloRevision.objects.bulk_update(cerrados, ["salida", "resultado", "revisor", "segundos"])
+
+
+def _actualizar_tipo(tipo: str, limite: datetime) -> int:
+    historial, campo = FUENTES[tipo]
+    with transaction.atomic():
+        AvanceCicloRevision.objects.get_or_create(tipo=tipo)
+        avance = AvanceCicloRevision.objects.select_for_update().get(tipo=tipo)
+        desde = avance.ultimo_historial_id
+        ultimo = (
+            historial.objects.filter(cambiado_en__lte=limite).order_by("-id").values_list("id", flat=True).first() or 0
+        )
+        while desde < ultimo:
+            hasta = min(desde + LOTE, ultimo)
+            _aplicar(tipo, list(_transiciones(historial, campo, desde, hasta)))
+            desde = hasta
+        procesadas = desde - avance.ultimo_historial_id
+        if procesadas:
+            avance.ultimo_historial_id = desde
+            avance.save(update_fields=["ultimo_historial_id", "actualizado_en"])
+    return procesadas
+
+
+def actualizar_ciclos() -> int:
+    """Incorpora a ``CicloRevision`` el historial posterior al último id procesado de cada tipo.
+
+    Solo toma filas con más de ``MARGEN`` de antigüedad. Lo ejecuta ``actualizar_ciclos_revision``
+    como tarea programada; el tablero solo lee el resumen. Devuelve cuántos ids del historial se
+    recorrieron.
+    """
+    limite = timezone.now() - MARGEN
+    avances = dict(AvanceCicloRevision.objects.values_list("tipo", "ultimo_historial_id"))
+    procesadas = 0
+    for tipo, (historial, _campo) in FUENTES.items():
+        nuevas = historial.objects.filter(id__gt=avances.get(tipo, 0), cambiado_en__lte=limite)
+        if nuevas.exists():
+            procesadas += _actualizar_tipo(tipo, limite)
+    return procesadas
+
+
+def reconstruir_ciclos() -> int:
+    """Borra el resumen y lo recalcula desde el inicio del historial."""
+    with transaction.atomic():
+        CicloRevision.objects.all().delete()
+        AvanceCicloRevision.objects.all().delete()
+        return actualizar_ciclos()
+
+
+def _horas(segundos) -> float | None:
+    return round(segundos / 3600, 1) if segundos is not None else None
+
+
+def resumen_revisiones(semanas: int = SEMANAS_RENDIMIENTO) -> Dict[str, object]:
+    """Indicadores del tablero, calculados solo sobre ``CicloRevision``."""
+    etiquetas = dict(CicloRevision.TIPOS)
+    por_tipo = []
+    for fila in (
+        CicloRevision.objects.values("tipo")
+        .annotate(
+            decididos=Count("id", filter=Q(resultado__in=DECISIONES)),
+            rechazados=Count("id", filter=Q(resultado=RECHAZADO)),
+            pendientes=Count("id", filter=Q(salida__isnull=True)),
+            segundos_promedio=Avg("segundos", filter=Q(resultado__in=DECISIONES)),
+        )
+        .order_by("tipo")
+    ):
+        por_tipo.append(
+            {
+                "tipo": etiquetas[fila["tipo"]],
+                "decididos": fila["decididos"],
+                "rechazados": fila["rechazados"],
+                "pendientes": fila["pendientes"],
+                "tasa_rechazo": round(100 * fila["rechazados"] / fila["decididos"], 1) if fila["decididos"] else None,
+                "horas_promedio": _horas(fila["segundos_promedio"]),
+            }
+        )
+
+    desde = timezone.now() - timedelta(weeks=semanas)
+    por_semana = []
+    for fila in (
+        CicloRevision.objects.filter(resultado__in=DECISIONES, salida__gte=desde)
+        .annotate(semana=TruncWeek("salida"))
+        .values("semana")
+        .annotate(
+            aprobados=Count("id", filter=Q(resultado=APROBADO)),
+            rechazados=Count("id", filter=Q(resultado=RECHAZADO)),
+            segundos_promedio=Avg("segundos"),
+        )
+        .order_by("-semana")
+    ):
+        por_semana.append(
+            {
+                "semana": fila["semana"],
+                "aprobados": fila["aprobados"],
+                "rechazados": fila["rechazados"],
+                "total": fila["aprobados"] + fila["rechazados"],
+                "horas_promedio": _horas(fila["segundos_promedio"]),
+            }
+        )
+
+    ahora = timezone.now()
+    pendientes = []
+    for fila in (
+        CicloRevision.objects.filter(salida__isnull=True)
+        .values("revisor__username", "revisor__first_name", "revisor__last_name")
+        .annotate(
+            expedientes=Count("id", filter=Q(tipo=CicloRevision.TIPO_EXPEDIENTE)),
+            informes=Count("id", filter=Q(tipo=CicloRevision.TIPO_INFORME)),
+            mas_antiguo=Min("entrada"),
+        )
+        .order_by("-expedientes", "-informes", "revisor__username")
+    ):
+        nombre = f"{fila['revisor__first_name']} {fila['revisor__last_name']}".strip()
+        pendientes.append(
+            {
+                "revisor": nombre or fila["revisor__username"] or "Sin asignar",
+                "expedientes": fila["expedientes"],
+                "informes": fila["informes"],
+                "total": fila["expedientes"] + fila["informes"],
+                "dias_espera": (ahora - fila["mas_antiguo"]).days if fila["mas_antiguo"] else None,
+            }
+        )
+
+    return {"por_tipo": por_tipo, "por_semana": por_semana, "pendientes": pendientes}
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .matriz import invalidar_matriz
+from .models import (
+    CHECKLIST_ITEMS,
+    MESES_CHOICES,
+    Anio,
+    Asociacion,
+    AsociacionUsuario,
+    ExpedienteCAIMUS,
+    InformeMensual,
+    ItemChecklistCAIMUS,
+)
+from .resumenes import reconstruir_resumenes
+
+
+def abrir_anio(
+    origen: int,
+    destino: int,
+    usuario: Optional[User] = None,
+    simular: bool = False,
+    lote: int = 1000,
+) -> Dict[str, int]:
+    """Copia al año ``destino`` las asociaciones activas de ``origen`` con sus asignaciones activas.
+
+    Cada asociación nueva recibe su expediente vacío con los items del checklist y los doce informes
+    mensuales, así nadie espera a que se creen en la primera visita. Todo se inserta con ``bulk_create``
+    en una transacción. Las asociaciones cuyo código ya existe en ``destino`` se omiten, de modo que
+    repetir la apertura no duplica nada; tampoco se copia la asignación de un usuario que ya tiene
+    una activa en ``destino``. Con ``simular`` solo se cuentan las filas, sin escribir.
+    """
+    if origen == destino:
+        raise ValueError("El año de destino debe ser distinto del de origen.")
+    anio_origen = Anio.objects.filter(anio=origen).first()
+    if anio_origen is None:
+        raise ValueError(f"No existe el año {origen}.")
+
+    with transaction.atomic():
+        # Bloquea el año de destino para que dos aperturas simultáneas no copien lo mismo.
+        anio_destino = Anio.objects.select_for_update().filter(anio=destino).first()
+        activas = Asociacion.objects.filter(anio=anio_origen, activo=True)
+        asignados = []
+        if anio_destino is not None:
+            activas = activas.exclude(codigo__in=anio_destino.asociaciones.values("codigo"))
+            asignados = AsociacionUsuario.objects.filter(asociacion__anio=anio_destino, activo=True).values("usuario_id")
+        asociaciones = list(activas.order_by("nombre", "id").values("id", "nombre", "codigo"))
+
+        # Un usuario queda con una sola asignación activa por año: la más reciente del año de origen.
+        asignaciones = {}
+        for fila in (
+            AsociacionUsuario.objects.filter(asociacion__in=activas, activo=True)
+            .exclude(usuario_id__in=asignados)
+            .order_by("-creado_en", "-id")
+            .values("asociacion_id", "usuario_id", "rol_en_asociacion")
+        ):
+            asignaciones.setdefault(fila["usuario_id"], fila)
+
+        totales = {
+            "asociaciones": len(asociaciones),
+            "omitidas": Asociacion.objects.filter(anio=anio_origen, activo=True).count() - len(asociaciones),
+            "asignaciones": len(asignaciones),
+            "expedientes": len(asociaciones),
+            "items": len(asociaciones) * len(CHECKLIST_ITEMS),
+            "informes": len(asociaciones) * len(MESES_CHOICES),
+        }
+        if simular or not asociaciones:
+            return totales
+
+        if anio_destino is None:
+            anio_destino = Anio.objects.create(anio=destino)
+        nuevas = Asociacion.objects.bulk_create(
+            [Asociacion(anio=anio_destino, nombre=fila["nombre"], codigo=fila["codigo"]) for fila in asociaciones],
+            batch_size=lote,
+        )
+        por_origen = {fila["id"]: nueva for fila, nueva in zip(asociaciones, nuevas)}
+        AsociacionUsuario.objects.bulk_create(
+            [
+                AsociacionUsuario(
+                    asociacion=por_origen[fila["asociacion_id"]],
+                    usuario_id=fila["usuario_id"],
+                    rol_en_asociacion=fila["rol_en_asociacion"],
+                )
+                for fila in asignaciones.values()
+            ],
+            batch_size=lote,
+        )
+        expedientes = ExpedienteCAIMUS.objects.bulk_create(
+            [ExpedienteCAIMUS(asociacion=asociacion, creado_por=usuario, actualizado_por=usuario) for asociacion in nuevas],
+            batch_size=lote,
+        )
+        ItemChecklistCAIMUS.objects.bulk_create(
+            (
+                ItemChecklistCAIMUS(
+                    expediente=expediente,
+                    numero=definicion.numero,
+                    seccion=definicion.seccion,
+                    titulo=definicion.titulo,
+                    hint=definicion.hint,
+                )
+                for expediente in expedientes
+                for definicion in CHECKLIST_ITEMS
+            ),
+            batch_size=lote,
+        )
+        InformeMensual.objects.bulk_create(
+            (
+                InformeMensual(asociacion=asociacion, mes=mes, creado_por=usuario, actualizado_por=usuario)
+                for asociacion in nuevas
+                for mes, _label in MESES_CHOICES
+            ),
+            batch_size=lote,
+        )
+        # ``bulk_create`` no envía ``post_save``: ni resúmenes ni matriz se enteran solos.
+        invalidar_matriz(anio_destino.pk)
+        reconstruir_resumenes(anio_destino.pk)
+    return totales
@@ -4,3 +4,35 @@ from django.apps import AppConfig
 class AsociacionesAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "asociaciones_app"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from . import resumenes
+        from .matriz import invalidar_por_asociacion, invalidar_por_informe
+        from .models import (
+            Asociacion,
+            ExpedienteEstadoHistorial,
+            InformeEstadoHistorial,
+            InformeMensual,
+            ItemChecklistCAIMUS,
+        )
+
+        # La matriz de cumplimiento en caché se invalida al cambiar cualquier informe o asociación del año.
+        for nombre, senal in (("guardar", post_save), ("borrar", post_delete)):
+            senal.connect(invalidar_por_informe, sender=InformeMensual, dispatch_uid=f"matriz_informe_{nombre}")
+            senal.connect(invalidar_por_asociacion, sender=Asociacion, dispatch_uid=f"matriz_asociacion_{nombre}")
+
+        # El resumen de cada asociación se recalcula en la misma transacción que el cambio.
+        post_save.connect(resumenes.crear_resumen, sender=Asociacion, dispatch_uid="resumen_asociacion_crear")
+        for nombre, senal in (("guardar", post_save), ("borrar", post_delete)):
+            senal.connect(resumenes.por_item, sender=ItemChecklistCAIMUS, dispatch_uid=f"resumen_item_{nombre}")
+            senal.connect(resumenes.por_informe, sender=InformeMensual, dispatch_uid=f"resumen_informe_{nombre}")
+        post_save.connect(
+            resumenes.por_historial_informe, sender=InformeEstadoHistorial, dispatch_uid="resumen_historial_informe"
+        )
+        post_save.connect(
+            resumenes.por_historial_expediente,
+            sender=ExpedienteEstadoHistorial,
+            dispatch_uid="resumen_historial_expediente",
+        )
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional
+
+from django import forms
+from django.contrib.auth import get_user_model
+from django.db.models import Q, QuerySet
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from .models import Anio, Asociacion, AsociacionUsuario
+
+LIMITE_RESULTADOS = 20
+
+
+def etiqueta_usuario(usuario) -> str:
+    nombre = usuario.get_full_name()
+    return f"{nombre} ({usuario.username})" if nombre else usuario.username
+
+
+def etiqueta_asociacion(asociacion: Asociacion) -> str:
+    return f"{asociacion.nombre} ({asociacion.anio.anio})"
+
+
+def filtrar_prefijos(queryset: QuerySet, termino: str, campos: Iterable[str]) -> QuerySet:
+    """Cada palabra de ``termino`` debe ser prefijo de alguno de ``campos``.
+
+    ``istartswith`` (``UPPER(campo) LIKE 'ABC%'``) aprovecha en PostgreSQL los índices por prefijo de la
+    migración 0008; un ``icontains`` obligaría a recorrer la tabla completa.
+    """
+    for palabra in termino.split():
+        condicion = Q()
+        for campo in campos:
+            condicion |= Q(**{f"{campo}__istartswith": palabra})
+        queryset = queryset.filter(condicion)
+    return queryset
+
+
+def buscar_usuarios(termino: str, anio_id: Optional[int] = None) -> QuerySet:
+    """Usuarios cuyo usuario, nombre o apellido empieza por ``termino``.
+
+    Con ``anio_id`` omite a quienes ya tienen una asignación activa ese año: ``AsociacionUsuario.clean``
+    no permite una segunda.
+    """
+    usuarios = get_user_model().objects.only("username", "first_name", "last_name").order_by("username")
+    if anio_id:
+        asignados = AsociacionUsuario.objects.filter(asociacion__anio_id=anio_id, activo=True).values("usuario_id")
+        usuarios = usuarios.exclude(pk__in=asignados)
+    return filtrar_prefijos(usuarios, termino, ("username", "first_name", "last_name"))
+
+
+def buscar_asociaciones(termino: str, anio_id: Optional[int] = None) -> QuerySet:
+    asociaciones = Asociacion.objects.select_related("anio").only("nombre", "anio", "anio__anio")
+    if anio_id:
+        asociaciones = asociaciones.filter(anio_id=anio_id)
+    return filtrar_prefijos(asociaciones, termino, ("nombre", "codigo"))
+
+
+def buscar_anios(termino: str) -> QuerySet:
+    anios = Anio.objects.all()
+    if termino.strip():
+        anios = anios.filter(anio__startswith=termino.strip())
+    return anios
+
+
+def resultados(queryset: QuerySet, etiqueta, pagina: int) -> Dict[str, object]:
+    """Página ``pagina`` en el formato que espera select2: ``{"results": [...], "pagination": {"more": ...}}``."""
+    inicio = (pagina - 1) * LIMITE_RESULTADOS
+    objetos = list(queryset[inicio:inicio + LIMITE_RESULTADOS + 1])
+    return {
+        "results": [{"id": obj.pk, "text": etiqueta(obj)} for obj in objetos[:LIMITE_RESULTADOS]],
+        "pagination": {"more": len(objetos) > LIMITE_RESULTADOS},
+    }
+
+
+class SelectAutocompletar(forms.Select):
+    """``<select>`` que solo incluye la opción elegida; las demás las busca select2 en ``url``.
+
+    El campo sigue validando por llave primaria contra su queryset, así que el formulario no cambia.
+    """
+
+    def __init__(self, url: str, parametros: Optional[Dict[str, object]] = None, attrs=None):
+        super().__init__(attrs={"class": "form-select", **(attrs or {})})
+        self.url = url
+        self.parametros = parametros or {}
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        url = reverse(self.url)
+        if self.parametros:
+            url = f"{url}?{urlencode(self.parametros)}"
+        context["widget"]["attrs"]["data-autocompletar"] = url
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        opciones: List[dict] = []
+        if self.choices.field.empty_label is not None:
+            opciones.append(self.create_option(name, "", self.choices.field.empty_label, False, 0))
+        seleccionados = [valor for valor in value if str(valor).isdigit()]
+        if seleccionados:
+            campo = self.choices.field
+            for obj in self.choices.queryset.filter(pk__in=seleccionados):
+                opciones.append(self.create_option(name, obj.pk, campo.label_from_instance(obj), True, len(opciones)))
+        return [(None, opciones, 0)]
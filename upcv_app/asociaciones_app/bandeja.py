@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, Q, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import ExpedienteCAIMUS, InformeMensual, ItemChecklistCAIMUS
+
+TAMANO_PAGINA = 25
+TAMANO_PAGINA_MAXIMO = 100
+
+# Columnas ordenables de la bandeja. Todas terminan en "id" para que el orden sea total y el cursor
+# identifique una sola fila; el orden por defecto es el del índice expediente_bandeja_idx.
+ORDENES = {
+    "estado": (("estado", False), ("actualizado_en", True), ("id", True)),
+    "-estado": (("estado", True), ("actualizado_en", True), ("id", True)),
+    "actualizado": (("actualizado_en", False), ("id", False)),
+    "-actualizado": (("actualizado_en", True), ("id", True)),
+    "asociacion": (("asociacion__nombre", False), ("id", False)),
+    "-asociacion": (("asociacion__nombre", True), ("id", True)),
+}
+ORDEN_PREDETERMINADO = "estado"
+
+# Informes en revisión para la revisión masiva, agrupados por asociación.
+ORDEN_INFORMES_REVISION = (("asociacion__nombre", False), ("asociacion_id", False), ("mes", False), ("id", False))
+
+# Orden de "Mis asociaciones": el año más reciente primero.
+ORDEN_ASOCIACIONES = (("anio__anio", True), ("nombre", False), ("id", False))
+TAMANO_PAGINA_ASOCIACIONES = 24
+
+
+def _contar(queryset: QuerySet, campo: str) -> Coalesce:
+    """Subconsulta correlacionada ``COUNT(*)`` agrupada por ``campo``; 0 si no hay filas."""
+    conteo = queryset.order_by().values(campo).annotate(total=Count("pk")).values("total")
+    return Coalesce(Subquery(conteo, output_field=IntegerField()), Value(0))
+
+
+def informes_en_revision():
+    return InformeMensual.objects.filter(
+        asociacion_id=OuterRef("asociacion_id"), estado=InformeMensual.ESTADO_EN_REVISION
+    )
+
+
+def expedientes_bandeja(anio_id=None, estado=None, con_pendientes=False) -> QuerySet:
+    """Expedientes de la bandeja con su avance y los informes pendientes de la asociación en la misma consulta."""
+    expedientes = ExpedienteCAIMUS.objects.select_related("asociacion", "asociacion__anio").annotate(
+        items_total=_contar(ItemChecklistCAIMUS.objects.filter(expediente_id=OuterRef("pk")), "expediente_id"),
+        items_entregados=_contar(
+            ItemChecklistCAIMUS.objects.filter(expediente_id=OuterRef("pk"), entregado=True), "expediente_id"
+        ),
+        informes_pendientes=_contar(informes_en_revision(), "asociacion_id"),
+    )
+    if estado:
+        expedientes = expedientes.filter(estado=estado)
+    if anio_id:
+        expedientes = expedientes.filter(asociacion__anio_id=anio_id)
+    if con_pendientes:
+        expedientes = expedientes.filter(
+            Q(estado=ExpedienteCAIMUS.ESTADO_EN_REVISION) | Exists(informes_en_revision())
+        )
+    return expedientes
+
+
+def asociaciones_con_resumen(asociaciones: QuerySet) -> QuerySet:
+    """Asociaciones con su año, el estado del expediente y los conteos de ``ResumenAsociacion``.
+
+    Todo sale de la misma consulta por LEFT JOIN. Cada estado de informe queda en
+    ``informes_<estado en minúsculas>``.
+    """
+    campos = ["items_total", "items_entregados", "rechazos"]
+    campos += [f"informes_{estado.lower()}" for estado, _etiqueta in InformeMensual.ESTADOS]
+    return asociaciones.select_related("anio").annotate(
+        expediente_id=F("expediente_caimus__id"),
+        estado_expediente=F("expediente_caimus__estado"),
+        ultima_entrega=F("resumen__ultima_entrega"),
+        **{campo: Coalesce(F(f"resumen__{campo}"), Value(0)) for campo in campos},
+    )
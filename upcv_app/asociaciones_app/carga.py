@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import http.cookiejar
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import close_old_connections, connection
+from django.test import Client
+from django.urls import resolve, reverse
+
+from .management.commands.benchmark_resolucion_pdf import percentil
+from .models import ExpedienteCAIMUS
+from .semillas import PASSWORD_SEMILLA, pdf_ficticio
+
+USUARIO_ADMIN_CARGA = "semilla-admin"
+
+
+@dataclass
+class Medicion:
+    url_name: str
+    duracion_ms: float
+    estado: int
+
+
+@dataclass
+class Registro:
+    """Mediciones compartidas por todos los hilos de una corrida."""
+
+    mediciones: List[Medicion] = field(default_factory=list)
+    bloqueo: threading.Lock = field(default_factory=threading.Lock)
+
+    def agregar(self, medicion: Medicion) -> None:
+        with self.bloqueo:
+            self.mediciones.append(medicion)
+
+
+class ClientePrueba:
+    """Recorre las vistas en proceso con ``django.test.Client``.
+
+    Con SQLite las solicitudes de los distintos hilos se atienden de a una: la base admite un solo
+    escritor y, en memoria (la de las pruebas), una tabla bloqueada falla al instante en lugar de esperar.
+    Los flujos siguen corriendo intercalados en sus hilos.
+    """
+
+    bloqueo_sqlite = threading.Lock()
+
+    def __init__(self, registro: Registro):
+        self.registro = registro
+        # Fuera del runner de pruebas "testserver" no está en ALLOWED_HOSTS.
+        hosts = [host for host in settings.ALLOWED_HOSTS if host not in ("*", "") and not host.startswith(".")]
+        self.client = Client(HTTP_HOST=hosts[0] if hosts else "localhost")
+
+    def login(self, username: str, password: str) -> None:
+        self._medir("post", reverse("almacen:signin"), {"username": username, "password": password})
+
+    def get(self, path: str, params: Optional[dict] = None) -> int:
+        return self._medir("get", path, params or {})
+
+    def post(self, path: str, datos: dict, archivos: Optional[dict] = None) -> int:
+        datos = dict(datos)
+        for nombre, (nombre_archivo, contenido, tipo) in (archivos or {}).items():
+            datos[nombre] = SimpleUploadedFile(nombre_archivo, contenido, content_type=tipo)
+        return self._medir("post", path, datos)
+
+    def _medir(self, metodo: str, path: str, datos: dict) -> int:
+        with self.bloqueo_sqlite if connection.vendor == "sqlite" else nullcontext():
+            inicio = time.perf_counter()
+            response = getattr(self.client, metodo)(path, datos)
+            duracion = (time.perf_counter() - inicio) * 1000
+            close_old_connections()
+        self.registro.agregar(Medicion(resolve(path).view_name, duracion, response.status_code))
+        return response.status_code
+
+
+class ClienteHTTP:
+    """Recorre las vistas contra un servidor real, con sesión y token CSRF propios."""
+
+    def __init__(self, registro: Registro, base_url: str):
+        self.registro = registro
+        self.base_url = base_url.rstrip("/")
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+
+    def login(self, username: str, password: str) -> None:
+        path = reverse("almacen:signin")
+        self.get(path)
+        self.post(path, {"username": username, "password": password})
+
+    def get(self, path: str, params: Optional[dict] = None) -> int:
+        url = self.base_url + path
+        if params:
+            url += "?" + urllib.parse.urlencode(params)
+        return self._medir(path, urllib.request.Request(url))
+
+    def post(self, path: str, datos: dict, archivos: Optional[dict] = None) -> int:
+        datos = {**datos, "csrfmiddlewaretoken": self._csrf()}
+        if archivos:
+            cuerpo, tipo = self._multipart(datos, archivos)
+        else:
+            cuerpo, tipo = urllib.parse.urlencode(datos).encode(), "application/x-www-form-urlencoded"
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=cuerpo,
+            headers={"Content-Type": tipo, "Referer": self.base_url + path, "X-CSRFToken": datos["csrfmiddlewaretoken"]},
+        )
+        return self._medir(path, request)
+
+    def _csrf(self) -> str:
+        for cookie in self.cookies:
+            if cookie.name == "csrftoken":
+                return cookie.value
+        return ""
+
+    @staticmethod
+    def _multipart(datos: dict, archivos: dict) -> tuple:
+        limite = uuid.uuid4().hex
+        partes = []
+        for nombre, valor in datos.items():
+            partes.append(
+                f'--{limite}\r\nContent-Disposition: form-data; name="{nombre}"\r\n\r\n{valor}\r\n'.encode()
+            )
+        for nombre, (nombre_archivo, contenido, tipo) in archivos.items():
+            partes.append(
+                (
+                    f'--{limite}\r\nContent-Disposition: form-data; name="{nombre}"; filename="{nombre_archivo}"\r\n'
+                    f"Content-Type: {tipo}\r\n\r\n"
+                ).encode()
+                + contenido
+                + b"\r\n"
+            )
+        partes.append(f"--{limite}--\r\n".encode())
+        return b"".join(partes), f"multipart/form-data; boundary={limite}"
+
+    def _medir(self, path: str, request: urllib.request.Request) -> int:
+        inicio = time.perf_counter()
+        try:
+            with self.opener.open(request) as response:
+                response.read()
+                estado = response.status
+        except urllib.error.HTTPError as exc:
+            estado = exc.code
+        except urllib.error.URLError:
+            estado = 0
+        duracion = (time.perf_counter() - inicio) * 1000
+        self.registro.agregar(Medicion(resolve(path.split("?", 1)[0]).view_name, duracion, estado))
+        return estado
+
+
+def flujo_asociacion(cliente, username: str, expediente: ExpedienteCAIMUS, items: List[int], rng: random.Random, pdf: bytes) -> None:
+    cliente.login(username, PASSWORD_SEMILLA)
+    cliente.get(reverse("asociaciones:mis_asociaciones"))
+    cliente.get(reverse("asociaciones:expediente_caimus", args=[expediente.asociacion_id]))
+    item_id = rng.choice(items)
+    cliente.post(
+        reverse("asociaciones:item_upload", args=[expediente.pk, item_id]),
+        {},
+        {"pdf": ("documento.pdf", pdf, "application/pdf")},
+    )
+    cliente.post(
+        reverse("asociaciones:item_observacion", args=[expediente.pk, rng.choice(items)]),
+        {"observaciones": f"Observación de carga {rng.randint(1, 10_000)}"},
+    )
+    cliente.get(reverse("asociaciones:expediente_caimus", args=[expediente.asociacion_id]))
+    cliente.get(reverse("asociaciones:informes_mensuales", args=[expediente.asociacion_id]))
+
+
+def flujo_admin(cliente, username: str, expedientes: List[int], rng: random.Random) -> None:
+    cliente.login(username, PASSWORD_SEMILLA)
+    cliente.get(reverse("asociaciones:bandeja_revision"))
+    cliente.get(reverse("asociaciones:bandeja_revision"), {"estado": ExpedienteCAIMUS.ESTADO_EN_REVISION})
+    for pk in rng.sample(expedientes, min(3, len(expedientes))):
+        cliente.get(reverse("asociaciones:expediente_revision", args=[pk]))
+
+
+def preparar_admin() -> str:
+    grupo, _ = Group.objects.get_or_create(name="Administrador")
+    admin, creado = User.objects.get_or_create(username=USUARIO_ADMIN_CARGA)
+    if creado or not admin.check_password(PASSWORD_SEMILLA):
+        admin.set_password(PASSWORD_SEMILLA)
+        admin.save()
+    admin.groups.add(grupo)
+    return admin.username
+
+
+def ejecutar_carga(
+    usuarios_asociacion: int = 10,
+    admins: int = 2,
+    iteraciones: int = 3,
+    base_url: Optional[str] = None,
+    semilla: int = 0,
+    tamano_pdf: int = 50 * 1024,
+    hilos: Optional[int] = None,
+) -> Dict[str, object]:
+    """Corre los flujos de asociación y de revisión en hilos concurrentes y resume las latencias.
+
+    Los usuarios de asociación son los generados por ``seed_caimus``; sin ``base_url`` se usa el
+    cliente de pruebas de Django en este mismo proceso. ``hilos`` limita cuántos usuarios corren a la
+    vez (por defecto, todos).
+    """
+    expedientes = list(
+        ExpedienteCAIMUS.objects.filter(
+            asociacion__usuarios__usuario__username__startswith="semilla-",
+            asociacion__usuarios__activo=True,
+        )
+        .select_related("asociacion")
+        .prefetch_related("asociacion__usuarios__usuario", "items")
+        .order_by("pk")
+        .distinct()[: usuarios_asociacion]
+    )
+    if not expedientes:
+        raise ValueError("No hay datos sintéticos; ejecute primero seed_caimus.")
+    ids_revision = list(ExpedienteCAIMUS.objects.order_by("pk").values_list("pk", flat=True)[:500])
+    admin = preparar_admin()
+    pdf = pdf_ficticio(tamano_pdf, "Prueba de carga")
+
+    trabajos = []
+    for expediente in expedientes:
+        asignacion = next(a for a in expediente.asociacion.usuarios.all() if a.usuario.username.startswith("semilla-"))
+        items = [item.pk for item in expediente.items.all()]
+        trabajos.append((flujo_asociacion, (asignacion.usuario.username, expediente, items)))
+    trabajos += [(flujo_admin, (admin, ids_revision))] * admins
+
+    registro = Registro()
+
+    def simular(indice: int, flujo, argumentos) -> None:
+        rng_usuario = random.Random(f"{semilla}-{indice}")
+        cliente = ClienteHTTP(registro, base_url) if base_url else ClientePrueba(registro)
+        try:
+            for _ in range(iteraciones):
+                if flujo is flujo_asociacion:
+                    flujo(cliente, *argumentos, rng_usuario, pdf)
+                else:
+                    flujo(cliente, *argumentos, rng_usuario)
+        finally:
+            close_old_connections()
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos or len(trabajos)) as executor:
+        futuros = [executor.submit(simular, indice, *trabajo) for indice, trabajo in enumerate(trabajos)]
+        for futuro in futuros:
+            futuro.result()
+    duracion = time.perf_counter() - inicio
+
+    por_url: Dict[str, List[Medicion]] = defaultdict(list)
+    for medicion in registro.mediciones:
+        por_url[medicion.url_name].append(medicion)
+    resultados = {}
+    for url_name, mediciones in sorted(por_url.items()):
+        tiempos = [medicion.duracion_ms for medicion in mediciones]
+        resultados[url_name] = {
+            "solicitudes": len(mediciones),
+            "errores": sum(1 for medicion in mediciones if medicion.estado == 0 or medicion.estado >= 400),
+            "rps": round(len(mediciones) / duracion, 2),
+            "media_ms": round(sum(tiempos) / len(tiempos), 2),
+            "p50_ms": round(percentil(tiempos, 50), 2),
+            "p95_ms": round(percentil(tiempos, 95), 2),
+            "p99_ms": round(percentil(tiempos, 99), 2),
+        }
+    return {
+        "configuracion": {
+            "usuarios_asociacion": len(expedientes),
+            "admins": admins,
+            "iteraciones": iteraciones,
+            "hilos": hilos or len(trabajos),
+            "modo": "http" if base_url else "cliente",
+            "semilla": semilla,
+        },
+        "duracion_s": round(duracion, 3),
+        "solicitudes": len(registro.mediciones),
+        "rps": round(len(registro.mediciones) / duracion, 2),
+        "resultados": resultados,
+    }
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from io import BytesIO
+from typing import List, Optional
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from .models import ExpedienteCAIMUS, ItemChecklistCAIMUS, ResolucionExpediente, calcular_sha256
+from .pdf import obtener_resolucion_pdf, renderizar_resolucion_html
+from .signals import pdf_generado
+from .tareas import encolar_tarea
+
+logger = logging.getLogger(__name__)
+
+
+def _items_con_pdf(expediente: ExpedienteCAIMUS) -> List[ItemChecklistCAIMUS]:
+    items = list(expediente.items.exclude(pdf="").exclude(pdf__isnull=True).order_by("numero"))
+    for item in items:
+        if not item.pdf_sha256:
+            try:
+                item.pdf_sha256 = calcular_sha256(item.pdf)
+            except FileNotFoundError:
+                continue
+            ItemChecklistCAIMUS.objects.filter(pk=item.pk).update(pdf_sha256=item.pdf_sha256)
+    return [item for item in items if item.pdf_sha256]
+
+
+def calcular_hash_dossier(
+    expediente: ExpedienteCAIMUS,
+    items: List[ItemChecklistCAIMUS],
+    resolucion: Optional[ResolucionExpediente],
+) -> str:
+    digest = hashlib.sha256()
+    for item in items:
+        digest.update(f"item:{item.numero}:{item.pdf_sha256}\n".encode())
+    if resolucion is not None:
+        html = renderizar_resolucion_html(expediente, resolucion)
+        digest.update(f"resolucion:{hashlib.sha256(html.encode('utf-8')).hexdigest()}\n".encode())
+    return digest.hexdigest()
+
+
+def generar_dossier(expediente_id: int) -> bool:
+    """Une la resolución y los PDF del checklist en un solo PDF con marcadores.
+
+    Devuelve ``False`` si el dossier vigente ya corresponde a los mismos archivos.
+    """
+    from pypdf import PdfWriter
+    from pypdf.errors import PdfReadError
+
+    expediente = ExpedienteCAIMUS.objects.select_related("asociacion", "asociacion__anio").get(pk=expediente_id)
+    resolucion = ResolucionExpediente.objects.filter(expediente=expediente).first()
+    items = _items_con_pdf(expediente)
+    dossier_hash = calcular_hash_dossier(expediente, items, resolucion)
+
+    if expediente.dossier_pdf and expediente.dossier_hash == dossier_hash:
+        if expediente.dossier_pdf.storage.exists(expediente.dossier_pdf.name):
+            return False
+
+    inicio = time.perf_counter()
+    writer = PdfWriter()
+    if resolucion is not None:
+        writer.append(
+            BytesIO(obtener_resolucion_pdf(expediente, resolucion)),
+            outline_item=f"Resolución {resolucion.correlativo}",
+        )
+    for item in items:
+        try:
+            with item.pdf.open("rb") as archivo:
+                writer.append(BytesIO(archivo.read()), outline_item=f"{item.numero}. {item.titulo}")
+        except (FileNotFoundError, PdfReadError):
+            logger.warning("No se pudo incluir el item %s del expediente %s en el dossier.", item.pk, expediente.pk)
+
+    salida = BytesIO()
+    writer.write(salida)
+    writer.close()
+    pdf_generado.send(
+        sender=ExpedienteCAIMUS, documento="dossier", motor="pypdf", duracion=time.perf_counter() - inicio
+    )
+
+    anterior = expediente.dossier_pdf.name if expediente.dossier_pdf else None
+    expediente.dossier_pdf.save(
+        f"Dossier-{expediente.asociacion.codigo}-{expediente.asociacion.anio.anio}.pdf",
+        ContentFile(salida.getvalue()),
+        save=False,
+    )
+    expediente.dossier_hash = dossier_hash
+    ExpedienteCAIMUS.objects.filter(pk=expediente.pk).update(
+        dossier_pdf=expediente.dossier_pdf.name,
+        dossier_hash=dossier_hash,
+    )
+    if anterior and anterior != expediente.dossier_pdf.name:
+        expediente.dossier_pdf.storage.delete(anterior)
+    return True
+
+
+def programar_dossier(expediente: ExpedienteCAIMUS) -> None:
+    expediente_id = expediente.pk
+    transaction.on_commit(lambda: encolar_tarea(generar_dossier, expediente_id))
+
+
+def programar_dossieres(expediente_ids: List[int]) -> None:
+    """Encola al confirmar un dossier por expediente; si uno falla, los demás se generan igual."""
+    expediente_ids = list(expediente_ids)
+
+    def encolar() -> None:
+        for expediente_id in expediente_ids:
+            encolar_tarea(generar_dossier, expediente_id)
+
+    transaction.on_commit(encolar)
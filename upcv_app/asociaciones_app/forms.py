@@ -4,6 +4,7 @@ from django import forms
 from django.forms import inlineformset_factory
 from django.core.exceptions import ValidationError
 
+from .autocompletar import SelectAutocompletar, etiqueta_asociacion, etiqueta_usuario
 from .models import (
     Anio,
     Asociacion,
@@ -28,7 +29,7 @@ class AsociacionForm(forms.ModelForm):
         model = Asociacion
         fields = ["anio", "nombre", "codigo", "activo"]
         widgets = {
-            "anio": forms.Select(attrs={"class": "form-select"}),
+            "anio": SelectAutocompletar("asociaciones:autocompletar_anios"),
             "nombre": forms.TextInput(attrs={"class": "form-control"}),
             "codigo": forms.TextInput(attrs={"class": "form-control"}),
             "activo": forms.CheckboxInput(attrs={"class": "form-check-input"}),
@@ -40,12 +41,24 @@ class AsociacionUsuarioForm(forms.ModelForm):
         model = AsociacionUsuario
         fields = ["asociacion", "usuario", "rol_en_asociacion", "activo"]
         widgets = {
-            "asociacion": forms.Select(attrs={"class": "form-select"}),
-            "usuario": forms.Select(attrs={"class": "form-select"}),
+            "asociacion": SelectAutocompletar("asociaciones:autocompletar_asociaciones"),
+            "usuario": SelectAutocompletar("asociaciones:autocompletar_usuarios"),
             "rol_en_asociacion": forms.TextInput(attrs={"class": "form-control"}),
             "activo": forms.CheckboxInput(attrs={"class": "form-check-input"}),
         }
 
+    def __init__(self, *args, anio: Anio | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        asociaciones = Asociacion.objects.select_related("anio")
+        if anio is not None:
+            # Las búsquedas y la validación se limitan a las asociaciones del año.
+            asociaciones = asociaciones.filter(anio=anio)
+            self.fields["asociacion"].widget.parametros = {"anio": anio.pk}
+            self.fields["usuario"].widget.parametros = {"anio": anio.pk}
+        self.fields["asociacion"].queryset = asociaciones
+        self.fields["asociacion"].label_from_instance = etiqueta_asociacion
+        self.fields["usuario"].label_from_instance = etiqueta_usuario
+
 
 class ExpedienteCAIMUSForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from asociaciones_app.apertura import abrir_anio
+
+
+class Command(BaseCommand):
+    help = (
+        "Abre un año nuevo copiando las asociaciones y asignaciones activas de otro, con expedientes, "
+        "items e informes mensuales vacíos"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("origen", type=int, help="Año del que se copian las asociaciones (por ejemplo, 2025)")
+        parser.add_argument("destino", type=int, help="Año que se abre; se crea si no existe")
+        parser.add_argument("--simular", action="store_true", help="Solo cuenta las filas que se crearían")
+        parser.add_argument("--lote", type=int, default=1000, help="Filas por INSERT en bulk_create")
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        try:
+            totales = abrir_anio(options["origen"], options["destino"], simular=options["simular"], lote=options["lote"])
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        duracion = time.perf_counter() - inicio
+        for clave, cantidad in totales.items():
+            self.stdout.write(f"{clave:<14} {cantidad:>9}")
+        if options["simular"]:
+            self.stdout.write(self.style.WARNING("Simulación: no se guardó ningún cambio."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Año {options['destino']} abierto en {duracion:.1f} s."))
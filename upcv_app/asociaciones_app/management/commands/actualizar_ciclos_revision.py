@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from asociaciones_app.analitica import actualizar_ciclos, reconstruir_ciclos
+
+
+class Command(BaseCommand):
+    help = (
+        "Incorpora el historial de estados nuevo al resumen de ciclos de revisión del tablero. "
+        "Programarlo cada pocos minutos: el tablero solo lee el resumen"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reconstruir",
+            action="store_true",
+            help="Borra el resumen y lo recalcula desde el inicio del historial",
+        )
+
+    def handle(self, *args, **options):
+        procesadas = reconstruir_ciclos() if options["reconstruir"] else actualizar_ciclos()
+        self.stdout.write(self.style.SUCCESS(f"Historial procesado: {procesadas} ids."))
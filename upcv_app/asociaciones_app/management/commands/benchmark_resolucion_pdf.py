@@ -0,0 +1,237 @@
+import json
+import math
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.template import engines
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from asociaciones_app.models import (
+    CHECKLIST_ITEMS,
+    Anio,
+    Asociacion,
+    ExpedienteCAIMUS,
+    ResolucionExpediente,
+    crear_items_expediente,
+)
+from asociaciones_app.pdf import motores_disponibles, obtener_resolucion_pdf
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ESTADOS_CACHE = ("frio", "caliente", "archivo")
+METRICAS_COMPARADAS = ("p50_ms", "p95_ms", "pico_tracemalloc_kb")
+
+
+def percentil(valores, porcentaje):
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    indice = min(len(ordenados), max(1, math.ceil(porcentaje / 100 * len(ordenados)))) - 1
+    return ordenados[indice]
+
+
+def rss_maximo_kb():
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def comparar_con_linea_base(actual, base, umbral):
+    """Devuelve las métricas de ``actual`` que superan la línea base en más de ``umbral`` (fracción)."""
+    regresiones = []
+    for escenario, metricas in actual.items():
+        referencia = base.get(escenario)
+        if not referencia:
+            continue
+        for metrica in METRICAS_COMPARADAS:
+            valor_base = referencia.get(metrica)
+            valor = metricas.get(metrica)
+            if not valor_base or valor is None:
+                continue
+            if valor > valor_base * (1 + umbral):
+                regresiones.append(f"{escenario} {metrica}: {valor:.1f} > {valor_base:.1f} (+{umbral:.0%})")
+    return regresiones
+
+
+def limpiar_cache_plantillas():
+    for backend in engines.all():
+        engine = getattr(backend, "engine", None)
+        if engine is None:
+            continue
+        for loader in engine.template_loaders:
+            loader.reset()
+
+
+class Command(BaseCommand):
+    help = "Mide la generación del PDF de resolución por motor y estado de caché y la compara con una línea base JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iteraciones", type=int, default=20, help="Renders por motor y estado de caché")
+        parser.add_argument("--motores", nargs="+", help="Motores a medir (por defecto todos los disponibles)")
+        parser.add_argument("--baseline", type=str, help="Archivo JSON de línea base a comparar o crear")
+        parser.add_argument(
+            "--umbral",
+            type=float,
+            default=0.25,
+            help="Regresión tolerada sobre la línea base, como fracción (0.25 = 25%%)",
+        )
+        parser.add_argument("--actualizar", action="store_true", help="Sobrescribe la línea base con esta corrida")
+        parser.add_argument(
+            "--pico-max-kb",
+            type=float,
+            help="Pico de tracemalloc máximo por render (por defecto el techo de asociaciones:resolucion_pdf)",
+        )
+
+    def handle(self, *args, **options):
+        disponibles = motores_disponibles()
+        motores = options["motores"] or disponibles
+        faltantes = [motor for motor in motores if motor not in disponibles]
+        if faltantes:
+            raise CommandError(f"Motores no disponibles: {', '.join(faltantes)}")
+        if not motores:
+            raise CommandError("No hay motores PDF disponibles.")
+        iteraciones = options["iteraciones"]
+        if iteraciones < 1:
+            raise CommandError("--iteraciones debe ser mayor que cero.")
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            with transaction.atomic():
+                expediente, resolucion = self._sembrar_expediente()
+                resultados = {}
+                for motor in motores:
+                    for estado in ESTADOS_CACHE:
+                        clave = f"{motor}/{estado}"
+                        resultados[clave] = self._medir(expediente, resolucion, motor, estado, iteraciones)
+                        self._imprimir(clave, resultados[clave])
+                transaction.set_rollback(True)
+
+        self._verificar_techo_memoria(resultados, options)
+        self._procesar_linea_base(resultados, options)
+
+    def _verificar_techo_memoria(self, resultados, options):
+        techo = options["pico_max_kb"]
+        if techo is None:
+            techo = getattr(settings, "MONITOREO_MEMORIA_TECHOS_KB", {}).get("asociaciones:resolucion_pdf")
+        if not techo:
+            return
+        excedidos = [
+            f"{clave} pico_tracemalloc_kb: {metricas['pico_tracemalloc_kb']:.1f} > {techo:.1f}"
+            for clave, metricas in resultados.items()
+            if metricas["pico_tracemalloc_kb"] > techo
+        ]
+        if excedidos:
+            raise CommandError("Techo de memoria superado:\n" + "\n".join(excedidos))
+
+    def _sembrar_expediente(self):
+        siguiente_anio = (Anio.objects.aggregate(maximo=Max("anio"))["maximo"] or 2000) + 1
+        anio = Anio.objects.create(anio=siguiente_anio)
+        asociacion = Asociacion.objects.create(
+            anio=anio,
+            nombre="Asociación de Mujeres para el Desarrollo Integral Comunitario",
+            codigo="benchmark-resolucion",
+        )
+        expediente = ExpedienteCAIMUS.objects.create(
+            asociacion=asociacion,
+            institucion="Centro de Apoyo Integral para Mujeres Sobrevivientes de Violencia",
+            representante_legal="María Fernanda López Castillo",
+            obs_general="Expediente completo, documentos legibles y vigentes. " * 8,
+            recomendaciones="Mantener actualizada la solvencia fiscal y el RTU del representante legal. " * 6,
+            estado=ExpedienteCAIMUS.ESTADO_APROBADO,
+            aprobado_en=timezone.now(),
+        )
+        crear_items_expediente(expediente)
+        for item in expediente.items.all():
+            item.observaciones = f"Documento {item.numero} revisado; folios completos y firmas legibles. " * 3
+            item.pdf.name = f"caimus/{siguiente_anio}/documento_{item.numero}.pdf"
+            item.save()
+        resolucion = ResolucionExpediente.objects.create(
+            expediente=expediente,
+            correlativo=f"UPCV-CAIMUS-{siguiente_anio}-0001",
+            fecha_emision=date.today(),
+            contenido_snapshot={"asociacion": asociacion.nombre, "anio": siguiente_anio, "items": len(CHECKLIST_ITEMS)},
+        )
+        return expediente, resolucion
+
+    def _medir(self, expediente, resolucion, motor, estado, iteraciones):
+        if estado == "archivo":
+            obtener_resolucion_pdf(expediente, resolucion, motor=motor)
+
+        def preparar():
+            if estado == "frio":
+                limpiar_cache_plantillas()
+            if estado != "archivo":
+                resolucion.archivo_hash = ""
+
+        def renderizar():
+            return obtener_resolucion_pdf(expediente, resolucion, motor=motor)
+
+        if estado == "caliente":
+            renderizar()
+
+        tiempos = []
+        tamano = 0
+        for _ in range(iteraciones):
+            preparar()
+            inicio = time.perf_counter()
+            tamano = len(renderizar())
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+
+        preparar()
+        tracemalloc.start()
+        try:
+            renderizar()
+            _actual, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "iteraciones": iteraciones,
+            "media_ms": round(sum(tiempos) / len(tiempos), 2),
+            "p50_ms": round(percentil(tiempos, 50), 2),
+            "p95_ms": round(percentil(tiempos, 95), 2),
+            "p99_ms": round(percentil(tiempos, 99), 2),
+            "pico_tracemalloc_kb": round(pico / 1024, 1),
+            "rss_max_kb": rss_maximo_kb(),
+            "tamano_pdf_bytes": tamano,
+        }
+
+    def _imprimir(self, clave, metricas):
+        self.stdout.write(
+            f"{clave:<24} p50={metricas['p50_ms']:>9.2f}ms p95={metricas['p95_ms']:>9.2f}ms "
+            f"p99={metricas['p99_ms']:>9.2f}ms pico={metricas['pico_tracemalloc_kb']:>9.1f}KB "
+            f"rss_max={metricas['rss_max_kb']}KB"
+        )
+
+    def _procesar_linea_base(self, resultados, options):
+        ruta = options["baseline"]
+        if not ruta:
+            return
+        ruta = Path(ruta)
+        if ruta.exists() and not options["actualizar"]:
+            base = json.loads(ruta.read_text(encoding="utf-8"))
+            regresiones = comparar_con_linea_base(resultados, base.get("resultados", {}), options["umbral"])
+            if regresiones:
+                raise CommandError("Regresión de rendimiento:\n" + "\n".join(regresiones))
+            self.stdout.write(self.style.SUCCESS(f"Sin regresiones respecto a {ruta}."))
+            return
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        ruta.write_text(
+            json.dumps(
+                {"generado_en": timezone.now().isoformat(), "resultados": resultados},
+                indent=2,
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+        self.stdout.write(self.style.SUCCESS(f"Línea base guardada en {ruta}."))
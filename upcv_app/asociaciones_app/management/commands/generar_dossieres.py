@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from asociaciones_app.dossier import generar_dossier
+from asociaciones_app.models import ExpedienteCAIMUS
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera el expediente completo (dossier) de los expedientes con documentos subidos que aún no lo "
+        "tienen, como los cargados antes de existir el dossier"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--todos",
+            action="store_true",
+            help="Revisa también los que ya tienen dossier; solo se regenera el que cambió",
+        )
+
+    def handle(self, *args, **options):
+        expedientes = ExpedienteCAIMUS.objects.filter(items__entregado=True).distinct()
+        if not options["todos"]:
+            expedientes = expedientes.filter(Q(dossier_pdf="") | Q(dossier_pdf__isnull=True))
+        generados = sin_cambios = errores = 0
+        # En línea y no en la cola de tareas: el hilo de trabajo muere con el comando.
+        for expediente_id in expedientes.order_by("pk").values_list("pk", flat=True).iterator():
+            try:
+                if generar_dossier(expediente_id):
+                    generados += 1
+                else:
+                    sin_cambios += 1
+            except Exception as exc:
+                errores += 1
+                self.stderr.write(f"Expediente {expediente_id}: {exc}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Dossieres generados: {generados}, sin cambios: {sin_cambios}, con error: {errores}.")
+        )
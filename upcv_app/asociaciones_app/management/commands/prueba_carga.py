@@ -0,0 +1,65 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from asociaciones_app.carga import ejecutar_carga
+from asociaciones_app.management.commands.benchmark_resolucion_pdf import comparar_con_linea_base
+
+
+class Command(BaseCommand):
+    help = (
+        "Simula usuarios concurrentes de asociación y de revisión sobre los datos de seed_caimus "
+        "y reporta rendimiento y latencias p50/p95/p99 por URL"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--usuarios", type=int, default=10, help="Usuarios de asociación concurrentes")
+        parser.add_argument("--admins", type=int, default=2, help="Administradores concurrentes")
+        parser.add_argument("--iteraciones", type=int, default=3, help="Veces que cada usuario repite su flujo")
+        parser.add_argument("--hilos", type=int, help="Usuarios simultáneos como máximo (por defecto, todos)")
+        parser.add_argument("--url", type=str, help="Servidor a probar (p. ej. http://127.0.0.1:8000); sin él se usa el cliente de pruebas")
+        parser.add_argument("--semilla", type=int, default=0)
+        parser.add_argument("--tamano-pdf", type=int, default=50, help="Tamaño en KB de los PDF que se suben")
+        parser.add_argument("--salida", type=str, help="Archivo JSON donde guardar el resultado")
+        parser.add_argument("--baseline", type=str, help="Resultado JSON de una versión anterior para comparar")
+        parser.add_argument("--umbral", type=float, default=0.25, help="Regresión tolerada como fracción")
+
+    def handle(self, *args, **options):
+        try:
+            resultado = ejecutar_carga(
+                usuarios_asociacion=options["usuarios"],
+                admins=options["admins"],
+                iteraciones=options["iteraciones"],
+                base_url=options["url"],
+                semilla=options["semilla"],
+                tamano_pdf=options["tamano_pdf"] * 1024,
+                hilos=options["hilos"],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        resultado["generado_en"] = timezone.now().isoformat()
+
+        self.stdout.write(
+            f"{resultado['solicitudes']} solicitudes en {resultado['duracion_s']:.1f} s ({resultado['rps']:.1f} req/s)"
+        )
+        self.stdout.write(f"{'url':<38} {'n':>5} {'err':>4} {'req/s':>7} {'p50':>9} {'p95':>9} {'p99':>9}")
+        for url_name, metricas in resultado["resultados"].items():
+            self.stdout.write(
+                f"{url_name:<38} {metricas['solicitudes']:>5} {metricas['errores']:>4} {metricas['rps']:>7.1f} "
+                f"{metricas['p50_ms']:>7.1f}ms {metricas['p95_ms']:>7.1f}ms {metricas['p99_ms']:>7.1f}ms"
+            )
+
+        if options["salida"]:
+            ruta = Path(options["salida"])
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            ruta.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+            self.stdout.write(self.style.SUCCESS(f"Resultado guardado en {ruta}."))
+
+        if options["baseline"]:
+            base = json.loads(Path(options["baseline"]).read_text(encoding="utf-8"))
+            regresiones = comparar_con_linea_base(resultado["resultados"], base.get("resultados", {}), options["umbral"])
+            if regresiones:
+                raise CommandError("Regresión de rendimiento:\n" + "\n".join(regresiones))
+            self.stdout.write(self.style.SUCCESS("Sin regresiones respecto a la línea base."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from asociaciones_app.resumenes import reconstruir_resumenes
+
+
+class Command(BaseCommand):
+    help = "Recalcula con SQL por conjuntos el resumen de avance de las asociaciones (todas o las de un año)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--anio", type=int, help="Id del año a recalcular (por defecto, todos)")
+
+    def handle(self, *args, **options):
+        cantidad = reconstruir_resumenes(options["anio"])
+        self.stdout.write(self.style.SUCCESS(f"Resúmenes recalculados: {cantidad}."))
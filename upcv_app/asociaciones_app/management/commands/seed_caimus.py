@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from asociaciones_app.semillas import PASSWORD_SEMILLA, sembrar_caimus
+
+
+class Command(BaseCommand):
+    help = "Genera datos sintéticos deterministas (años, asociaciones, expedientes, informes e historial)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--anios", type=int, default=1, help="Cantidad de años a generar")
+        parser.add_argument("--asociaciones", type=int, default=100, help="Asociaciones por año")
+        parser.add_argument("--semilla", type=int, default=0, help="Semilla del generador aleatorio")
+        parser.add_argument("--anio-inicial", type=int, help="Primer año (por defecto, el siguiente al último existente)")
+        parser.add_argument(
+            "--tamano-pdf",
+            type=int,
+            default=0,
+            help="Tamaño en KB de los PDF ficticios; 0 no escribe archivos",
+        )
+        parser.add_argument("--archivos-pdf", type=int, default=10, help="PDF distintos por año, compartidos entre filas")
+        parser.add_argument("--lote", type=int, default=1000, help="Filas por INSERT en bulk_create")
+
+    def handle(self, *args, **options):
+        if options["anios"] < 1 or options["asociaciones"] < 1:
+            raise CommandError("--anios y --asociaciones deben ser mayores que cero.")
+        inicio = time.perf_counter()
+        totales = sembrar_caimus(
+            anios=options["anios"],
+            asociaciones_por_anio=options["asociaciones"],
+            semilla=options["semilla"],
+            anio_inicial=options["anio_inicial"],
+            tamano_pdf=options["tamano_pdf"] * 1024,
+            archivos_pdf=options["archivos_pdf"],
+            lote=options["lote"],
+        )
+        duracion = time.perf_counter() - inicio
+        filas = sum(totales.values())
+        for clave, cantidad in totales.items():
+            self.stdout.write(f"{clave:<14} {cantidad:>9}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{filas} filas en {duracion:.1f} s ({filas / duracion:.0f} filas/s). "
+                f"Contraseña de los usuarios generados: {PASSWORD_SEMILLA}"
+            )
+        )
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import csv
+import tempfile
+import time
+from typing import Dict, Iterator, List, Optional
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Max, Q, QuerySet
+from django.utils import timezone
+
+from .models import MESES_CHOICES, Asociacion, InformeMensual
+
+CACHE_REPORTES = "reportes"
+MESES = [mes for mes, _nombre in MESES_CHOICES]
+ETIQUETAS_ESTADO = dict(InformeMensual.ESTADOS)
+ABREVIATURAS_ESTADO = {
+    InformeMensual.ESTADO_BORRADOR: "B",
+    InformeMensual.ESTADO_EN_REVISION: "R",
+    InformeMensual.ESTADO_APROBADO: "A",
+    InformeMensual.ESTADO_RECHAZADO: "X",
+}
+SIN_INFORME = "Sin informe"
+
+
+def _clave_generacion(anio_id: int) -> str:
+    return f"matriz_cumplimiento:generacion:{anio_id}"
+
+
+def generacion(anio_id: int) -> int:
+    """Generación vigente de la matriz del año; cambia con cada informe o asociación guardada.
+
+    Arranca en el reloj en nanosegundos para que, si la caché pierde el contador, la generación nueva no
+    coincida con una anterior cuyos datos sigan guardados.
+    """
+    cache = caches[CACHE_REPORTES]
+    clave = _clave_generacion(anio_id)
+    cache.add(clave, time.time_ns(), None)
+    return cache.get(clave) or 0
+
+
+def _renovar(anio_id: int) -> None:
+    """Escribe una generación nueva en lugar de incrementarla.
+
+    ``incr`` de ``FileBasedCache`` es un get + set sin bloqueo entre procesos; un valor nuevo del reloj
+    no depende del anterior, así que dos procesos que invalidan a la vez no pueden dejar una generación
+    ya usada.
+    """
+    caches[CACHE_REPORTES].set(_clave_generacion(anio_id), time.time_ns(), None)
+
+
+def invalidar_matriz(anio_id: Optional[int]) -> None:
+    """Pasa a una generación nueva ahora y otra vez al confirmar la transacción.
+
+    Sin la segunda renovación, una petición que leyera entre el ``save`` y el commit guardaría en caché
+    los datos viejos bajo la generación ya incrementada.
+    """
+    if anio_id is None:
+        return
+    _renovar(anio_id)
+    transaction.on_commit(lambda: _renovar(anio_id))
+
+
+def consulta_matriz(anio_id: int, *campos: str) -> QuerySet:
+    """Una fila por asociación del año con el estado de cada mes en ``m1``..``m12`` (pivote en una consulta).
+
+    ``(asociacion, mes)`` es único, así que ``MAX`` filtrado por mes devuelve el estado de ese informe o
+    ``NULL`` si la asociación todavía no lo tiene. ``campos`` agrega columnas (y las agrupa) a cada fila.
+    """
+    meses = {f"m{mes}": Max("informes_mensuales__estado", filter=Q(informes_mensuales__mes=mes)) for mes in MESES}
+    return (
+        Asociacion.objects.filter(anio_id=anio_id)
+        .order_by("nombre", "id")
+        .values("id", "nombre", "codigo", *campos)
+        .annotate(**meses)
+    )
+
+
+def filas_matriz(anio_id: int) -> List[Dict[str, object]]:
+    """Filas de ``consulta_matriz`` con cada celda ``(clase, abreviatura, estado)`` lista para pintar.
+
+    Se guardan en la caché ``reportes`` bajo la generación vigente del año.
+    """
+    cache = caches[CACHE_REPORTES]
+    clave = f"matriz_cumplimiento:{anio_id}:{generacion(anio_id)}"
+    filas = cache.get(clave)
+    if filas is None:
+        filas = [
+            {
+                "id": fila["id"],
+                "nombre": fila["nombre"],
+                "codigo": fila["codigo"],
+                "meses": [
+                    (
+                        f"estado-{(fila[f'm{mes}'] or 'vacio').lower()}",
+                        ABREVIATURAS_ESTADO.get(fila[f"m{mes}"], "—"),
+                        ETIQUETAS_ESTADO.get(fila[f"m{mes}"], SIN_INFORME),
+                    )
+                    for mes in MESES
+                ],
+            }
+            for fila in consulta_matriz(anio_id)
+        ]
+        cache.set(clave, filas, 24 * 3600)
+    return filas
+
+
+def _filas_exportacion(anio_id: int) -> Iterator[list]:
+    """Encabezado y filas de la matriz con el avance de ``ResumenAsociacion`` al final."""
+    yield [
+        "Asociación",
+        "Código",
+        *[nombre for _mes, nombre in MESES_CHOICES],
+        "Documentos entregados",
+        "Rechazos",
+        "Última entrega",
+    ]
+    consulta = consulta_matriz(anio_id, "resumen__items_entregados", "resumen__rechazos", "resumen__ultima_entrega")
+    for fila in consulta.iterator(chunk_size=500):
+        ultima_entrega = fila["resumen__ultima_entrega"]
+        yield [
+            fila["nombre"],
+            fila["codigo"],
+            *[ETIQUETAS_ESTADO.get(fila[f"m{mes}"], "") for mes in MESES],
+            fila["resumen__items_entregados"],
+            fila["resumen__rechazos"],
+            timezone.localtime(ultima_entrega).date() if ultima_entrega else None,
+        ]
+
+
+class _Eco:
+    """Archivo mínimo para ``csv.writer`` que devuelve cada línea en lugar de guardarla."""
+
+    def write(self, valor: str) -> str:
+        return valor
+
+
+def exportar_csv(anio_id: int) -> Iterator[str]:
+    escritor = csv.writer(_Eco())
+    yield "\ufeff"  # BOM para que Excel abra el archivo como UTF-8
+    for fila in _filas_exportacion(anio_id):
+        yield escritor.writerow(fila)
+
+
+def exportar_xlsx(anio_id: int):
+    """Libro XLSX en un archivo temporal; openpyxl en modo ``write_only`` no guarda las filas en memoria."""
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet("Cumplimiento")
+    for fila in _filas_exportacion(anio_id):
+        hoja.append(fila)
+    archivo = tempfile.TemporaryFile()
+    libro.save(archivo)
+    archivo.seek(0)
+    return archivo
+
+
+def invalidar_por_informe(sender, instance: InformeMensual, **kwargs) -> None:
+    if InformeMensual.asociacion.is_cached(instance):
+        anio_id = instance.asociacion.anio_id
+    else:
+        anio_id = Asociacion.objects.filter(pk=instance.asociacion_id).values_list("anio_id", flat=True).first()
+    invalidar_matriz(anio_id)
+
+
+def invalidar_por_asociacion(sender, instance: Asociacion, **kwargs) -> None:
+    invalidar_matriz(instance.anio_id)
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.4 on 2026-10-19 04:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("asociaciones_app", "0004_actualizar_items_checklist_caimus"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="expedientecaimus",
+            name="dossier_hash",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="expedientecaimus",
+            name="dossier_pdf",
+            field=models.FileField(blank=True, null=True, upload_to="dossiers/%Y/"),
+        ),
+        migrations.AddField(
+            model_name="itemchecklistcaimus",
+            name="pdf_sha256",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="resolucionexpediente",
+            name="archivo_hash",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
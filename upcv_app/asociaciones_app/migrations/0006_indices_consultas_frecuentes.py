@@ -0,0 +1,53 @@
+# Generated by Django 5.1.4 on 2026-10-19 04:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("asociaciones_app", "0005_dossier_y_hash_pdf"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="asociacionusuario",
+            name="usuario",
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name="asignaciones_asociacion", to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name="asociacion",
+            index=models.Index(condition=models.Q(("activo", True)), fields=["anio", "nombre"], name="asociacion_activa_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="asociacionusuario",
+            index=models.Index(fields=["usuario", "activo", "asociacion"], name="asignacion_usuario_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="expedientecaimus",
+            index=models.Index(fields=["estado", "asociacion"], name="expediente_estado_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="expedientecaimus",
+            index=models.Index(condition=models.Q(("estado", "EN_REVISION")), fields=["-actualizado_en"], name="expediente_en_revision_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="expedienteestadohistorial",
+            index=models.Index(fields=["expediente", "-cambiado_en"], name="exp_historial_fecha_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="informeestadohistorial",
+            index=models.Index(fields=["informe", "-cambiado_en"], name="inf_historial_fecha_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="informemensual",
+            index=models.Index(fields=["estado", "asociacion", "mes"], name="informe_estado_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="informemensual",
+            index=models.Index(condition=models.Q(("estado", "EN_REVISION")), fields=["asociacion", "mes"], name="informe_en_revision_idx"),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-19 05:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("asociaciones_app", "0006_indices_consultas_frecuentes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="expedientecaimus",
+            name="expediente_en_revision_idx",
+        ),
+        migrations.AddIndex(
+            model_name="expedientecaimus",
+            index=models.Index(fields=["estado", "-actualizado_en", "-id"], name="expediente_bandeja_idx"),
+        ),
+    ]
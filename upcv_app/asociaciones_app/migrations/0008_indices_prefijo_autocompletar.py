@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.db import migrations
+
+# Índices para las búsquedas por prefijo de los endpoints de autocompletado. Django traduce
+# ``istartswith`` a ``UPPER(campo::text) LIKE UPPER('abc%')``; con ``text_pattern_ops`` PostgreSQL
+# puede resolver ese LIKE con el índice sin importar la intercalación de la base. Otros motores
+# no lo necesitan (SQLite recorre la tabla de todos modos con LIKE).
+INDICES = [
+    ("asociaciones_app", "Asociacion", "asociacion_nombre_prefijo_idx", "anio_id, UPPER(nombre::text) text_pattern_ops"),
+    ("asociaciones_app", "Asociacion", "asociacion_codigo_prefijo_idx", "anio_id, UPPER(codigo::text) text_pattern_ops"),
+    ("auth", "User", "usuario_username_prefijo_idx", "UPPER(username::text) text_pattern_ops"),
+    ("auth", "User", "usuario_nombre_prefijo_idx", "UPPER(first_name::text) text_pattern_ops"),
+    ("auth", "User", "usuario_apellido_prefijo_idx", "UPPER(last_name::text) text_pattern_ops"),
+]
+
+
+def crear_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for app_label, modelo, nombre, columnas in INDICES:
+        tabla = schema_editor.quote_name(apps.get_model(app_label, modelo)._meta.db_table)
+        schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} ({columnas})")
+
+
+def borrar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for _app_label, _modelo, nombre, _columnas in INDICES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {nombre}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("asociaciones_app", "0007_indice_bandeja_keyset"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, borrar_indices),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.4 on 2026-10-19 05:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("asociaciones_app", "0008_indices_prefijo_autocompletar"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AvanceCicloRevision",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("tipo", models.CharField(choices=[("EXPEDIENTE", "Expediente"), ("INFORME", "Informe mensual")], max_length=20, unique=True)),
+                ("ultimo_historial_id", models.PositiveIntegerField(default=0)),
+                ("actualizado_en", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Avance de ciclos de revisión",
+                "verbose_name_plural": "Avance de ciclos de revisión",
+            },
+        ),
+        migrations.CreateModel(
+            name="CicloRevision",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("tipo", models.CharField(choices=[("EXPEDIENTE", "Expediente"), ("INFORME", "Informe mensual")], max_length=20)),
+                ("objeto_id", models.PositiveIntegerField()),
+                ("historial_id", models.PositiveIntegerField(blank=True, null=True)),
+                ("entrada", models.DateTimeField(blank=True, null=True)),
+                ("salida", models.DateTimeField(blank=True, null=True)),
+                ("resultado", models.CharField(blank=True, max_length=20)),
+                ("segundos", models.PositiveIntegerField(blank=True, null=True)),
+                ("revisor", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="ciclos_revision", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "verbose_name": "Ciclo de revisión",
+                "verbose_name_plural": "Ciclos de revisión",
+                "indexes": [models.Index(fields=["tipo", "objeto_id"], name="ciclo_objeto_idx"), models.Index(fields=["salida", "tipo"], name="ciclo_salida_idx"), models.Index(condition=models.Q(("salida__isnull", True)), fields=["revisor"], name="ciclo_pendiente_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.1.4 on 2026-10-19 05:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+# Copia congelada de los estados al crear la tabla; la migración no depende del código vivo.
+ESTADOS_INFORME = ("BORRADOR", "EN_REVISION", "APROBADO", "RECHAZADO")
+EN_REVISION = "EN_REVISION"
+RECHAZADO = "RECHAZADO"
+
+
+def contar(queryset, campo):
+    conteo = queryset.order_by().values(campo).annotate(total=Count("pk")).values("total")
+    return Coalesce(Subquery(conteo, output_field=IntegerField()), Value(0))
+
+
+def ultima(queryset, campo):
+    return Subquery(queryset.order_by().values(campo).annotate(ultima=Max("cambiado_en")).values("ultima"))
+
+
+def llenar_resumenes(apps, schema_editor):
+    Asociacion = apps.get_model("asociaciones_app", "Asociacion")
+    ResumenAsociacion = apps.get_model("asociaciones_app", "ResumenAsociacion")
+    asociacion = OuterRef("asociacion_id")
+    items = apps.get_model("asociaciones_app", "ItemChecklistCAIMUS").objects.filter(expediente__asociacion_id=asociacion)
+    informes = apps.get_model("asociaciones_app", "InformeMensual").objects.filter(asociacion_id=asociacion)
+    historial_informes = apps.get_model("asociaciones_app", "InformeEstadoHistorial").objects.filter(
+        informe__asociacion_id=asociacion
+    )
+    historial_expediente = apps.get_model("asociaciones_app", "ExpedienteEstadoHistorial").objects.filter(
+        expediente__asociacion_id=asociacion
+    )
+    entrega_informe = ultima(historial_informes.filter(estado_nuevo=EN_REVISION), "informe__asociacion_id")
+    entrega_expediente = ultima(historial_expediente.filter(estado_nuevo=EN_REVISION), "expediente__asociacion_id")
+
+    ResumenAsociacion.objects.bulk_create(
+        (ResumenAsociacion(asociacion_id=pk) for pk in Asociacion.objects.values_list("pk", flat=True).iterator(chunk_size=1000)),
+        batch_size=1000,
+    )
+    ResumenAsociacion.objects.update(
+        items_total=contar(items, "expediente__asociacion_id"),
+        items_entregados=contar(items.filter(entregado=True), "expediente__asociacion_id"),
+        **{f"informes_{estado.lower()}": contar(informes.filter(estado=estado), "asociacion_id") for estado in ESTADOS_INFORME},
+        # GREATEST devuelve NULL en SQLite si algún argumento lo es; PostgreSQL lo ignora.
+        ultima_entrega=Greatest(
+            Coalesce(entrega_informe, entrega_expediente), Coalesce(entrega_expediente, entrega_informe)
+        ),
+        rechazos=contar(historial_informes.filter(estado_nuevo=RECHAZADO), "informe__asociacion_id")
+        + contar(historial_expediente.filter(estado_nuevo=RECHAZADO), "expediente__asociacion_id"),
+        actualizado_en=timezone.now(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("asociaciones_app", "0009_ciclos_revision"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResumenAsociacion",
+            fields=[
+                ("asociacion", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="resumen", serialize=False, to="asociaciones_app.asociacion")),
+                ("items_total", models.PositiveIntegerField(default=0)),
+                ("items_entregados", models.PositiveIntegerField(default=0)),
+                ("informes_borrador", models.PositiveIntegerField(default=0)),
+                ("informes_en_revision", models.PositiveIntegerField(default=0)),
+                ("informes_aprobado", models.PositiveIntegerField(default=0)),
+                ("informes_rechazado", models.PositiveIntegerField(default=0)),
+                ("ultima_entrega", models.DateTimeField(blank=True, null=True)),
+                ("rechazos", models.PositiveIntegerField(default=0)),
+                ("actualizado_en", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Resumen de asociación",
+                "verbose_name_plural": "Resúmenes de asociaciones",
+            },
+        ),
+        migrations.RunPython(llenar_resumenes, migrations.RunPython.noop),
+    ]
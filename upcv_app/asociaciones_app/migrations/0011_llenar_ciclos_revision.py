@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.db import migrations
+from django.db.models import F, Q
+from django.utils import timezone
+
+# Copia congelada de analitica al crear la tabla; la migración no depende del código vivo.
+EN_REVISION = "EN_REVISION"
+MARGEN = timedelta(minutes=10)
+LOTE = 1000
+FUENTES = {
+    "EXPEDIENTE": ("ExpedienteEstadoHistorial", "expediente_id"),
+    "INFORME": ("InformeEstadoHistorial", "informe_id"),
+}
+
+
+def llenar_ciclos(apps, schema_editor):
+    """Recorre el historial una vez por tipo, en orden de id, y arma los ciclos de cada objeto.
+
+    Equivale a ``LAG`` particionado por objeto sobre todo el historial: la fila anterior de cada
+    objeto es la que se guarda en ``previas``. Solo se procesa hasta el último id con más de
+    ``MARGEN`` de antigüedad; lo posterior lo incorpora ``actualizar_ciclos_revision``.
+    """
+    CicloRevision = apps.get_model("asociaciones_app", "CicloRevision")
+    AvanceCicloRevision = apps.get_model("asociaciones_app", "AvanceCicloRevision")
+    limite = timezone.now() - MARGEN
+
+    for tipo, (nombre, campo) in FUENTES.items():
+        historial = apps.get_model("asociaciones_app", nombre)
+        ultimo = historial.objects.filter(cambiado_en__lte=limite).order_by("-id").values_list("id", flat=True).first() or 0
+        filas = (
+            historial.objects.filter(id__lte=ultimo)
+            .filter(Q(estado_nuevo=EN_REVISION) | Q(estado_anterior=EN_REVISION))
+            .exclude(estado_nuevo=F("estado_anterior"))
+            .order_by("id")
+            .values_list("id", campo, "estado_nuevo", "cambiado_por_id", "cambiado_en")
+        )
+        # objeto -> (estado_nuevo, cambiado_por_id) de su transición anterior
+        previas = {}
+        abiertos = {}
+        listos = []
+        for historial_id, objeto_id, estado_nuevo, cambiado_por_id, cambiado_en in filas.iterator(chunk_size=LOTE):
+            previa = previas.get(objeto_id)
+            previas[objeto_id] = (estado_nuevo, cambiado_por_id)
+            if estado_nuevo == EN_REVISION:
+                if objeto_id in abiertos:
+                    listos.append(abiertos.pop(objeto_id))
+                abiertos[objeto_id] = CicloRevision(
+                    tipo=tipo,
+                    objeto_id=objeto_id,
+                    historial_id=historial_id,
+                    entrada=cambiado_en,
+                    revisor_id=previa[1] if previa else None,
+                )
+                continue
+
+            if previa and previa[0] == EN_REVISION and objeto_id in abiertos:
+                ciclo = abiertos.pop(objeto_id)
+            else:
+                # La entrada a revisión no quedó en el historial: se cuenta la decisión sin duración.
+                ciclo = CicloRevision(tipo=tipo, objeto_id=objeto_id)
+            ciclo.salida = cambiado_en
+            ciclo.resultado = estado_nuevo
+            ciclo.revisor_id = cambiado_por_id
+            if ciclo.entrada is not None:
+                ciclo.segundos = max(int((ciclo.salida - ciclo.entrada).total_seconds()), 0)
+            listos.append(ciclo)
+            if len(listos) >= LOTE:
+                CicloRevision.objects.bulk_create(listos)
+                listos = []
+        CicloRevision.objects.bulk_create([*listos, *abiertos.values()], batch_size=LOTE)
+        AvanceCicloRevision.objects.update_or_create(tipo=tipo, defaults={"ultimo_historial_id": ultimo})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("asociaciones_app", "0010_resumen_asociacion"),
+    ]
+
+    operations = [
+        migrations.RunPython(llenar_ciclos, migrations.RunPython.noop),
+    ]
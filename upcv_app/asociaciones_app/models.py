@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 from dataclasses import dataclass
 from typing import Dict, List, Optional
 
@@ -18,6 +19,13 @@ def validate_pdf_size(value):
         raise ValidationError(f"El archivo excede el tamaño máximo permitido ({max_size // (1024 * 1024)} MB).")
 
 
+def calcular_sha256(archivo) -> str:
+    digest = hashlib.sha256()
+    for chunk in archivo.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
 class Anio(models.Model):
     anio = models.PositiveIntegerField(unique=True)
     activo = models.BooleanField(default=True)
@@ -43,6 +51,9 @@ class Asociacion(models.Model):
         constraints = [
             models.UniqueConstraint(fields=["anio", "codigo"], name="unique_asociacion_codigo_por_anio"),
         ]
+        indexes = [
+            models.Index(fields=["anio", "nombre"], condition=models.Q(activo=True), name="asociacion_activa_idx"),
+        ]
         ordering = ["anio", "nombre"]
 
     def __str__(self) -> str:
@@ -51,7 +62,12 @@ class Asociacion(models.Model):
 
 class AsociacionUsuario(models.Model):
     asociacion = models.ForeignKey(Asociacion, on_delete=models.CASCADE, related_name="usuarios")
-    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="asignaciones_asociacion")
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="asignaciones_asociacion",
+        db_index=False,
+    )
     rol_en_asociacion = models.CharField(max_length=80)
     activo = models.BooleanField(default=True)
     creado_en = models.DateTimeField(auto_now_add=True)
@@ -62,6 +78,11 @@ class AsociacionUsuario(models.Model):
         constraints = [
             models.UniqueConstraint(fields=["asociacion", "usuario"], name="unique_usuario_asociacion"),
         ]
+        indexes = [
+            # La restricción única empieza por asociación; los permisos buscan por usuario y activo.
+            # Reemplaza al índice simple de la llave foránea ``usuario``.
+            models.Index(fields=["usuario", "activo", "asociacion"], name="asignacion_usuario_idx"),
+        ]
         ordering = ["-creado_en"]
 
     def clean(self) -> None:
@@ -121,12 +142,20 @@ class ExpedienteCAIMUS(models.Model):
         blank=True,
         related_name="expedientes_actualizados",
     )
+    dossier_pdf = models.FileField(upload_to="dossiers/%Y/", null=True, blank=True)
+    dossier_hash = models.CharField(max_length=64, blank=True)
     creado_en = models.DateTimeField(auto_now_add=True)
     actualizado_en = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Expediente CAIMUS"
         verbose_name_plural = "Expedientes CAIMUS"
+        indexes = [
+            models.Index(fields=["estado", "asociacion"], name="expediente_estado_idx"),
+            # Orden por defecto y cursor de la bandeja de revisión (paginación keyset); cubre también
+            # los expedientes en revisión ordenados por fecha.
+            models.Index(fields=["estado", "-actualizado_en", "-id"], name="expediente_bandeja_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"Expediente {self.asociacion}"
@@ -221,6 +250,7 @@ class ItemChecklistCAIMUS(models.Model):
         null=True,
         validators=[PDF_VALIDATOR, validate_pdf_size],
     )
+    pdf_sha256 = models.CharField(max_length=64, blank=True)
     observaciones = models.TextField(blank=True)
 
     class Meta:
@@ -237,6 +267,10 @@ class ItemChecklistCAIMUS(models.Model):
 
     def save(self, *args, **kwargs) -> None:
         self.entregado = bool(self.pdf)
+        if not self.pdf:
+            self.pdf_sha256 = ""
+        elif not self.pdf._committed:
+            self.pdf_sha256 = calcular_sha256(self.pdf)
         super().save(*args, **kwargs)
 
     def __str__(self) -> str:
@@ -254,6 +288,9 @@ class ExpedienteEstadoHistorial(models.Model):
     class Meta:
         verbose_name = "Historial de estado"
         verbose_name_plural = "Historial de estados"
+        indexes = [
+            models.Index(fields=["expediente", "-cambiado_en"], name="exp_historial_fecha_idx"),
+        ]
         ordering = ["-cambiado_en"]
 
     def __str__(self) -> str:
@@ -267,6 +304,7 @@ class ResolucionExpediente(models.Model):
     generado_por = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
     generado_en = models.DateTimeField(auto_now_add=True)
     archivo_pdf = models.FileField(upload_to="resoluciones/%Y/", null=True, blank=True)
+    archivo_hash = models.CharField(max_length=64, blank=True)
     contenido_snapshot = models.JSONField(null=True, blank=True)
 
     class Meta:
@@ -308,7 +346,11 @@ def crear_items_expediente(expediente: ExpedienteCAIMUS) -> None:
         if actualizado:
             items_to_update.append(existente)
     if items_to_create:
+        from .resumenes import actualizar_resumenes
+
         ItemChecklistCAIMUS.objects.bulk_create(items_to_create)
+        # ``bulk_create`` no envía ``post_save``.
+        actualizar_resumenes(models.Q(asociacion_id=expediente.asociacion_id))
     if items_to_update:
         ItemChecklistCAIMUS.objects.bulk_update(items_to_update, ["seccion", "titulo", "hint"])
     extra_items = expediente.items.exclude(numero__in=numeros_validos)
@@ -387,6 +429,14 @@ class InformeMensual(models.Model):
         constraints = [
             models.UniqueConstraint(fields=["asociacion", "mes"], name="unique_informe_mes_asociacion"),
         ]
+        indexes = [
+            models.Index(fields=["estado", "asociacion", "mes"], name="informe_estado_idx"),
+            models.Index(
+                fields=["asociacion", "mes"],
+                condition=models.Q(estado="EN_REVISION"),
+                name="informe_en_revision_idx",
+            ),
+        ]
         ordering = ["mes"]
 
     def __str__(self) -> str:
@@ -409,12 +459,97 @@ class InformeEstadoHistorial(models.Model):
     class Meta:
         verbose_name = "Historial de estado de informe"
         verbose_name_plural = "Historial de estados de informes"
+        indexes = [
+            models.Index(fields=["informe", "-cambiado_en"], name="inf_historial_fecha_idx"),
+        ]
         ordering = ["-cambiado_en"]
 
     def __str__(self) -> str:
         return f"{self.informe} {self.estado_anterior} -> {self.estado_nuevo}"
 
 
+class CicloRevision(models.Model):
+    """Paso de un expediente o informe por ``EN_REVISION``, resumido desde su historial de estados.
+
+    Lo mantiene ``analitica.actualizar_ciclos``; ``salida`` vacía significa que sigue pendiente.
+    """
+
+    TIPO_EXPEDIENTE = "EXPEDIENTE"
+    TIPO_INFORME = "INFORME"
+    TIPOS = [
+        (TIPO_EXPEDIENTE, "Expediente"),
+        (TIPO_INFORME, "Informe mensual"),
+    ]
+
+    tipo = models.CharField(max_length=20, choices=TIPOS)
+    objeto_id = models.PositiveIntegerField()
+    historial_id = models.PositiveIntegerField(null=True, blank=True)
+    entrada = models.DateTimeField(null=True, blank=True)
+    salida = models.DateTimeField(null=True, blank=True)
+    resultado = models.CharField(max_length=20, blank=True)
+    revisor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="ciclos_revision",
+    )
+    segundos = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Ciclo de revisión"
+        verbose_name_plural = "Ciclos de revisión"
+        indexes = [
+            models.Index(fields=["tipo", "objeto_id"], name="ciclo_objeto_idx"),
+            models.Index(fields=["salida", "tipo"], name="ciclo_salida_idx"),
+            models.Index(fields=["revisor"], condition=models.Q(salida__isnull=True), name="ciclo_pendiente_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_tipo_display()} {self.objeto_id} {self.resultado or 'pendiente'}"
+
+
+class AvanceCicloRevision(models.Model):
+    """Última fila del historial de cada tipo ya incorporada a ``CicloRevision``."""
+
+    tipo = models.CharField(max_length=20, choices=CicloRevision.TIPOS, unique=True)
+    ultimo_historial_id = models.PositiveIntegerField(default=0)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Avance de ciclos de revisión"
+        verbose_name_plural = "Avance de ciclos de revisión"
+
+    def __str__(self) -> str:
+        return f"{self.tipo}: {self.ultimo_historial_id}"
+
+
+class ResumenAsociacion(models.Model):
+    """Avance de una asociación ya agregado, para listados y exportaciones.
+
+    Lo mantienen las señales de ``resumenes`` en la misma transacción que cada cambio; el comando
+    ``reconstruir_resumenes`` lo recalcula completo.
+    """
+
+    asociacion = models.OneToOneField(Asociacion, on_delete=models.CASCADE, primary_key=True, related_name="resumen")
+    items_total = models.PositiveIntegerField(default=0)
+    items_entregados = models.PositiveIntegerField(default=0)
+    informes_borrador = models.PositiveIntegerField(default=0)
+    informes_en_revision = models.PositiveIntegerField(default=0)
+    informes_aprobado = models.PositiveIntegerField(default=0)
+    informes_rechazado = models.PositiveIntegerField(default=0)
+    ultima_entrega = models.DateTimeField(null=True, blank=True)
+    rechazos = models.PositiveIntegerField(default=0)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Resumen de asociación"
+        verbose_name_plural = "Resúmenes de asociaciones"
+
+    def __str__(self) -> str:
+        return f"Resumen {self.asociacion_id}"
+
+
 def crear_informes_mensuales(asociacion: Asociacion, usuario: Optional[models.Model] = None) -> None:
     existentes = set(asociacion.informes_mensuales.values_list("mes", flat=True))
     informes = []
@@ -430,21 +565,39 @@ def crear_informes_mensuales(asociacion: Asociacion, usuario: Optional[models.Mo
             )
         )
     if informes:
+        from .matriz import invalidar_matriz
+        from .resumenes import actualizar_resumenes
+
         InformeMensual.objects.bulk_create(informes)
+        # ``bulk_create`` no envía ``post_save``.
+        invalidar_matriz(asociacion.anio_id)
+        actualizar_resumenes(models.Q(asociacion_id=asociacion.pk))
 
 
-def generar_correlativo(anio: int) -> str:
+def reservar_correlativos(anio: int, cantidad: int) -> List[str]:
+    """Reserva ``cantidad`` correlativos consecutivos del año en una sola lectura.
+
+    Bloquea la fila del año (existe aunque el año todavía no tenga resoluciones), así que dos reservas
+    simultáneas del mismo año se esperan hasta que la primera confirme sus resoluciones. El bloqueo
+    dura lo que la transacción del llamador: quien reserva tiene que insertar las resoluciones dentro
+    de un ``transaction.atomic()`` propio, o el bloqueo se suelta antes de que existan.
+    """
     with transaction.atomic():
+        list(Anio.objects.select_for_update().filter(anio=anio).values_list("pk", flat=True))
         ultimo = (
-            ResolucionExpediente.objects.select_for_update()
-            .filter(expediente__asociacion__anio__anio=anio)
+            ResolucionExpediente.objects.filter(expediente__asociacion__anio__anio=anio)
             .order_by("-correlativo")
+            .values_list("correlativo", flat=True)
             .first()
         )
-        secuencia = 1
+        secuencia = 0
         if ultimo:
             try:
-                secuencia = int(ultimo.correlativo.split("-")[-1]) + 1
+                secuencia = int(ultimo.split("-")[-1])
             except (ValueError, IndexError):
-                secuencia = 1
-        return f"UPCV-CAIMUS-{anio}-{secuencia:04d}"
+                secuencia = 0
+        return [f"UPCV-CAIMUS-{anio}-{numero:04d}" for numero in range(secuencia + 1, secuencia + cantidad + 1)]
+
+
+def generar_correlativo(anio: int) -> str:
+    return reservar_correlativos(anio, 1)[0]
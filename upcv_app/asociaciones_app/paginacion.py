@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import datetime
+import json
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet
+
+# (campo, descendente); el último campo debe ser único (normalmente "id") para que el orden sea total.
+Orden = Sequence[Tuple[str, bool]]
+
+
+class CodificadorCursor(DjangoJSONEncoder):
+    """Como ``DjangoJSONEncoder`` pero sin truncar los microsegundos, que el cursor necesita exactos."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+@dataclass
+class PaginaKeyset:
+    objetos: List[object]
+    cursor_siguiente: Optional[str]
+    es_primera: bool
+
+    @property
+    def tiene_siguiente(self) -> bool:
+        return self.cursor_siguiente is not None
+
+
+def _campo_modelo(modelo, ruta: str):
+    partes = ruta.split("__")
+    for parte in partes[:-1]:
+        modelo = modelo._meta.get_field(parte).related_model
+    return modelo._meta.get_field(partes[-1])
+
+
+def _valor(objeto, ruta: str):
+    for parte in ruta.split("__"):
+        objeto = getattr(objeto, parte)
+    return objeto
+
+
+def codificar_cursor(objeto, orden: Orden) -> str:
+    valores = [_valor(objeto, campo) for campo, _descendente in orden]
+    datos = json.dumps(valores, cls=CodificadorCursor, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(datos).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, modelo, orden: Orden) -> Optional[list]:
+    """Valores del cursor convertidos al tipo de cada campo; ``None`` si el cursor no es válido."""
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(valores, list) or len(valores) != len(orden):
+            return None
+        return [_campo_modelo(modelo, campo).to_python(valor) for (campo, _d), valor in zip(orden, valores)]
+    except (ValueError, TypeError, binascii.Error, ValidationError):
+        return None
+
+
+def filtro_despues(orden: Orden, valores: list) -> Q:
+    """Filas posteriores a ``valores`` en ``orden``: ``a > x OR (a = x AND b > y) OR ...``."""
+    condicion = Q()
+    iguales = Q()
+    for (campo, descendente), valor in zip(orden, valores):
+        condicion |= iguales & Q(**{f"{campo}__{'lt' if descendente else 'gt'}": valor})
+        iguales &= Q(**{campo: valor})
+    return condicion
+
+
+def paginar_keyset(queryset: QuerySet, orden: Orden, cursor: Optional[str], tamano: int) -> PaginaKeyset:
+    """Página de ``tamano`` filas tras ``cursor``, sin ``OFFSET``: el costo no crece con el número de página."""
+    queryset = queryset.order_by(*[f"-{campo}" if descendente else campo for campo, descendente in orden])
+    valores = decodificar_cursor(cursor, queryset.model, orden) if cursor else None
+    if valores is not None:
+        queryset = queryset.filter(filtro_despues(orden, valores))
+    objetos = list(queryset[: tamano + 1])
+    siguiente = codificar_cursor(objetos[tamano - 1], orden) if len(objetos) > tamano else None
+    return PaginaKeyset(objetos[:tamano], siguiente, valores is None)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from io import BytesIO
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.template.loader import render_to_string
+
+from almacen_app.models import Institucion
+
+from .models import ExpedienteCAIMUS, ResolucionExpediente
+from .signals import pdf_generado
+
+
+def renderizar_resolucion_html(expediente: ExpedienteCAIMUS, resolucion: ResolucionExpediente) -> str:
+    return render_to_string(
+        "asociaciones_app/resolucion_pdf.html",
+        {
+            "expediente": expediente,
+            "resolucion": resolucion,
+            "items": expediente.items.all(),
+            "institucion": Institucion.objects.first(),
+        },
+    )
+
+
+MOTORES_PDF = ("weasyprint", "xhtml2pdf")
+
+
+def motor_pdf_predeterminado() -> str:
+    return getattr(settings, "CAIMUS_MOTOR_PDF", "weasyprint")
+
+
+def motores_disponibles() -> List[str]:
+    disponibles = []
+    for motor in MOTORES_PDF:
+        try:
+            if motor == "weasyprint":
+                import weasyprint  # noqa: F401
+            else:
+                import xhtml2pdf.pisa  # noqa: F401
+        except (ImportError, OSError):
+            continue
+        disponibles.append(motor)
+    return disponibles
+
+
+def html_a_pdf(html: str, base_url: Optional[str] = None, motor: Optional[str] = None) -> bytes:
+    motor = motor or motor_pdf_predeterminado()
+    if motor == "weasyprint":
+        from weasyprint import HTML
+
+        return HTML(string=html, base_url=base_url).write_pdf()
+    if motor == "xhtml2pdf":
+        from xhtml2pdf import pisa
+
+        salida = BytesIO()
+        resultado = pisa.CreatePDF(html, dest=salida)
+        if resultado.err:
+            raise ValueError("xhtml2pdf no pudo generar el PDF.")
+        return salida.getvalue()
+    raise ValueError(f"Motor PDF desconocido: {motor}")
+
+
+def obtener_resolucion_pdf(
+    expediente: ExpedienteCAIMUS,
+    resolucion: ResolucionExpediente,
+    base_url: Optional[str] = None,
+    motor: Optional[str] = None,
+) -> bytes:
+    """Devuelve el PDF de la resolución, reutilizando ``archivo_pdf`` si el contenido no cambió."""
+    motor = motor or motor_pdf_predeterminado()
+    html = renderizar_resolucion_html(expediente, resolucion)
+    contenido_hash = hashlib.sha256(f"{motor}\n{html}".encode("utf-8")).hexdigest()
+    if resolucion.archivo_pdf and resolucion.archivo_hash == contenido_hash:
+        try:
+            with resolucion.archivo_pdf.open("rb") as archivo:
+                return archivo.read()
+        except FileNotFoundError:
+            pass
+
+    inicio = time.perf_counter()
+    pdf = html_a_pdf(html, base_url=base_url, motor=motor)
+    pdf_generado.send(
+        sender=ResolucionExpediente, documento="resolucion", motor=motor, duracion=time.perf_counter() - inicio
+    )
+    anterior = resolucion.archivo_pdf.name if resolucion.archivo_pdf else None
+    resolucion.archivo_pdf.save(f"Resolucion-{resolucion.correlativo}.pdf", ContentFile(pdf), save=False)
+    resolucion.archivo_hash = contenido_hash
+    ResolucionExpediente.objects.filter(pk=resolucion.pk).update(
+        archivo_pdf=resolucion.archivo_pdf.name,
+        archivo_hash=contenido_hash,
+    )
+    if anterior and anterior != resolucion.archivo_pdf.name:
+        resolucion.archivo_pdf.storage.delete(anterior)
+    return pdf
@@ -2,19 +2,21 @@ from __future__ import annotations
 
 from django.db.models import QuerySet
 
+from almacen_app.utils import nombres_grupos
+
 from .models import Asociacion, AsociacionUsuario, ExpedienteCAIMUS
 
 
 def is_admin(user) -> bool:
     if not user.is_authenticated:
         return False
-    return user.groups.filter(name="Administrador").exists() or user.is_superuser
+    return "Administrador" in nombres_grupos(user) or user.is_superuser
 
 
 def is_asociacion(user) -> bool:
     if not user.is_authenticated:
         return False
-    return user.groups.filter(name="Asociacion").exists()
+    return "Asociacion" in nombres_grupos(user)
 
 
 def get_asociaciones_usuario(user) -> QuerySet[Asociacion]:
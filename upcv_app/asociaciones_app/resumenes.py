@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import threading
+from typing import Optional
+
+from django.db import transaction
+from django.db.models import Max, OuterRef, Q, QuerySet, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .bandeja import _contar
+from .models import (
+    Asociacion,
+    ExpedienteEstadoHistorial,
+    InformeEstadoHistorial,
+    InformeMensual,
+    ItemChecklistCAIMUS,
+    ResumenAsociacion,
+)
+
+# Expedientes e informes comparten los nombres de estado.
+EN_REVISION = InformeMensual.ESTADO_EN_REVISION
+RECHAZADO = InformeMensual.ESTADO_RECHAZADO
+
+# Expedientes con items guardados cuyo resumen se recalcula al confirmar (uno por hilo: una conexión).
+_items_pendientes = threading.local()
+
+
+def _ultima(queryset: QuerySet, campo: str) -> Subquery:
+    fechas = queryset.order_by().values(campo).annotate(ultima=Max("cambiado_en")).values("ultima")
+    return Subquery(fechas)
+
+
+def _expresiones() -> dict:
+    """Columnas del resumen como subconsultas correlacionadas con ``asociacion_id`` de cada fila."""
+    asociacion = OuterRef("asociacion_id")
+    items = ItemChecklistCAIMUS.objects.filter(expediente__asociacion_id=asociacion)
+    informes = InformeMensual.objects.filter(asociacion_id=asociacion)
+    historial_informes = InformeEstadoHistorial.objects.filter(informe__asociacion_id=asociacion)
+    historial_expediente = ExpedienteEstadoHistorial.objects.filter(expediente__asociacion_id=asociacion)
+
+    entrega_informe = _ultima(historial_informes.filter(estado_nuevo=EN_REVISION), "informe__asociacion_id")
+    entrega_expediente = _ultima(historial_expediente.filter(estado_nuevo=EN_REVISION), "expediente__asociacion_id")
+    return {
+        "items_total": _contar(items, "expediente__asociacion_id"),
+        "items_entregados": _contar(items.filter(entregado=True), "expediente__asociacion_id"),
+        **{
+            f"informes_{estado.lower()}": _contar(informes.filter(estado=estado), "asociacion_id")
+            for estado, _etiqueta in InformeMensual.ESTADOS
+        },
+        # GREATEST devuelve NULL en SQLite si algún argumento lo es; PostgreSQL lo ignora.
+        "ultima_entrega": Greatest(
+            Coalesce(entrega_informe, entrega_expediente), Coalesce(entrega_expediente, entrega_informe)
+        ),
+        "rechazos": _contar(historial_informes.filter(estado_nuevo=RECHAZADO), "informe__asociacion_id")
+        + _contar(historial_expediente.filter(estado_nuevo=RECHAZADO), "expediente__asociacion_id"),
+    }
+
+
+def actualizar_resumenes(filtro: Q) -> int:
+    """Recalcula con un solo ``UPDATE`` los resúmenes que cumplen ``filtro``."""
+    return ResumenAsociacion.objects.filter(filtro).update(**_expresiones(), actualizado_en=timezone.now())
+
+
+def reconstruir_resumenes(anio_id: Optional[int] = None) -> int:
+    """Crea los resúmenes que falten y recalcula todos (o los del año ``anio_id``)."""
+    asociaciones = Asociacion.objects.all()
+    if anio_id is not None:
+        asociaciones = asociaciones.filter(anio_id=anio_id)
+    with transaction.atomic():
+        faltantes = asociaciones.filter(resumen__isnull=True).values_list("pk", flat=True)
+        ResumenAsociacion.objects.bulk_create(
+            (ResumenAsociacion(asociacion_id=pk) for pk in faltantes.iterator(chunk_size=1000)), batch_size=1000
+        )
+        return actualizar_resumenes(Q(asociacion__in=asociaciones.values("pk")))
+
+
+def _actualizar(filtro: Q) -> None:
+    """Recalcula el resumen dentro de la transacción del cambio que lo disparó.
+
+    La fila se bloquea antes del ``UPDATE``: en PostgreSQL la sentencia siguiente toma una instantánea
+    nueva y ve lo que haya confirmado otra transacción que actualizaba la misma asociación.
+    """
+    with transaction.atomic():
+        list(ResumenAsociacion.objects.select_for_update(of=("self",)).filter(filtro).values_list("pk", flat=True))
+        actualizar_resumenes(filtro)
+
+
+def crear_resumen(sender, instance, created: bool, raw: bool = False, **kwargs) -> None:
+    if created and not raw:
+        ResumenAsociacion.objects.get_or_create(asociacion=instance)
+
+
+def _recalcular_items_pendientes() -> None:
+    expediente_ids = getattr(_items_pendientes, "ids", set())
+    if not expediente_ids:
+        return
+    _items_pendientes.ids = set()
+    _actualizar(Q(asociacion__expediente_caimus__id__in=expediente_ids))
+
+
+def por_item(sender, instance, raw: bool = False, **kwargs) -> None:
+    """Un formset guarda los doce items de un expediente: el resumen se recalcula una vez, al confirmar.
+
+    Cada guardado agrega su expediente a los pendientes y registra el callback; el primero que corre
+    recalcula todos y los demás no encuentran nada. Si la transacción se revierte, sus expedientes
+    quedan pendientes y se recalculan (de más, sin daño) con la siguiente confirmación.
+    """
+    if raw:
+        return
+    if not hasattr(_items_pendientes, "ids"):
+        _items_pendientes.ids = set()
+    _items_pendientes.ids.add(instance.expediente_id)
+    transaction.on_commit(_recalcular_items_pendientes)
+
+
+def por_informe(sender, instance, raw: bool = False, **kwargs) -> None:
+    if not raw:
+        _actualizar(Q(asociacion_id=instance.asociacion_id))
+
+
+def por_historial_informe(sender, instance, raw: bool = False, **kwargs) -> None:
+    if not raw:
+        _actualizar(Q(asociacion__informes_mensuales__id=instance.informe_id))
+
+
+def por_historial_expediente(sender, instance, raw: bool = False, **kwargs) -> None:
+    if not raw:
+        _actualizar(Q(asociacion__expediente_caimus__id=instance.expediente_id))
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .dossier import programar_dossieres
+from .matriz import invalidar_matriz
+from .models import (
+    ExpedienteCAIMUS,
+    ExpedienteEstadoHistorial,
+    InformeEstadoHistorial,
+    InformeMensual,
+    ResolucionExpediente,
+    reservar_correlativos,
+)
+from .resumenes import actualizar_resumenes
+
+# Campos que cambia una revisión, iguales en informes y expedientes; ``bulk_update`` no aplica
+# ``auto_now``, así que va ``actualizado_en``.
+CAMPOS_REVISION = ["estado", "aprobado_por", "aprobado_en", "observacion_admin", "actualizado_por", "actualizado_en"]
+MAXIMO_INFORMES = 500
+MAXIMO_EXPEDIENTES = 500
+
+
+def validar_estado(estado: Optional[str], observacion: str) -> Optional[str]:
+    """Mensaje de error si un administrador no puede pasar informes a ``estado``; ``None`` si puede."""
+    if estado not in dict(InformeMensual.ESTADOS):
+        return "Estado inválido."
+    if estado == InformeMensual.ESTADO_RECHAZADO and not observacion:
+        return "Debe indicar la observación del rechazo."
+    return None
+
+
+def aplicar_estado(informe: InformeMensual, estado: str, observacion: str, usuario, ahora: datetime) -> None:
+    """Deja ``informe`` en ``estado`` con los datos de aprobación u observación que corresponden, sin guardarlo."""
+    informe.estado = estado
+    if estado == InformeMensual.ESTADO_APROBADO:
+        informe.aprobado_por = usuario
+        informe.aprobado_en = ahora
+        informe.observacion_admin = ""
+    else:
+        informe.aprobado_por = None
+        informe.aprobado_en = None
+        informe.observacion_admin = observacion
+    informe.actualizado_por = usuario
+
+
+@dataclass(frozen=True)
+class ResultadoRevision:
+    asociacion_id: int
+    mes: int
+    aplicado: bool
+    mensaje: str
+    asociacion: str = ""
+    estado_anterior: str = ""
+
+
+def leer_pares(valores: Iterable[str]) -> List[Tuple[int, int]]:
+    """``["12-3", ...]`` → ``[(12, 3), ...]`` sin repetidos; ``ValueError`` si alguno no tiene ese formato."""
+    pares = []
+    for valor in valores:
+        asociacion_id, _guion, mes = valor.partition("-")
+        if not (asociacion_id.isdigit() and mes.isdigit()):
+            raise ValueError(f"Informe inválido: {valor}.")
+        pares.append((int(asociacion_id), int(mes)))
+    return list(dict.fromkeys(pares))
+
+
+def revisar_informes(pares: List[Tuple[int, int]], estado: str, observacion: str, usuario) -> List[ResultadoRevision]:
+    """Aplica ``estado`` a los informes ``(asociacion_id, mes)`` en una transacción y reporta cada uno.
+
+    Valida como ``informe_estado`` y escribe con un ``bulk_update`` y un ``bulk_create`` del historial.
+    Los informes que no existen o ya están en ``estado`` se reportan sin cambios.
+    """
+    error = validar_estado(estado, observacion)
+    if error:
+        raise ValueError(error)
+    if not pares:
+        raise ValueError("Debe seleccionar al menos un informe.")
+    if len(pares) > MAXIMO_INFORMES:
+        raise ValueError(f"Se pueden revisar hasta {MAXIMO_INFORMES} informes a la vez.")
+
+    resultados = {}
+    validos = []
+    for asociacion_id, mes in pares:
+        if mes in range(1, 13):
+            validos.append((asociacion_id, mes))
+        else:
+            resultados[(asociacion_id, mes)] = ResultadoRevision(asociacion_id, mes, False, "Mes inválido.")
+
+    ahora = timezone.now()
+    with transaction.atomic():
+        # Asociaciones × meses puede traer informes de más; solo se tocan los pares pedidos.
+        informes = {
+            (informe.asociacion_id, informe.mes): informe
+            for informe in InformeMensual.objects.select_for_update(of=("self",))
+            .select_related("asociacion")
+            .filter(asociacion_id__in={par[0] for par in validos}, mes__in={par[1] for par in validos})
+        }
+        cambiados = []
+        historial = []
+        for par in validos:
+            informe = informes.get(par)
+            if informe is None:
+                resultados[par] = ResultadoRevision(*par, False, "No existe el informe.")
+                continue
+            estado_anterior = informe.estado
+            if estado_anterior == estado:
+                resultados[par] = ResultadoRevision(
+                    *par, False, "Ya estaba en ese estado.", informe.asociacion.nombre, estado_anterior
+                )
+                continue
+            aplicar_estado(informe, estado, observacion, usuario, ahora)
+            informe.actualizado_en = ahora
+            cambiados.append(informe)
+            historial.append(
+                InformeEstadoHistorial(
+                    informe=informe,
+                    estado_anterior=estado_anterior,
+                    estado_nuevo=estado,
+                    observacion=observacion,
+                    cambiado_por=usuario,
+                )
+            )
+            resultados[par] = ResultadoRevision(*par, True, "Actualizado.", informe.asociacion.nombre, estado_anterior)
+
+        if cambiados:
+            InformeMensual.objects.bulk_update(cambiados, CAMPOS_REVISION)
+            InformeEstadoHistorial.objects.bulk_create(historial)
+            # Ni ``bulk_update`` ni ``bulk_create`` envían señales.
+            for anio_id in {informe.asociacion.anio_id for informe in cambiados}:
+                invalidar_matriz(anio_id)
+            actualizar_resumenes(Q(asociacion_id__in={informe.asociacion_id for informe in cambiados}))
+    return [resultados[par] for par in pares]
+
+
+@dataclass(frozen=True)
+class ResultadoAprobacion:
+    expediente_id: int
+    aplicado: bool
+    mensaje: str
+    asociacion: str = ""
+    correlativo: str = ""
+
+
+def aprobar_expedientes(expediente_ids: Iterable[int], usuario) -> List[ResultadoAprobacion]:
+    """Aprueba en una transacción los expedientes en revisión y emite sus resoluciones.
+
+    Los correlativos de cada año se reservan en un bloque consecutivo, en el orden alfabético de las
+    asociaciones. Historial y resoluciones se crean con ``bulk_create`` y los dossieres se encolan al
+    confirmar. Los expedientes que no existen o no están en revisión se reportan sin cambios.
+    """
+    expediente_ids = list(dict.fromkeys(expediente_ids))
+    if not expediente_ids:
+        raise ValueError("Debe seleccionar al menos un expediente.")
+    if len(expediente_ids) > MAXIMO_EXPEDIENTES:
+        raise ValueError(f"Se pueden aprobar hasta {MAXIMO_EXPEDIENTES} expedientes a la vez.")
+
+    resultados = {}
+    ahora = timezone.now()
+    with transaction.atomic():
+        expedientes = {
+            expediente.pk: expediente
+            for expediente in ExpedienteCAIMUS.objects.select_for_update(of=("self",))
+            .select_related("asociacion__anio")
+            .filter(pk__in=expediente_ids)
+        }
+        con_resolucion = set(
+            ResolucionExpediente.objects.filter(expediente_id__in=expedientes).values_list("expediente_id", flat=True)
+        )
+        aprobados = []
+        historial = []
+        for expediente_id in expediente_ids:
+            expediente = expedientes.get(expediente_id)
+            if expediente is None:
+                resultados[expediente_id] = ResultadoAprobacion(expediente_id, False, "No existe el expediente.")
+                continue
+            if expediente.estado != ExpedienteCAIMUS.ESTADO_EN_REVISION:
+                resultados[expediente_id] = ResultadoAprobacion(
+                    expediente_id, False, "No está en revisión.", expediente.asociacion.nombre
+                )
+                continue
+            expediente.estado = ExpedienteCAIMUS.ESTADO_APROBADO
+            expediente.aprobado_por = usuario
+            expediente.aprobado_en = ahora
+            expediente.observacion_admin = ""
+            expediente.actualizado_por = usuario
+            expediente.actualizado_en = ahora
+            aprobados.append(expediente)
+            historial.append(
+                ExpedienteEstadoHistorial(
+                    expediente=expediente,
+                    estado_anterior=ExpedienteCAIMUS.ESTADO_EN_REVISION,
+                    estado_nuevo=ExpedienteCAIMUS.ESTADO_APROBADO,
+                    cambiado_por=usuario,
+                )
+            )
+
+        por_anio = {}
+        for expediente in sorted(aprobados, key=lambda expediente: (expediente.asociacion.nombre, expediente.pk)):
+            if expediente.pk not in con_resolucion:
+                por_anio.setdefault(expediente.asociacion.anio.anio, []).append(expediente)
+        resoluciones = []
+        for anio, pendientes in sorted(por_anio.items()):
+            for expediente, correlativo in zip(pendientes, reservar_correlativos(anio, len(pendientes))):
+                resoluciones.append(
+                    ResolucionExpediente(
+                        expediente=expediente,
+                        correlativo=correlativo,
+                        fecha_emision=ahora.date(),
+                        generado_por=usuario,
+                        contenido_snapshot={
+                            "asociacion": expediente.asociacion.nombre,
+                            "anio": anio,
+                            "estado": expediente.estado,
+                        },
+                    )
+                )
+        correlativos = {resolucion.expediente_id: resolucion.correlativo for resolucion in resoluciones}
+
+        if aprobados:
+            ExpedienteCAIMUS.objects.bulk_update(aprobados, CAMPOS_REVISION)
+            ExpedienteEstadoHistorial.objects.bulk_create(historial)
+            ResolucionExpediente.objects.bulk_create(resoluciones)
+            # ``bulk_create`` no envía ``post_save`` al historial.
+            actualizar_resumenes(Q(asociacion_id__in={expediente.asociacion_id for expediente in aprobados}))
+            programar_dossieres(expediente.pk for expediente in aprobados)
+        for expediente in aprobados:
+            resultados[expediente.pk] = ResultadoAprobacion(
+                expediente.pk, True, "Aprobado.", expediente.asociacion.nombre, correlativos.get(expediente.pk, "")
+            )
+    return [resultados[expediente_id] for expediente_id in expediente_ids]
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import hashlib
+import random
+from datetime import date
+from typing import Dict, List, Optional
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Max
+
+from .matriz import invalidar_matriz
+from .models import (
+    CHECKLIST_ITEMS,
+    MESES_CHOICES,
+    Anio,
+    Asociacion,
+    AsociacionUsuario,
+    ExpedienteCAIMUS,
+    ExpedienteEstadoHistorial,
+    InformeEstadoHistorial,
+    InformeMensual,
+    ItemChecklistCAIMUS,
+    ResolucionExpediente,
+)
+from .resumenes import reconstruir_resumenes
+
+PASSWORD_SEMILLA = "caimus-semilla"
+
+# Peso de cada estado final; la mayoría de expedientes e informes ya pasó por revisión.
+PESOS_ESTADO = {
+    ExpedienteCAIMUS.ESTADO_BORRADOR: 2,
+    ExpedienteCAIMUS.ESTADO_EN_REVISION: 3,
+    ExpedienteCAIMUS.ESTADO_APROBADO: 4,
+    ExpedienteCAIMUS.ESTADO_RECHAZADO: 1,
+}
+
+
+def pdf_ficticio(tamano: int, texto: str = "CAIMUS") -> bytes:
+    """PDF válido de una página, rellenado con espacios hasta ``tamano`` bytes aproximadamente."""
+    contenido = f"BT /F1 12 Tf 72 720 Td ({texto}) Tj ET\n".encode("latin-1")
+    objetos = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    relleno = max(0, tamano - 600 - len(contenido))
+    contenido += b" " * relleno
+    objetos[3] = b"<< /Length %d >>\nstream\n" % len(contenido) + contenido + b"\nendstream"
+
+    salida = bytearray(b"%PDF-1.4\n")
+    posiciones = []
+    for numero, objeto in enumerate(objetos, start=1):
+        posiciones.append(len(salida))
+        salida += b"%d 0 obj\n" % numero + objeto + b"\nendobj\n"
+    inicio_xref = len(salida)
+    salida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    for posicion in posiciones:
+        salida += b"%010d 00000 n \n" % posicion
+    salida += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, inicio_xref)
+    return bytes(salida)
+
+
+def _historial(rng: random.Random, estado_final: str) -> List[tuple]:
+    """Transiciones plausibles que terminan en ``estado_final``."""
+    if estado_final == ExpedienteCAIMUS.ESTADO_BORRADOR:
+        return []
+    transiciones = [(ExpedienteCAIMUS.ESTADO_BORRADOR, ExpedienteCAIMUS.ESTADO_EN_REVISION)]
+    for _ in range(rng.randint(0, 2)):
+        transiciones.append((ExpedienteCAIMUS.ESTADO_EN_REVISION, ExpedienteCAIMUS.ESTADO_RECHAZADO))
+        transiciones.append((ExpedienteCAIMUS.ESTADO_RECHAZADO, ExpedienteCAIMUS.ESTADO_EN_REVISION))
+    if estado_final != ExpedienteCAIMUS.ESTADO_EN_REVISION:
+        transiciones.append((ExpedienteCAIMUS.ESTADO_EN_REVISION, estado_final))
+    return transiciones
+
+
+def _subir_pdfs(rng: random.Random, cantidad: int, tamano: int, anio: int) -> List[tuple]:
+    """Guarda ``cantidad`` PDF ficticios y devuelve ``[(nombre, sha256)]`` para compartirlos entre filas."""
+    archivos = []
+    for numero in range(cantidad):
+        datos = pdf_ficticio(tamano, f"Documento de prueba {numero} ({rng.random():.6f})")
+        nombre = default_storage.save(f"caimus/{anio}/semilla_{numero:03d}.pdf", ContentFile(datos))
+        archivos.append((nombre, hashlib.sha256(datos).hexdigest()))
+    return archivos
+
+
+def sembrar_caimus(
+    anios: int = 1,
+    asociaciones_por_anio: int = 10,
+    semilla: int = 0,
+    anio_inicial: Optional[int] = None,
+    tamano_pdf: int = 0,
+    archivos_pdf: int = 10,
+    lote: int = 1000,
+    usuario_comun: Optional[User] = None,
+) -> Dict[str, int]:
+    """Genera datos sintéticos completos y deterministas a partir de ``semilla``.
+
+    Si el año ya existe, las asociaciones nuevas se agregan a continuación de las que tiene. Con
+    ``tamano_pdf`` en cero los items e informes entregados apuntan a archivos inexistentes; si no,
+    se escriben ``archivos_pdf`` PDF de ese tamaño y todas las filas los comparten.
+    ``usuario_comun`` queda asignado a todas las asociaciones generadas.
+    """
+    rng = random.Random(semilla)
+    if anio_inicial is None:
+        anio_inicial = (Anio.objects.aggregate(maximo=Max("anio"))["maximo"] or 2000) + 1
+    estados = list(PESOS_ESTADO)
+    pesos = list(PESOS_ESTADO.values())
+    password = make_password(PASSWORD_SEMILLA)
+    grupo_asociacion, _ = Group.objects.get_or_create(name="Asociacion")
+    totales = dict.fromkeys(
+        ["anios", "usuarios", "asociaciones", "asignaciones", "expedientes", "items", "informes", "historial", "resoluciones"],
+        0,
+    )
+
+    with transaction.atomic():
+        for desplazamiento in range(anios):
+            anio, creado = Anio.objects.get_or_create(anio=anio_inicial + desplazamiento)
+            totales["anios"] += int(creado)
+            archivos = _subir_pdfs(rng, archivos_pdf, tamano_pdf, anio.anio) if tamano_pdf else [
+                (f"caimus/{anio.anio}/semilla_{numero:03d}.pdf", "") for numero in range(archivos_pdf)
+            ]
+            inicio = anio.asociaciones.count()
+            numeros = range(inicio, inicio + asociaciones_por_anio)
+
+            usuarios = User.objects.bulk_create(
+                [
+                    User(
+                        username=f"semilla-{anio.anio}-{numero:05d}",
+                        first_name="Usuaria",
+                        last_name=f"{numero:05d}",
+                        password=password,
+                    )
+                    for numero in numeros
+                ],
+                batch_size=lote,
+            )
+            User.groups.through.objects.bulk_create(
+                [User.groups.through(user_id=usuario.pk, group_id=grupo_asociacion.pk) for usuario in usuarios],
+                batch_size=lote,
+            )
+            asociaciones = Asociacion.objects.bulk_create(
+                [
+                    Asociacion(anio=anio, nombre=f"Asociación {anio.anio}-{numero:05d}", codigo=f"asoc-{numero:05d}")
+                    for numero in numeros
+                ],
+                batch_size=lote,
+            )
+            asignaciones = [
+                AsociacionUsuario(asociacion=asociacion, usuario=usuario, rol_en_asociacion="Representante")
+                for asociacion, usuario in zip(asociaciones, usuarios)
+            ]
+            if usuario_comun is not None:
+                asignaciones += [
+                    AsociacionUsuario(asociacion=asociacion, usuario=usuario_comun, rol_en_asociacion="Miembro")
+                    for asociacion in asociaciones
+                ]
+            AsociacionUsuario.objects.bulk_create(asignaciones, batch_size=lote)
+
+            expedientes = ExpedienteCAIMUS.objects.bulk_create(
+                [
+                    ExpedienteCAIMUS(
+                        asociacion=asociacion,
+                        institucion=asociacion.nombre,
+                        representante_legal=f"{usuario.first_name} {usuario.last_name}",
+                        estado=rng.choices(estados, pesos)[0],
+                        creado_por=usuario,
+                        actualizado_por=usuario,
+                    )
+                    for asociacion, usuario in zip(asociaciones, usuarios)
+                ],
+                batch_size=lote,
+            )
+
+            items = []
+            informes = []
+            historial_expedientes = []
+            resoluciones = []
+            for expediente, usuario in zip(expedientes, usuarios):
+                completo = expediente.estado != ExpedienteCAIMUS.ESTADO_BORRADOR
+                for definicion in CHECKLIST_ITEMS:
+                    nombre, sha256 = rng.choice(archivos) if archivos and (completo or rng.random() < 0.5) else ("", "")
+                    items.append(
+                        ItemChecklistCAIMUS(
+                            expediente=expediente,
+                            numero=definicion.numero,
+                            seccion=definicion.seccion,
+                            titulo=definicion.titulo,
+                            hint=definicion.hint,
+                            pdf=nombre or None,
+                            pdf_sha256=sha256,
+                            entregado=bool(nombre),
+                        )
+                    )
+                for anterior, nuevo in _historial(rng, expediente.estado):
+                    historial_expedientes.append(
+                        ExpedienteEstadoHistorial(
+                            expediente=expediente,
+                            estado_anterior=anterior,
+                            estado_nuevo=nuevo,
+                            observacion="Falta documentación." if nuevo == ExpedienteCAIMUS.ESTADO_RECHAZADO else "",
+                            cambiado_por=usuario,
+                        )
+                    )
+                if expediente.estado == ExpedienteCAIMUS.ESTADO_APROBADO:
+                    resoluciones.append(
+                        ResolucionExpediente(
+                            expediente=expediente,
+                            correlativo="",
+                            fecha_emision=date(anio.anio, rng.randint(1, 12), rng.randint(1, 28)),
+                            contenido_snapshot={"asociacion": expediente.asociacion.nombre, "anio": anio.anio},
+                        )
+                    )
+                for mes, _label in MESES_CHOICES:
+                    estado = rng.choices(estados, pesos)[0]
+                    nombre = rng.choice(archivos)[0] if archivos and estado != InformeMensual.ESTADO_BORRADOR else ""
+                    informes.append(
+                        InformeMensual(
+                            asociacion=expediente.asociacion,
+                            mes=mes,
+                            estado=estado,
+                            pdf=nombre or None,
+                            creado_por=usuario,
+                            actualizado_por=usuario,
+                        )
+                    )
+
+            ultimo = (
+                ResolucionExpediente.objects.filter(expediente__asociacion__anio=anio).order_by("-correlativo").first()
+            )
+            secuencia = int(ultimo.correlativo.split("-")[-1]) if ultimo else 0
+            resoluciones.sort(key=lambda resolucion: resolucion.fecha_emision)
+            for secuencia, resolucion in enumerate(resoluciones, start=secuencia + 1):
+                resolucion.correlativo = f"UPCV-CAIMUS-{anio.anio}-{secuencia:04d}"
+
+            ItemChecklistCAIMUS.objects.bulk_create(items, batch_size=lote)
+            ExpedienteEstadoHistorial.objects.bulk_create(historial_expedientes, batch_size=lote)
+            ResolucionExpediente.objects.bulk_create(resoluciones, batch_size=lote)
+            informes = InformeMensual.objects.bulk_create(informes, batch_size=lote)
+
+            historial_informes = []
+            for informe in informes:
+                usuario_id = informe.creado_por_id
+                for anterior, nuevo in _historial(rng, informe.estado):
+                    historial_informes.append(
+                        InformeEstadoHistorial(
+                            informe=informe,
+                            estado_anterior=anterior,
+                            estado_nuevo=nuevo,
+                            observacion="Falta firma." if nuevo == InformeMensual.ESTADO_RECHAZADO else "",
+                            cambiado_por_id=usuario_id,
+                        )
+                    )
+            InformeEstadoHistorial.objects.bulk_create(historial_informes, batch_size=lote)
+            invalidar_matriz(anio.pk)
+            reconstruir_resumenes(anio.pk)
+
+            totales["usuarios"] += len(usuarios)
+            totales["asociaciones"] += len(asociaciones)
+            totales["asignaciones"] += len(asignaciones)
+            totales["expedientes"] += len(expedientes)
+            totales["items"] += len(items)
+            totales["informes"] += len(informes)
+            totales["historial"] += len(historial_expedientes) + len(historial_informes)
+            totales["resoluciones"] += len(resoluciones)
+    return totales
@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+from django.dispatch import Signal
+
+# Se envía cada vez que se genera un PDF, con ``documento`` ("resolucion" o "dossier"),
+# ``motor`` y ``duracion`` en segundos. Lo escucha monitoreo_app para sus métricas.
+pdf_generado = Signal()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.formats import date_format
+from django.utils.html import format_html, format_html_join
+
+from almacen_app.tablas import Columna, TablaServidor, si_no
+
+
+def botones(*enlaces) -> str:
+    """Grupo de botones con ``(texto, url)`` como en las columnas de acciones de los listados."""
+    return format_html(
+        '<div class="d-flex gap-2 flex-wrap">{}</div>',
+        format_html_join("", '<a class="btn btn-primary btn-sm" href="{}">{}</a>', ((url, texto) for texto, url in enlaces)),
+    )
+
+
+def fecha(valor) -> str:
+    return date_format(timezone.localtime(valor), "SHORT_DATE_FORMAT") if valor else ""
+
+
+def nombre_usuario(usuario) -> str:
+    return usuario.get_full_name() or usuario.username
+
+
+COLUMNA_USUARIO = Columna(
+    "Usuario",
+    "usuario__username",
+    buscable=True,
+    buscar_en=("usuario__username", "usuario__first_name", "usuario__last_name"),
+    valor=lambda asignacion: nombre_usuario(asignacion.usuario),
+)
+
+
+class AniosTabla(TablaServidor):
+    columnas = (
+        Columna("Año", "anio", buscable=True),
+        Columna("Activo", "activo", valor=lambda anio: si_no(anio.activo)),
+        Columna(
+            "Acciones",
+            valor=lambda anio: botones(
+                ("Editar", reverse("asociaciones:anio_edit", args=[anio.pk])),
+                ("Asociaciones", reverse("asociaciones:asociacion_list", args=[anio.pk])),
+            ),
+        ),
+    )
+    orden_inicial = ((0, "desc"),)
+    vacio = "No hay años registrados."
+
+
+class AsociacionesTabla(TablaServidor):
+    columnas = (
+        Columna("Nombre", "nombre", buscable=True),
+        Columna("Código", "codigo", buscable=True),
+        Columna("Activo", "activo", valor=lambda asociacion: si_no(asociacion.activo)),
+        Columna("Documentos", "resumen__items_entregados"),
+        Columna("Informes aprobados", "resumen__informes_aprobado"),
+        Columna("Rechazos", "resumen__rechazos"),
+        Columna(
+            "Última entrega",
+            "resumen__ultima_entrega",
+            valor=lambda asociacion: fecha(getattr(getattr(asociacion, "resumen", None), "ultima_entrega", None)),
+        ),
+        Columna(
+            "Acciones",
+            valor=lambda asociacion: botones(
+                ("Editar", reverse("asociaciones:asociacion_edit", args=[asociacion.pk])),
+                ("Usuarios", reverse("asociaciones:asociacion_usuarios", args=[asociacion.pk])),
+                ("Expediente", reverse("asociaciones:expediente_caimus", args=[asociacion.pk])),
+                ("Informes", reverse("asociaciones:informes_mensuales", args=[asociacion.pk])),
+            ),
+        ),
+    )
+    # Los avances salen de ``ResumenAsociacion``; ordenar por ellos no recalcula nada.
+    select_related = ("resumen",)
+    vacio = "No hay asociaciones registradas."
+
+
+class AsignacionesTabla(TablaServidor):
+    columnas = (
+        Columna(
+            "Asociación",
+            "asociacion__nombre",
+            buscable=True,
+            valor=lambda asignacion: f"{asignacion.asociacion.nombre} ({asignacion.asociacion.anio.anio})",
+        ),
+        COLUMNA_USUARIO,
+        Columna("Rol", "rol_en_asociacion", buscable=True),
+        Columna("Activo", "activo", valor=lambda asignacion: si_no(asignacion.activo)),
+    )
+    select_related = ("asociacion", "asociacion__anio", "usuario")
+    campos_extra = ("asociacion__anio__anio",)
+    orden_inicial = ()
+    vacio = "No hay asignaciones."
+
+
+class UsuariosAsociacionTabla(TablaServidor):
+    columnas = (
+        COLUMNA_USUARIO,
+        Columna("Rol", "rol_en_asociacion", buscable=True),
+        Columna("Activo", "activo", valor=lambda asignacion: si_no(asignacion.activo)),
+    )
+    select_related = ("usuario",)
+    orden_inicial = ()
+    vacio = "No hay usuarios asignados."
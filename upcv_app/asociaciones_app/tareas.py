@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from typing import Callable
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_cola: "queue.Queue[tuple[Callable, tuple, dict]]" = queue.Queue()
+_hilo: threading.Thread | None = None
+_hilo_lock = threading.Lock()
+
+
+def encolar_tarea(funcion: Callable, *args, **kwargs) -> None:
+    """Ejecuta ``funcion`` en el hilo de trabajo del proceso.
+
+    Con ``CAIMUS_TAREAS_SINCRONAS = True`` la tarea se ejecuta en línea,
+    útil para pruebas y comandos de mantenimiento.
+    """
+    if getattr(settings, "CAIMUS_TAREAS_SINCRONAS", False):
+        funcion(*args, **kwargs)
+        return
+    _asegurar_hilo()
+    _cola.put((funcion, args, kwargs))
+
+
+def tareas_pendientes() -> int:
+    return _cola.qsize()
+
+
+def _asegurar_hilo() -> None:
+    global _hilo
+    with _hilo_lock:
+        if _hilo is None or not _hilo.is_alive():
+            _hilo = threading.Thread(target=_trabajador, name="caimus-tareas", daemon=True)
+            _hilo.start()
+
+
+def _trabajador() -> None:
+    while True:
+        funcion, args, kwargs = _cola.get()
+        close_old_connections()
+        try:
+            funcion(*args, **kwargs)
+        except Exception:
+            logger.exception("Error al ejecutar la tarea %s", getattr(funcion, "__name__", funcion))
+        finally:
+            close_old_connections()
+            _cola.task_done()
@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import re
+import shutil
+import tempfile
+from datetime import date
+
+from django.contrib.auth.models import Group, User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, reverse
+
+from almacen_app import urls as almacen_urls
+from almacen_app.models import Institucion
+from monitoreo_app.sql import huellas_repetidas
+
+from . import urls as asociaciones_urls
+from .dossier import generar_dossier
+from .models import (
+    Anio,
+    AsociacionUsuario,
+    ExpedienteCAIMUS,
+    ExpedienteEstadoHistorial,
+    InformeEstadoHistorial,
+    InformeMensual,
+    ResolucionExpediente,
+)
+from .semillas import sembrar_caimus
+
+# Consultas máximas por vista (GET, cualquier rol). No deben crecer con el volumen de datos.
+PRESUPUESTOS = {
+    "asociaciones:anios_list": 6,
+    "asociaciones:anio_create": 6,
+    "asociaciones:anio_edit": 7,
+    "asociaciones:asociacion_list": 7,
+    "asociaciones:asociacion_create": 8,
+    "asociaciones:asociacion_edit": 9,
+    "asociaciones:asociacion_usuarios": 8,
+    "asociaciones:mis_asociaciones": 7,
+    "asociaciones:expediente_caimus": 15,
+    "asociaciones:informes_mensuales": 12,
+    "asociaciones:expediente_revision": 8,
+    "asociaciones:resolucion_pdf": 8,
+    "asociaciones:dossier_pdf": 5,
+    "asociaciones:bandeja_revision": 8,
+    "asociaciones:informes_revision_masiva": 8,
+    "asociaciones:asignaciones_list": 7,
+    "asociaciones:matriz_cumplimiento": 9,
+    "asociaciones:autocompletar_usuarios": 4,
+    "asociaciones:autocompletar_asociaciones": 4,
+    "asociaciones:autocompletar_anios": 4,
+    "almacen:home": 5,
+    "almacen:dahsboard": 9,
+    "almacen:signin": 6,
+    "almacen:logout": 4,
+    "almacen:acceso_denegado": 6,
+    "almacen:user_create": 7,
+    "almacen:user_edit": 10,
+    "almacen:user_delete": 7,
+    "almacen:password_change": 6,
+    "almacen:password_change_done": 6,
+    "almacen:editar_institucion": 7,
+}
+
+# Vistas que solo aceptan POST: un GET responde 405 sin hacer el trabajo de la vista, así que no se miden.
+SOLO_POST = {
+    "asociaciones:item_upload",
+    "asociaciones:item_observacion",
+    "asociaciones:informe_upload",
+    "asociaciones:informe_observacion",
+    "asociaciones:informe_estado",
+    "asociaciones:expedientes_aprobar",
+}
+
+# Respuesta esperada de cada vista por rol cuando no es 200. Las vistas de administración se miden con
+# el administrador; con el usuario de asociación solo se comprueba que lo rechacen.
+ESTADOS_ESPERADOS = {
+    "admin": {"almacen:logout": 302, "almacen:acceso_denegado": 403},
+    "asociado": {
+        "almacen:logout": 302,
+        "almacen:acceso_denegado": 403,
+        **dict.fromkeys(
+            [
+                "almacen:dahsboard",
+                "almacen:user_create",
+                "almacen:user_edit",
+                "almacen:user_delete",
+                "almacen:editar_institucion",
+            ],
+            302,
+        ),
+        **dict.fromkeys(
+            [
+                "asociaciones:anios_list",
+                "asociaciones:anio_create",
+                "asociaciones:anio_edit",
+                "asociaciones:asociacion_list",
+                "asociaciones:asociacion_create",
+                "asociaciones:asociacion_edit",
+                "asociaciones:asociacion_usuarios",
+                "asociaciones:asignaciones_list",
+                "asociaciones:expediente_revision",
+                "asociaciones:bandeja_revision",
+                "asociaciones:informes_revision_masiva",
+                "asociaciones:matriz_cumplimiento",
+                "asociaciones:autocompletar_usuarios",
+                "asociaciones:autocompletar_asociaciones",
+                "asociaciones:autocompletar_anios",
+            ],
+            403,
+        ),
+    },
+}
+
+# Consultas máximas de las respuestas JSON de las vistas con tabla servida por páginas (``?draw=``).
+PRESUPUESTOS_TABLAS = {
+    "asociaciones:anios_list": 6,
+    "asociaciones:asociacion_list": 7,
+    "asociaciones:asociacion_usuarios": 7,
+    "asociaciones:asignaciones_list": 6,
+    "almacen:user_create": 7,
+    "almacen:user_edit": 7,
+}
+
+# Objeto al que apunta el parámetro ``pk`` de cada vista.
+PK_POR_VISTA = {
+    "asociaciones:anio_edit": "anio",
+    "asociaciones:asociacion_edit": "asociacion",
+    "asociaciones:asociacion_usuarios": "asociacion",
+    "asociaciones:expediente_caimus": "asociacion",
+    "asociaciones:informes_mensuales": "asociacion",
+    "asociaciones:expediente_revision": "expediente",
+    "asociaciones:resolucion_pdf": "expediente",
+    "asociaciones:dossier_pdf": "expediente",
+}
+
+TAMANO_CHICO = 2
+TAMANO_GRANDE = 12
+
+def consultas_repetidas(consultas) -> list:
+    return huellas_repetidas(consulta["sql"] for consulta in consultas)
+
+
+def nombres_de_url(patrones, namespace: str) -> list:
+    nombres = []
+    for patron in patrones:
+        if isinstance(patron, URLResolver):
+            nombres.extend(nombres_de_url(patron.url_patterns, namespace))
+        elif isinstance(patron, URLPattern) and patron.name:
+            nombres.append(f"{namespace}:{patron.name}")
+    return nombres
+
+
+def sembrar(cantidad: int, anio: Anio, usuario_asociacion: User, objetivo: dict) -> None:
+    """Agrega ``cantidad`` asociaciones con el generador sintético y hace crecer las listas del objetivo."""
+    sembrar_caimus(asociaciones_por_anio=cantidad, anio_inicial=anio.anio, semilla=cantidad, usuario_comun=usuario_asociacion)
+    if not objetivo:
+        asociacion = anio.asociaciones.order_by("pk").first()
+        objetivo["asociacion"] = asociacion
+        objetivo["expediente"] = asociacion.expediente_caimus
+        objetivo["item"] = asociacion.expediente_caimus.items.order_by("numero").first()
+        objetivo["usuario"] = asociacion.usuarios.exclude(usuario=usuario_asociacion).get().usuario
+
+    asociacion = objetivo["asociacion"]
+    expediente = objetivo["expediente"]
+    informe = asociacion.informes_mensuales.get(mes=1)
+    usuarios = list(User.objects.filter(username__startswith=f"semilla-{anio.anio}-").order_by("-pk")[:cantidad])
+    AsociacionUsuario.objects.bulk_create(
+        [
+            AsociacionUsuario(asociacion=asociacion, usuario=usuario, rol_en_asociacion="Colaborador", activo=False)
+            for usuario in usuarios
+            if usuario.pk not in set(asociacion.usuarios.values_list("usuario_id", flat=True))
+        ]
+    )
+    ExpedienteEstadoHistorial.objects.bulk_create(
+        [
+            ExpedienteEstadoHistorial(
+                expediente=expediente,
+                estado_anterior=ExpedienteCAIMUS.ESTADO_BORRADOR,
+                estado_nuevo=ExpedienteCAIMUS.ESTADO_EN_REVISION,
+                cambiado_por=usuario,
+            )
+            for usuario in usuarios
+        ]
+    )
+    InformeEstadoHistorial.objects.bulk_create(
+        [
+            InformeEstadoHistorial(
+                informe=informe,
+                estado_anterior=InformeMensual.ESTADO_EN_REVISION,
+                estado_nuevo=InformeMensual.ESTADO_RECHAZADO,
+                observacion="Falta firma",
+                cambiado_por=usuario,
+            )
+            for usuario in usuarios
+        ]
+    )
+
+
+class PresupuestoConsultasTests(TestCase):
+    """Recorre todas las URLs de ``asociaciones`` y ``almacen`` con dos volúmenes de datos.
+
+    Cada vista debe quedar dentro de su presupuesto y hacer las mismas consultas con pocos o muchos
+    registros; si no, el error lista las consultas repetidas (el patrón típico de un N+1).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        admin_group, _ = Group.objects.get_or_create(name="Administrador")
+        asociacion_group, _ = Group.objects.get_or_create(name="Asociacion")
+        cls.admin = User.objects.create_user(username="admin", password="pass123")
+        cls.admin.groups.add(admin_group)
+        cls.asociado = User.objects.create_user(username="asociado", password="pass123")
+        cls.asociado.groups.add(asociacion_group)
+        Institucion.objects.create(nombre="UPCV", direccion="Zona 1", telefono="22222222")
+        cls.anio = Anio.objects.create(anio=2026)
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root, CAIMUS_MOTOR_PDF="xhtml2pdf")
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.objetivo = {}
+        sembrar(TAMANO_CHICO, self.anio, self.asociado, self.objetivo)
+        # Expediente aprobado, con resolución y dossier ya generados: las descargas sirven el PDF.
+        expediente = self.objetivo["expediente"]
+        ExpedienteCAIMUS.objects.filter(pk=expediente.pk).update(estado=ExpedienteCAIMUS.ESTADO_APROBADO)
+        ResolucionExpediente.objects.get_or_create(
+            expediente=expediente,
+            defaults={"correlativo": "UPCV-CAIMUS-PRUEBA-0001", "fecha_emision": date(self.anio.anio, 1, 15)},
+        )
+        generar_dossier(expediente.pk)
+
+    def urls(self):
+        nombres = nombres_de_url(asociaciones_urls.urlpatterns, "asociaciones")
+        nombres += nombres_de_url(almacen_urls.urlpatterns, "almacen")
+        sin_presupuesto = sorted(set(nombres) - PRESUPUESTOS.keys() - SOLO_POST)
+        self.assertFalse(sin_presupuesto, f"Vistas sin presupuesto de consultas: {sin_presupuesto}")
+        return {
+            nombre: reverse(nombre, kwargs=self.argumentos(nombre)) for nombre in nombres if nombre not in SOLO_POST
+        }
+
+    def argumentos(self, nombre: str) -> dict:
+        valores = {
+            "anio_id": self.anio.pk,
+            "asociacion_id": self.objetivo["asociacion"].pk,
+            "expediente_id": self.objetivo["expediente"].pk,
+            "item_id": self.objetivo["item"].pk,
+            "user_id": self.objetivo["usuario"].pk,
+            "mes": 1,
+        }
+        if nombre in PK_POR_VISTA:
+            valores["pk"] = {
+                "anio": self.anio,
+                "asociacion": self.objetivo["asociacion"],
+                "expediente": self.objetivo["expediente"],
+            }[PK_POR_VISTA[nombre]].pk
+        parametros = re.findall(r"<(?:\w+:)?(\w+)>", self._ruta(nombre))
+        return {parametro: valores[parametro] for parametro in parametros}
+
+    def _ruta(self, nombre: str) -> str:
+        namespace, nombre_corto = nombre.split(":")
+        modulo = asociaciones_urls if namespace == "asociaciones" else almacen_urls
+        for patron in modulo.urlpatterns:
+            if isinstance(patron, URLPattern) and patron.name == nombre_corto:
+                return str(patron.pattern)
+        raise AssertionError(f"No se encontró la ruta de {nombre}")
+
+    def medir(self, usuario: User) -> dict:
+        mediciones = {}
+        esperados = ESTADOS_ESPERADOS[usuario.username]
+        for nombre, url in self.urls().items():
+            self.client.force_login(usuario)
+            with CaptureQueriesContext(connection) as contexto:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, esperados.get(nombre, 200), f"{nombre} como {usuario.username}")
+            mediciones[nombre] = contexto.captured_queries
+            if nombre in PRESUPUESTOS_TABLAS:
+                with CaptureQueriesContext(connection) as contexto:
+                    self.client.get(url, {"draw": 1, "length": 100, "search[value]": "a"})
+                mediciones[f"{nombre} (datos)"] = contexto.captured_queries
+        return mediciones
+
+    def verificar_presupuestos(self, usuario: User) -> None:
+        chico = self.medir(usuario)
+        sembrar(TAMANO_GRANDE - TAMANO_CHICO, self.anio, self.asociado, self.objetivo)
+        grande = self.medir(usuario)
+
+        errores = []
+        for nombre, consultas in grande.items():
+            if nombre.endswith(" (datos)"):
+                presupuesto = PRESUPUESTOS_TABLAS[nombre.removesuffix(" (datos)")]
+            else:
+                presupuesto = PRESUPUESTOS[nombre]
+            if len(consultas) <= presupuesto and len(consultas) == len(chico[nombre]):
+                continue
+            detalle = "\n".join(f"      {cantidad}x {huella}" for cantidad, huella in consultas_repetidas(consultas))
+            errores.append(
+                f"  {nombre}: {len(chico[nombre])} consultas con {TAMANO_CHICO} asociaciones, "
+                f"{len(consultas)} con {TAMANO_GRANDE} (presupuesto {presupuesto})\n{detalle}"
+            )
+        self.assertFalse(errores, f"Presupuesto de consultas excedido para {usuario.username}:\n" + "\n".join(errores))
+
+    def test_presupuestos_como_administrador(self):
+        self.verificar_presupuestos(self.admin)
+
+    def test_presupuestos_como_asociacion(self):
+        self.verificar_presupuestos(self.asociado)
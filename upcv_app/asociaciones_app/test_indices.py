@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+
+from .bandeja import ORDEN_PREDETERMINADO, ORDENES
+from .models import (
+    Anio,
+    Asociacion,
+    AsociacionUsuario,
+    ExpedienteCAIMUS,
+    ExpedienteEstadoHistorial,
+    InformeEstadoHistorial,
+    InformeMensual,
+)
+from .paginacion import decodificar_cursor, filtro_despues, paginar_keyset
+from .permissions import get_asociaciones_usuario
+
+ESTADOS_EXPEDIENTE = [estado for estado, _label in ExpedienteCAIMUS.ESTADOS]
+ESTADOS_INFORME = [estado for estado, _label in InformeMensual.ESTADOS]
+
+
+class PlanesConsultaTests(TestCase):
+    """Comprueba con ``EXPLAIN`` que las consultas frecuentes usan los índices de las migraciones 0006 y 0007."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuarios = User.objects.bulk_create([User(username=f"usuario{numero}") for numero in range(60)])
+        anios = [Anio.objects.create(anio=anio) for anio in (2024, 2025, 2026)]
+        asociaciones = Asociacion.objects.bulk_create(
+            [
+                Asociacion(anio=anio, nombre=f"Asociación {numero}", codigo=f"a{numero}", activo=numero % 7 != 0)
+                for anio in anios
+                for numero in range(40)
+            ]
+        )
+        AsociacionUsuario.objects.bulk_create(
+            [
+                AsociacionUsuario(
+                    asociacion=asociacion,
+                    usuario=cls.usuarios[indice % len(cls.usuarios)],
+                    rol_en_asociacion="Miembro",
+                    activo=indice % 5 != 0,
+                )
+                for indice, asociacion in enumerate(asociaciones)
+            ]
+        )
+        expedientes = ExpedienteCAIMUS.objects.bulk_create(
+            [
+                ExpedienteCAIMUS(asociacion=asociacion, estado=ESTADOS_EXPEDIENTE[indice % len(ESTADOS_EXPEDIENTE)])
+                for indice, asociacion in enumerate(asociaciones)
+            ]
+        )
+        informes = InformeMensual.objects.bulk_create(
+            [
+                InformeMensual(asociacion=asociacion, mes=mes, estado=ESTADOS_INFORME[(indice + mes) % len(ESTADOS_INFORME)])
+                for indice, asociacion in enumerate(asociaciones)
+                for mes in range(1, 13)
+            ]
+        )
+        ExpedienteEstadoHistorial.objects.bulk_create(
+            [
+                ExpedienteEstadoHistorial(
+                    expediente=expediente,
+                    estado_anterior=ExpedienteCAIMUS.ESTADO_BORRADOR,
+                    estado_nuevo=ExpedienteCAIMUS.ESTADO_EN_REVISION,
+                )
+                for expediente in expedientes
+                for _ in range(3)
+            ]
+        )
+        InformeEstadoHistorial.objects.bulk_create(
+            [
+                InformeEstadoHistorial(
+                    informe=informe,
+                    estado_anterior=InformeMensual.ESTADO_BORRADOR,
+                    estado_nuevo=InformeMensual.ESTADO_EN_REVISION,
+                )
+                for informe in informes[::2]
+            ]
+        )
+        cls.expediente = expedientes[0]
+        cls.informe = informes[0]
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            # Con pocas filas PostgreSQL prefiere recorrer la tabla; interesa saber si el índice es elegible.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertUsaIndice(self, queryset, *indices):
+        plan = queryset.explain()
+        self.assertTrue(
+            any(indice in plan for indice in indices),
+            f"Ninguno de {indices} aparece en el plan:\n{plan}",
+        )
+
+    def test_asociaciones_del_usuario(self):
+        self.assertUsaIndice(get_asociaciones_usuario(self.usuarios[1]), "asignacion_usuario_idx")
+
+    def test_bandeja_por_estado(self):
+        queryset = ExpedienteCAIMUS.objects.filter(estado=ExpedienteCAIMUS.ESTADO_APROBADO)
+        self.assertUsaIndice(queryset, "expediente_estado_idx", "expediente_bandeja_idx")
+
+    def test_bandeja_paginada(self):
+        orden = ORDENES[ORDEN_PREDETERMINADO]
+        pagina = paginar_keyset(ExpedienteCAIMUS.objects.all(), orden, None, 2)
+        queryset = ExpedienteCAIMUS.objects.order_by("estado", "-actualizado_en", "-id").filter(
+            filtro_despues(orden, decodificar_cursor(pagina.cursor_siguiente, ExpedienteCAIMUS, orden))
+        )[:3]
+        self.assertUsaIndice(queryset, "expediente_bandeja_idx")
+
+    def test_bandeja_en_revision(self):
+        queryset = ExpedienteCAIMUS.objects.filter(estado=ExpedienteCAIMUS.ESTADO_EN_REVISION).order_by("-actualizado_en")
+        self.assertUsaIndice(queryset, "expediente_bandeja_idx")
+
+    def test_cola_revision_informes(self):
+        queryset = InformeMensual.objects.filter(estado=InformeMensual.ESTADO_EN_REVISION).order_by("asociacion", "mes")
+        self.assertUsaIndice(queryset, "informe_en_revision_idx", "informe_estado_idx")
+
+    def test_historial_expediente(self):
+        self.assertUsaIndice(self.expediente.historial_estados.all(), "exp_historial_fecha_idx")
+
+    def test_historial_informe(self):
+        self.assertUsaIndice(self.informe.historial_estados.all(), "inf_historial_fecha_idx")
@@ -1,20 +1,56 @@
 from __future__ import annotations
 
-from datetime import date
+import importlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
+from django.apps import apps as global_apps
 from django.contrib.auth.models import Group, User
+from django.contrib.messages import get_messages
+from django.core.cache import caches
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.test import Client, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from pypdf import PdfReader, PdfWriter
 
+from .analitica import actualizar_ciclos, reconstruir_ciclos
+from .apertura import abrir_anio
+from .carga import ejecutar_carga
+from .dossier import generar_dossier
+from .management.commands.benchmark_resolucion_pdf import comparar_con_linea_base, percentil
+from .matriz import filas_matriz
 from .models import (
     Anio,
     Asociacion,
     AsociacionUsuario,
+    AvanceCicloRevision,
+    CicloRevision,
     ExpedienteCAIMUS,
+    ExpedienteEstadoHistorial,
+    InformeEstadoHistorial,
     InformeMensual,
+    ItemChecklistCAIMUS,
     ResolucionExpediente,
+    ResumenAsociacion,
+    crear_informes_mensuales,
+    crear_items_expediente,
+    generar_correlativo,
+    reservar_correlativos,
 )
+from .paginacion import codificar_cursor, decodificar_cursor
+from .semillas import pdf_ficticio, sembrar_caimus
 
 
 class AsociacionesTests(TestCase):
@@ -127,6 +163,29 @@ class AsociacionesTests(TestCase):
         item_sec2.refresh_from_db()
         self.assertEqual(item_sec2.observaciones, "Nota")
 
+    def test_listados_admin_sirven_filas_por_json(self):
+        otro_anio = Anio.objects.create(anio=2027)
+        Asociacion.objects.create(anio=otro_anio, nombre="Asociacion Z", codigo="AZ")
+        AsociacionUsuario.objects.create(asociacion=self.asociacion, usuario=self.user, rol_en_asociacion="Presidenta")
+        client = Client()
+        client.login(username="admin", password="pass123")
+
+        url = reverse("asociaciones:asociacion_list", args=[self.anio.pk])
+        response = client.get(url)
+        self.assertContains(response, "data-tabla-servidor")
+        self.assertNotContains(response, "Asociacion X")
+        datos = client.get(url, {"draw": "1", "order[0][column]": "1", "order[0][dir]": "desc"}).json()
+        self.assertEqual(datos["recordsTotal"], 2)
+        self.assertEqual([fila[1] for fila in datos["data"]], ["AY", "AX"])
+
+        datos = client.get(reverse("asociaciones:asignaciones_list"), {"anio": otro_anio.pk, "draw": "1"}).json()
+        self.assertEqual(datos["recordsTotal"], 0)
+        datos = client.get(reverse("asociaciones:asignaciones_list"), {"anio": self.anio.pk, "draw": "1"}).json()
+        self.assertEqual(datos["data"], [["Asociacion X (2026)", "user1", "Presidenta", "Sí"]])
+
+        url = reverse("asociaciones:asociacion_usuarios", args=[self.asociacion_otra.pk])
+        self.assertEqual(client.get(url, {"draw": "1", "search[value]": "user1"}).json()["recordsTotal"], 0)
+
     def test_asociacion_no_puede_acceder_vistas_admin(self):
         AsociacionUsuario.objects.create(asociacion=self.asociacion, usuario=self.user, rol_en_asociacion="Miembro")
         expediente = ExpedienteCAIMUS.objects.create(asociacion=self.asociacion, creado_por=self.admin_user)
@@ -232,3 +291,997 @@ class AsociacionesTests(TestCase):
         self.assertTrue(informe.pdf)
         self.assertEqual(informe.estado, InformeMensual.ESTADO_EN_REVISION)
         self.assertEqual(informe.observaciones_usuario, "Obs")
+
+
+def pdf_de_prueba(paginas: int = 1) -> bytes:
+    writer = PdfWriter()
+    for _ in range(paginas):
+        writer.add_blank_page(width=200, height=200)
+    salida = BytesIO()
+    writer.write(salida)
+    return salida.getvalue()
+
+
+class DossierTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root, CAIMUS_TAREAS_SINCRONAS=True)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.asociacion_group, _ = Group.objects.get_or_create(name="Asociacion")
+        self.user = User.objects.create_user(username="user1", password="pass123")
+        self.user.groups.add(self.asociacion_group)
+        anio = Anio.objects.create(anio=2026)
+        self.asociacion = Asociacion.objects.create(anio=anio, nombre="Asociacion X", codigo="AX")
+        AsociacionUsuario.objects.create(asociacion=self.asociacion, usuario=self.user, rol_en_asociacion="Miembro")
+        self.expediente = ExpedienteCAIMUS.objects.create(asociacion=self.asociacion, creado_por=self.user)
+        self.item1 = self.expediente.items.create(numero=1, seccion=1, titulo="Doc 1", hint="")
+        self.item2 = self.expediente.items.create(numero=2, seccion=1, titulo="Doc 2", hint="")
+
+    def _subir(self, item, contenido):
+        client = Client()
+        client.login(username="user1", password="pass123")
+        archivo = SimpleUploadedFile("doc.pdf", contenido, content_type="application/pdf")
+        with self.captureOnCommitCallbacks(execute=True):
+            client.post(reverse("asociaciones:item_upload", args=[self.expediente.pk, item.pk]), {"pdf": archivo})
+
+    def test_subida_genera_dossier_con_marcadores(self):
+        self._subir(self.item1, pdf_de_prueba(2))
+        self._subir(self.item2, pdf_de_prueba(1))
+        self.item1.refresh_from_db()
+        self.assertEqual(len(self.item1.pdf_sha256), 64)
+        self.expediente.refresh_from_db()
+        self.assertTrue(self.expediente.dossier_pdf)
+        with self.expediente.dossier_pdf.open("rb") as archivo:
+            reader = PdfReader(BytesIO(archivo.read()))
+        self.assertEqual(len(reader.pages), 3)
+        self.assertEqual([marcador.title for marcador in reader.outline], ["1. Doc 1", "2. Doc 2"])
+
+    def test_dossier_solo_se_regenera_si_cambia_un_item(self):
+        self._subir(self.item1, pdf_de_prueba(1))
+        self.expediente.refresh_from_db()
+        nombre = self.expediente.dossier_pdf.name
+        self.assertFalse(generar_dossier(self.expediente.pk))
+        self._subir(self.item2, pdf_de_prueba(1))
+        self.expediente.refresh_from_db()
+        self.assertNotEqual(self.expediente.dossier_pdf.name, nombre)
+
+    def test_comando_genera_los_dossieres_faltantes(self):
+        # Documento subido antes de existir el dossier: nadie encoló su generación.
+        self.item1.pdf = SimpleUploadedFile("previo.pdf", pdf_de_prueba(1), content_type="application/pdf")
+        self.item1.save()
+        vacio = ExpedienteCAIMUS.objects.create(
+            asociacion=Asociacion.objects.create(anio=self.asociacion.anio, nombre="Sin documentos", codigo="SD")
+        )
+
+        salida = StringIO()
+        call_command("generar_dossieres", stdout=salida)
+        self.expediente.refresh_from_db()
+        self.assertTrue(self.expediente.dossier_pdf)
+        self.assertIn("generados: 1", salida.getvalue())
+        vacio.refresh_from_db()
+        self.assertFalse(vacio.dossier_pdf)
+
+        salida = StringIO()
+        call_command("generar_dossieres", "--todos", stdout=salida)
+        self.assertIn("generados: 0, sin cambios: 1", salida.getvalue())
+
+    def test_descarga_dossier_requiere_acceso(self):
+        self._subir(self.item1, pdf_de_prueba(1))
+        otro = User.objects.create_user(username="user2", password="pass123")
+        otro.groups.add(self.asociacion_group)
+        client = Client()
+        client.login(username="user2", password="pass123")
+        response = client.get(reverse("asociaciones:dossier_pdf", args=[self.expediente.pk]))
+        self.assertEqual(response.status_code, 403)
+        client.login(username="user1", password="pass123")
+        response = client.get(reverse("asociaciones:dossier_pdf", args=[self.expediente.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+
+
+class BenchmarkResolucionTests(TestCase):
+    def test_percentil_por_rango_mas_cercano(self):
+        valores = [float(valor) for valor in range(1, 101)]
+        self.assertEqual(percentil(valores, 50), 50.0)
+        self.assertEqual(percentil(valores, 95), 95.0)
+        self.assertEqual(percentil([7.0], 99), 7.0)
+
+    def test_comparar_con_linea_base_detecta_regresiones(self):
+        base = {"xhtml2pdf/frio": {"p50_ms": 100.0, "p95_ms": 150.0, "pico_tracemalloc_kb": 1000.0}}
+        actual = {"xhtml2pdf/frio": {"p50_ms": 110.0, "p95_ms": 200.0, "pico_tracemalloc_kb": 1000.0}}
+        regresiones = comparar_con_linea_base(actual, base, 0.25)
+        self.assertEqual(len(regresiones), 1)
+        self.assertIn("p95_ms", regresiones[0])
+
+    def test_comando_guarda_y_compara_linea_base(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        ruta = os.path.join(directorio, "resolucion.json")
+        argumentos = ["--motores", "xhtml2pdf", "--iteraciones", "1", "--baseline", ruta]
+        call_command("benchmark_resolucion_pdf", *argumentos, stdout=StringIO())
+        with open(ruta, encoding="utf-8") as archivo:
+            resultados = json.load(archivo)["resultados"]
+        self.assertEqual(set(resultados), {"xhtml2pdf/frio", "xhtml2pdf/caliente", "xhtml2pdf/archivo"})
+
+        for metricas in resultados.values():
+            metricas["p50_ms"] = metricas["p95_ms"] = 0.001
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump({"resultados": resultados}, archivo)
+        with self.assertRaises(CommandError):
+            call_command("benchmark_resolucion_pdf", *argumentos, stdout=StringIO())
+        self.assertFalse(Anio.objects.exists())
+
+    def test_comando_falla_sobre_el_techo_de_memoria(self):
+        argumentos = ["--motores", "xhtml2pdf", "--iteraciones", "1"]
+        call_command("benchmark_resolucion_pdf", *argumentos, stdout=StringIO())
+        with self.assertRaisesMessage(CommandError, "Techo de memoria superado"):
+            call_command("benchmark_resolucion_pdf", *argumentos, "--pico-max-kb", "1", stdout=StringIO())
+
+
+class SemillasTests(TestCase):
+    def test_generador_es_determinista_y_completo(self):
+        totales = sembrar_caimus(asociaciones_por_anio=5, semilla=7, anio_inicial=2030)
+        self.assertEqual(totales["items"], 5 * 12)
+        self.assertEqual(totales["informes"], 5 * 12)
+        self.assertEqual(ItemChecklistCAIMUS.objects.filter(expediente__asociacion__anio__anio=2030).count(), 60)
+        estados = list(
+            ExpedienteCAIMUS.objects.filter(asociacion__anio__anio=2030).order_by("asociacion__codigo").values_list("estado", flat=True)
+        )
+        historial = ExpedienteEstadoHistorial.objects.filter(expediente__asociacion__anio__anio=2030).count()
+
+        sembrar_caimus(asociaciones_por_anio=5, semilla=7, anio_inicial=2031)
+        self.assertEqual(
+            list(
+                ExpedienteCAIMUS.objects.filter(asociacion__anio__anio=2031)
+                .order_by("asociacion__codigo")
+                .values_list("estado", flat=True)
+            ),
+            estados,
+        )
+        self.assertEqual(ExpedienteEstadoHistorial.objects.filter(expediente__asociacion__anio__anio=2031).count(), historial)
+        aprobados = estados.count(ExpedienteCAIMUS.ESTADO_APROBADO)
+        self.assertEqual(ResolucionExpediente.objects.filter(expediente__asociacion__anio__anio=2031).count(), aprobados)
+
+        datos = pdf_ficticio(20 * 1024)
+        self.assertGreaterEqual(len(datos), 19 * 1024)
+        self.assertEqual(len(PdfReader(BytesIO(datos)).pages), 1)
+
+
+class BandejaRevisionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        sembrar_caimus(asociaciones_por_anio=23, semilla=5, anio_inicial=2030)
+        cls.admin = User.objects.create_user(username="revisor", password="pass")
+        cls.admin.groups.add(Group.objects.get_or_create(name="Administrador")[0])
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def recorrer(self, parametros):
+        vistos, paginas = [], []
+        response = self.client.get(reverse("asociaciones:bandeja_revision"), parametros)
+        while True:
+            vistos += [expediente.pk for expediente in response.context["expedientes"]]
+            paginas.append(response)
+            if not response.context["siguiente"]:
+                return vistos, paginas
+            response = self.client.get(reverse("asociaciones:bandeja_revision") + "?" + response.context["siguiente"])
+
+    def test_recorre_todas_las_paginas_en_orden_sin_repetir(self):
+        vistos, paginas = self.recorrer({"por_pagina": 5})
+        esperados = list(ExpedienteCAIMUS.objects.order_by("estado", "-actualizado_en", "-id").values_list("pk", flat=True))
+        self.assertEqual(vistos, esperados)
+        self.assertEqual(len(paginas), 5)
+        self.assertTrue(paginas[0].context["pagina"].es_primera)
+        self.assertFalse(paginas[1].context["pagina"].es_primera)
+
+        vistos, _paginas = self.recorrer({"por_pagina": 7, "orden": "-asociacion"})
+        esperados = list(ExpedienteCAIMUS.objects.order_by("-asociacion__nombre", "-id").values_list("pk", flat=True))
+        self.assertEqual(vistos, esperados)
+
+    def test_anota_avance_e_informes_pendientes(self):
+        response = self.client.get(reverse("asociaciones:bandeja_revision"), {"por_pagina": 100})
+        for expediente in response.context["expedientes"]:
+            self.assertEqual(expediente.items_total, 12)
+            self.assertEqual(expediente.items_entregados, expediente.items.filter(entregado=True).count())
+            self.assertEqual(
+                expediente.informes_pendientes,
+                expediente.asociacion.informes_mensuales.filter(estado=InformeMensual.ESTADO_EN_REVISION).count(),
+            )
+
+    def test_filtro_con_pendientes(self):
+        vistos, _paginas = self.recorrer({"pendientes": "1", "por_pagina": 4})
+        esperados = {
+            expediente.pk
+            for expediente in ExpedienteCAIMUS.objects.all()
+            if expediente.estado == ExpedienteCAIMUS.ESTADO_EN_REVISION
+            or expediente.asociacion.informes_mensuales.filter(estado=InformeMensual.ESTADO_EN_REVISION).exists()
+        }
+        self.assertTrue(esperados)
+        self.assertEqual(set(vistos), esperados)
+        self.assertEqual(len(vistos), len(esperados))
+
+    def test_consultas_no_dependen_de_la_pagina(self):
+        url = reverse("asociaciones:bandeja_revision")
+        ultima_pagina = self.recorrer({"por_pagina": 5})[1][-2].context["siguiente"]
+        with CaptureQueriesContext(connection) as primera:
+            response = self.client.get(url, {"por_pagina": 5})
+        with CaptureQueriesContext(connection) as ultima:
+            self.client.get(url + "?" + ultima_pagina)
+        self.assertEqual(len(primera), len(ultima))
+        self.assertNotIn("OFFSET", ultima.captured_queries[-2]["sql"].upper())
+        self.assertEqual(len(response.context["expedientes"]), 5)
+
+    def test_cursor_invalido_vuelve_a_la_primera_pagina(self):
+        response = self.client.get(reverse("asociaciones:bandeja_revision"), {"despues": "no-es-un-cursor", "por_pagina": 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["pagina"].es_primera)
+        orden = (("actualizado_en", True), ("id", True))
+        expediente = ExpedienteCAIMUS.objects.first()
+        self.assertEqual(
+            decodificar_cursor(codificar_cursor(expediente, orden), ExpedienteCAIMUS, orden),
+            [expediente.actualizado_en, expediente.pk],
+        )
+
+
+class MisAsociacionesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user(username="socia")
+        cls.usuario.groups.add(Group.objects.create(name="Asociacion"))
+        sembrar_caimus(asociaciones_por_anio=15, anios=2, semilla=3, anio_inicial=2030, usuario_comun=cls.usuario)
+        Asociacion.objects.create(anio=Anio.objects.get(anio=2030), nombre="Sin asignar", codigo="sa")
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def test_resumen_por_asociacion_en_paginas(self):
+        url = reverse("asociaciones:mis_asociaciones")
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url)
+        vistas = list(response.context["asociaciones"])
+        while response.context["pagina"].tiene_siguiente:
+            response = self.client.get(url, {"despues": response.context["pagina"].cursor_siguiente})
+            vistas += response.context["asociaciones"]
+
+        esperadas = list(
+            Asociacion.objects.filter(usuarios__usuario=self.usuario).order_by("-anio__anio", "nombre", "id")
+        )
+        self.assertEqual([asociacion.pk for asociacion in vistas], [asociacion.pk for asociacion in esperadas])
+        self.assertLess(len(consultas), 10)
+        for asociacion in vistas[:5]:
+            expediente = asociacion.expediente_caimus
+            self.assertEqual(asociacion.estado_expediente, expediente.estado)
+            self.assertEqual(asociacion.items_entregados, expediente.items.filter(entregado=True).count())
+            for estado, _etiqueta in InformeMensual.ESTADOS:
+                self.assertEqual(
+                    getattr(asociacion, f"informes_{estado.lower()}"),
+                    asociacion.informes_mensuales.filter(estado=estado).count(),
+                )
+
+    def test_consultas_no_dependen_de_la_pagina(self):
+        url = reverse("asociaciones:mis_asociaciones")
+        cursor = self.client.get(url).context["pagina"].cursor_siguiente
+        with CaptureQueriesContext(connection) as primera:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as segunda:
+            response = self.client.get(url, {"despues": cursor})
+        self.assertEqual(len(primera), len(segunda))
+        self.assertContains(response, "Documentos entregados")
+
+
+class AutocompletarTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username="admin")
+        cls.admin.groups.add(Group.objects.create(name="Administrador"))
+        cls.anio = Anio.objects.create(anio=2026)
+        cls.otro_anio = Anio.objects.create(anio=2027)
+        for numero in range(25):
+            Asociacion.objects.create(anio=cls.anio, nombre=f"Mujeres {numero:02d}", codigo=f"m{numero}")
+        cls.rosa = Asociacion.objects.create(anio=cls.anio, nombre="Rosa de Jericó", codigo="rj")
+        Asociacion.objects.create(anio=cls.otro_anio, nombre="Rosa Blanca", codigo="rb")
+        cls.ana = User.objects.create_user(username="aperez", first_name="Ana", last_name="Pérez")
+        cls.asignada = User.objects.create_user(username="alopez", first_name="Ana", last_name="López")
+        AsociacionUsuario.objects.create(asociacion=cls.rosa, usuario=cls.asignada, rol_en_asociacion="Tesorera")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def buscar(self, nombre, **parametros):
+        return self.client.get(reverse(f"asociaciones:autocompletar_{nombre}"), parametros).json()
+
+    def test_busca_por_prefijo_con_limite_y_paginas(self):
+        primera = self.buscar("asociaciones", term="muj", anio=self.anio.pk)
+        self.assertEqual(len(primera["results"]), 20)
+        self.assertTrue(primera["pagination"]["more"])
+        segunda = self.buscar("asociaciones", term="muj", anio=self.anio.pk, page=2)
+        self.assertEqual(len(segunda["results"]), 5)
+        self.assertFalse(segunda["pagination"]["more"])
+        self.assertEqual(self.buscar("asociaciones", term="eres")["results"], [])
+
+    def test_acota_por_anio(self):
+        resultados = self.buscar("asociaciones", term="rosa", anio=self.anio.pk)["results"]
+        self.assertEqual(resultados, [{"id": self.rosa.pk, "text": "Rosa de Jericó (2026)"}])
+        self.assertEqual(len(self.buscar("asociaciones", term="rosa")["results"]), 2)
+
+        textos = [usuario["text"] for usuario in self.buscar("usuarios", term="ana", anio=self.anio.pk)["results"]]
+        self.assertEqual(textos, ["Ana Pérez (aperez)"])
+        self.assertEqual(len(self.buscar("usuarios", term="ana", anio=self.otro_anio.pk)["results"]), 2)
+        self.assertEqual(self.buscar("anios", term="202")["results"][0], {"id": self.otro_anio.pk, "text": "2027"})
+
+    def test_formulario_solo_renderiza_la_opcion_elegida_y_valida_por_pk(self):
+        url = reverse("asociaciones:asociacion_usuarios", args=[self.rosa.pk])
+        response = self.client.get(url)
+        self.assertContains(response, 'data-autocompletar="/asociaciones/autocompletar/usuarios/?anio=')
+        self.assertContains(response, f'<option value="{self.rosa.pk}" selected>Rosa de Jericó (2026)</option>')
+        self.assertNotContains(response, "Mujeres 01")
+        self.assertNotContains(response, "aperez")
+
+        otra = Asociacion.objects.get(nombre="Rosa Blanca")
+        datos = {"asociacion": otra.pk, "usuario": self.ana.pk, "rol_en_asociacion": "Vocal", "activo": "on"}
+        response = self.client.post(url, datos)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(AsociacionUsuario.objects.filter(usuario=self.ana).exists())
+
+        response = self.client.post(url, {**datos, "asociacion": self.rosa.pk})
+        self.assertRedirects(response, url)
+        self.assertTrue(AsociacionUsuario.objects.filter(usuario=self.ana, asociacion=self.rosa).exists())
+
+
+CACHES_PRUEBA = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "pruebas-default"},
+    "reportes": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "pruebas-reportes"},
+}
+
+
+@override_settings(CACHES=CACHES_PRUEBA)
+class MatrizCumplimientoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username="admin")
+        cls.admin.groups.add(Group.objects.create(name="Administrador"))
+        cls.anio = Anio.objects.create(anio=2026)
+        cls.otro_anio = Anio.objects.create(anio=2027, activo=False)
+        cls.rosa = Asociacion.objects.create(anio=cls.anio, nombre="Rosa", codigo="r")
+        cls.lirio = Asociacion.objects.create(anio=cls.anio, nombre="Lirio", codigo="l")
+        Asociacion.objects.create(anio=cls.otro_anio, nombre="Otra", codigo="o")
+        InformeMensual.objects.create(asociacion=cls.rosa, mes=1, estado=InformeMensual.ESTADO_APROBADO)
+        InformeMensual.objects.create(asociacion=cls.rosa, mes=2, estado=InformeMensual.ESTADO_RECHAZADO)
+        InformeMensual.objects.create(asociacion=cls.lirio, mes=2, estado=InformeMensual.ESTADO_EN_REVISION)
+
+    def setUp(self):
+        caches["reportes"].clear()
+        self.client.force_login(self.admin)
+        self.url = reverse("asociaciones:matriz_cumplimiento")
+
+    def test_pivote_por_mes(self):
+        filas = filas_matriz(self.anio.pk)
+        self.assertEqual([fila["nombre"] for fila in filas], ["Lirio", "Rosa"])
+        lirio, rosa = filas
+        self.assertEqual(rosa["meses"][0], ("estado-aprobado", "A", "Aprobado"))
+        self.assertEqual(rosa["meses"][1][1], "X")
+        self.assertEqual(lirio["meses"][0], ("estado-vacio", "—", "Sin informe"))
+        self.assertEqual(lirio["meses"][1][0], "estado-en_revision")
+        self.assertEqual(len(rosa["meses"]), 12)
+
+    def test_cache_se_invalida_al_guardar_informe(self):
+        filas_matriz(self.anio.pk)
+        with self.assertNumQueries(0):
+            filas_matriz(self.anio.pk)
+        informe = InformeMensual.objects.get(asociacion=self.lirio, mes=2)
+        informe.estado = InformeMensual.ESTADO_APROBADO
+        informe.save()
+        self.assertEqual(filas_matriz(self.anio.pk)[0]["meses"][1][1], "A")
+        InformeMensual.objects.create(asociacion=self.lirio, mes=3)
+        self.assertEqual(filas_matriz(self.anio.pk)[0]["meses"][2][1], "B")
+
+    def test_vista_y_exportaciones(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.context["anio"], self.anio)
+        self.assertContains(response, 'title="Rechazado">X</td>')
+
+        response = self.client.get(self.url, {"anio": self.anio.pk, "formato": "csv"})
+        contenido = b"".join(response.streaming_content).decode("utf-8-sig")
+        lineas = contenido.splitlines()
+        self.assertTrue(lineas[0].startswith("Asociación,Código,Enero"))
+        self.assertTrue(lineas[2].startswith("Rosa,r,Aprobado,Rechazado,"))
+
+        from openpyxl import load_workbook
+
+        response = self.client.get(self.url, {"anio": self.anio.pk, "formato": "xlsx"})
+        hoja = load_workbook(BytesIO(b"".join(response.streaming_content))).active
+        self.assertEqual([celda.value for celda in hoja[2]][:3], ["Lirio", "l", None])
+
+    def test_mil_asociaciones_en_menos_de_un_segundo(self):
+        anio = Anio.objects.create(anio=2030)
+        asociaciones = Asociacion.objects.bulk_create(
+            Asociacion(anio=anio, nombre=f"Asociación {numero:04d}", codigo=f"a{numero}") for numero in range(1000)
+        )
+        estados = [estado for estado, _etiqueta in InformeMensual.ESTADOS]
+        InformeMensual.objects.bulk_create(
+            InformeMensual(asociacion=asociacion, mes=mes, estado=estados[(asociacion.pk + mes) % len(estados)])
+            for asociacion in asociaciones
+            for mes in range(1, 13)
+        )
+        inicio = time.perf_counter()
+        with self.assertNumQueries(9):
+            response = self.client.get(self.url, {"anio": anio.pk})
+        self.assertLess(time.perf_counter() - inicio, 1)
+        self.assertEqual(len(response.context["filas"]), 1000)
+
+
+class CiclosRevisionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username="admin", first_name="Ana", last_name="Revisora")
+        cls.admin.groups.add(Group.objects.create(name="Administrador"))
+        cls.otro = User.objects.create_user(username="beto")
+        anio = Anio.objects.create(anio=2026)
+        cls.asociacion = Asociacion.objects.create(anio=anio, nombre="Rosa", codigo="r")
+        cls.expediente = ExpedienteCAIMUS.objects.create(asociacion=cls.asociacion)
+        cls.informe = InformeMensual.objects.create(asociacion=cls.asociacion, mes=1)
+        cls.inicio = timezone.now() - timedelta(days=3)
+
+    def historial(self, modelo, horas, anterior, nuevo, usuario=None, **objeto):
+        fila = modelo.objects.create(estado_anterior=anterior, estado_nuevo=nuevo, cambiado_por=usuario, **objeto)
+        modelo.objects.filter(pk=fila.pk).update(cambiado_en=self.inicio + timedelta(hours=horas))
+        return fila
+
+    def cargar_historial(self):
+        borrador, revision = ExpedienteCAIMUS.ESTADO_BORRADOR, ExpedienteCAIMUS.ESTADO_EN_REVISION
+        aprobado, rechazado = ExpedienteCAIMUS.ESTADO_APROBADO, ExpedienteCAIMUS.ESTADO_RECHAZADO
+        expediente = {"expediente": self.expediente}
+        self.historial(ExpedienteEstadoHistorial, 0, borrador, revision, **expediente)
+        self.historial(ExpedienteEstadoHistorial, 4, revision, rechazado, self.admin, **expediente)
+        self.historial(ExpedienteEstadoHistorial, 5, rechazado, revision, **expediente)
+        self.historial(ExpedienteEstadoHistorial, 7, revision, aprobado, self.otro, **expediente)
+        informe = {"informe": self.informe}
+        self.historial(InformeEstadoHistorial, 1, borrador, revision, **informe)
+        self.historial(InformeEstadoHistorial, 3, revision, rechazado, self.admin, **informe)
+        self.historial(InformeEstadoHistorial, 6, rechazado, revision, **informe)
+
+    def ciclos(self):
+        return list(
+            CicloRevision.objects.order_by("tipo", "entrada").values_list("tipo", "resultado", "segundos", "revisor__username")
+        )
+
+    def test_ciclos_desde_historial(self):
+        self.cargar_historial()
+        actualizar_ciclos()
+        self.assertEqual(
+            self.ciclos(),
+            [
+                ("EXPEDIENTE", "RECHAZADO", 4 * 3600, "admin"),
+                ("EXPEDIENTE", "APROBADO", 2 * 3600, "beto"),
+                ("INFORME", "RECHAZADO", 2 * 3600, "admin"),
+                # Pendiente: se atribuye a quien revisó el informe la última vez.
+                ("INFORME", "", None, "admin"),
+            ],
+        )
+
+    def test_actualizacion_incremental_igual_a_reconstruir(self):
+        self.cargar_historial()
+        with mock.patch("asociaciones_app.analitica.LOTE", 1):
+            actualizar_ciclos()
+        self.historial(
+            InformeEstadoHistorial,
+            8,
+            InformeMensual.ESTADO_EN_REVISION,
+            InformeMensual.ESTADO_APROBADO,
+            self.otro,
+            informe=self.informe,
+        )
+        self.assertEqual(actualizar_ciclos(), 1)
+        incremental = self.ciclos()
+        reconstruir_ciclos()
+        self.assertEqual(incremental, self.ciclos())
+        self.assertEqual(incremental[-1], ("INFORME", "APROBADO", 2 * 3600, "beto"))
+        with self.assertNumQueries(3):
+            self.assertEqual(actualizar_ciclos(), 0)
+
+    def test_migracion_arma_los_mismos_ciclos(self):
+        self.cargar_historial()
+        reconstruir_ciclos()
+        esperado = (self.ciclos(), sorted(AvanceCicloRevision.objects.values_list("tipo", "ultimo_historial_id")))
+        CicloRevision.objects.all().delete()
+        AvanceCicloRevision.objects.all().delete()
+
+        migracion = importlib.import_module("asociaciones_app.migrations.0011_llenar_ciclos_revision")
+        migracion.llenar_ciclos(global_apps, None)
+        self.assertEqual((self.ciclos(), sorted(AvanceCicloRevision.objects.values_list("tipo", "ultimo_historial_id"))), esperado)
+
+    def test_solo_procesa_historial_mas_antiguo_que_el_margen(self):
+        self.cargar_historial()
+        # Fila recién confirmada: una transacción más vieja todavía podría confirmar un id menor.
+        reciente = InformeEstadoHistorial.objects.create(
+            informe=self.informe,
+            estado_anterior=InformeMensual.ESTADO_EN_REVISION,
+            estado_nuevo=InformeMensual.ESTADO_APROBADO,
+            cambiado_por=self.otro,
+        )
+        actualizar_ciclos()
+        avance = AvanceCicloRevision.objects.get(tipo=CicloRevision.TIPO_INFORME)
+        self.assertLess(avance.ultimo_historial_id, reciente.pk)
+        self.assertEqual(CicloRevision.objects.filter(salida__isnull=True).count(), 1)
+
+        with mock.patch("asociaciones_app.analitica.MARGEN", timedelta(0)):
+            self.assertEqual(actualizar_ciclos(), reciente.pk - avance.ultimo_historial_id)
+        self.assertFalse(CicloRevision.objects.filter(salida__isnull=True).exists())
+
+    def test_tablero_solo_lee_el_resumen(self):
+        self.cargar_historial()
+        actualizar_ciclos()
+        self.cargar_historial()
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse("almacen:dahsboard"))
+        expedientes, informes = response.context["por_tipo"]
+        self.assertEqual((expedientes["decididos"], expedientes["tasa_rechazo"], expedientes["horas_promedio"]), (2, 50.0, 3.0))
+        self.assertEqual((informes["pendientes"], informes["tasa_rechazo"]), (1, 100.0))
+        self.assertEqual(sum(semana["total"] for semana in response.context["por_semana"]), 3)
+        self.assertEqual(response.context["pendientes"][0]["revisor"], "Ana Revisora")
+        self.assertContains(response, "Pendientes por revisor")
+
+    def test_carga_de_informe_registra_entrada_a_revision(self):
+        usuario = User.objects.create_user(username="socia")
+        usuario.groups.add(Group.objects.create(name="Asociacion"))
+        AsociacionUsuario.objects.create(asociacion=self.asociacion, usuario=usuario, rol_en_asociacion="Tesorera")
+        self.client.force_login(usuario)
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        with self.settings(MEDIA_ROOT=media_root):
+            self.client.post(
+                reverse("asociaciones:informe_upload", args=[self.asociacion.pk, 1]),
+                {"pdf": SimpleUploadedFile("informe.pdf", pdf_ficticio(1024), content_type="application/pdf")},
+            )
+        fila = InformeEstadoHistorial.objects.get(informe=self.informe)
+        self.assertEqual((fila.estado_anterior, fila.estado_nuevo), ("BORRADOR", "EN_REVISION"))
+
+
+class ResumenAsociacionTests(TestCase):
+    CAMPOS = (
+        "items_total",
+        "items_entregados",
+        "informes_borrador",
+        "informes_en_revision",
+        "informes_aprobado",
+        "informes_rechazado",
+        "ultima_entrega",
+        "rechazos",
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.anio = Anio.objects.create(anio=2026)
+        cls.asociacion = Asociacion.objects.create(anio=cls.anio, nombre="Rosa", codigo="r")
+
+    def resumen(self, asociacion=None):
+        return ResumenAsociacion.objects.filter(asociacion=asociacion or self.asociacion).values(*self.CAMPOS).get()
+
+    def test_se_mantiene_con_cada_cambio(self):
+        self.assertEqual(self.resumen()["items_total"], 0)
+        expediente = ExpedienteCAIMUS.objects.create(asociacion=self.asociacion)
+        crear_items_expediente(expediente)
+        crear_informes_mensuales(self.asociacion)
+        self.assertEqual((self.resumen()["items_total"], self.resumen()["informes_borrador"]), (12, 12))
+
+        item = expediente.items.get(numero=1)
+        item.pdf = "caimus/2026/documento.pdf"
+        item.save()
+        informe = self.asociacion.informes_mensuales.get(mes=1)
+        informe.estado = InformeMensual.ESTADO_RECHAZADO
+        informe.save()
+        entrada = InformeEstadoHistorial.objects.create(
+            informe=informe, estado_anterior="BORRADOR", estado_nuevo="EN_REVISION"
+        )
+        InformeEstadoHistorial.objects.create(informe=informe, estado_anterior="EN_REVISION", estado_nuevo="RECHAZADO")
+        ExpedienteEstadoHistorial.objects.create(
+            expediente=expediente, estado_anterior="EN_REVISION", estado_nuevo="RECHAZADO"
+        )
+        resumen = self.resumen()
+        self.assertEqual(resumen["items_entregados"], 1)
+        self.assertEqual((resumen["informes_borrador"], resumen["informes_rechazado"]), (11, 1))
+        self.assertEqual(resumen["rechazos"], 2)
+        self.assertEqual(resumen["ultima_entrega"], entrada.cambiado_en)
+
+        informe.delete()
+        self.assertEqual(self.resumen()["informes_rechazado"], 0)
+
+    def test_items_de_una_transaccion_recalculan_una_vez_al_confirmar(self):
+        expediente = ExpedienteCAIMUS.objects.create(asociacion=self.asociacion)
+        crear_items_expediente(expediente)
+        with CaptureQueriesContext(connection) as consultas, self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                for item in expediente.items.all():
+                    item.pdf = f"caimus/2026/documento{item.numero}.pdf"
+                    item.save()
+                self.assertEqual(self.resumen()["items_entregados"], 0)
+        actualizaciones = [
+            consulta for consulta in consultas.captured_queries
+            if consulta["sql"].startswith('UPDATE "asociaciones_app_resumenasociacion"')
+        ]
+        self.assertEqual(len(actualizaciones), 1)
+        self.assertEqual(self.resumen()["items_entregados"], 12)
+
+    def test_revierte_con_la_transaccion(self):
+        informe = InformeMensual.objects.create(asociacion=self.asociacion, mes=1)
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            informe.estado = InformeMensual.ESTADO_APROBADO
+            informe.save()
+            self.assertEqual(self.resumen()["informes_aprobado"], 1)
+            raise RuntimeError
+        self.assertEqual((self.resumen()["informes_aprobado"], self.resumen()["informes_borrador"]), (0, 1))
+
+    def test_reconstruir_coincide_con_lo_incremental(self):
+        sembrar_caimus(asociaciones_por_anio=6, semilla=5, anio_inicial=2030)
+        asociaciones = list(Asociacion.objects.filter(anio__anio=2030))
+        for asociacion in asociaciones[:3]:
+            informe = asociacion.informes_mensuales.get(mes=2)
+            informe.estado = InformeMensual.ESTADO_APROBADO
+            informe.save()
+        incremental = [self.resumen(asociacion) for asociacion in asociaciones]
+        ResumenAsociacion.objects.update(items_total=0, informes_aprobado=0, rechazos=0)
+        call_command("reconstruir_resumenes", stdout=StringIO())
+        self.assertEqual([self.resumen(asociacion) for asociacion in asociaciones], incremental)
+        for asociacion, resumen in zip(asociaciones, incremental):
+            self.assertEqual(resumen["items_total"], ItemChecklistCAIMUS.objects.filter(expediente__asociacion=asociacion).count())
+            self.assertEqual(
+                resumen["rechazos"],
+                InformeEstadoHistorial.objects.filter(informe__asociacion=asociacion, estado_nuevo="RECHAZADO").count()
+                + ExpedienteEstadoHistorial.objects.filter(expediente__asociacion=asociacion, estado_nuevo="RECHAZADO").count(),
+            )
+
+    def test_migracion_calcula_lo_mismo_que_reconstruir(self):
+        sembrar_caimus(asociaciones_por_anio=3, semilla=7, anio_inicial=2030)
+        asociaciones = list(Asociacion.objects.all())
+        esperado = [self.resumen(asociacion) for asociacion in asociaciones]
+        ResumenAsociacion.objects.all().delete()
+
+        migracion = importlib.import_module("asociaciones_app.migrations.0010_resumen_asociacion")
+        migracion.llenar_resumenes(global_apps, None)
+        self.assertEqual([self.resumen(asociacion) for asociacion in asociaciones], esperado)
+
+    def test_listado_ordena_por_resumen(self):
+        admin = User.objects.create_user(username="admin")
+        admin.groups.add(Group.objects.create(name="Administrador"))
+        otra = Asociacion.objects.create(anio=self.anio, nombre="Lirio", codigo="l")
+        ResumenAsociacion.objects.filter(asociacion=otra).update(rechazos=3)
+        self.client.force_login(admin)
+        url = reverse("asociaciones:asociacion_list", args=[self.anio.pk])
+        datos = self.client.get(url, {"draw": "1", "order[0][column]": "5", "order[0][dir]": "desc"}).json()
+        self.assertEqual([fila[0] for fila in datos["data"]], ["Lirio", "Rosa"])
+        self.assertEqual(datos["data"][0][5], 3)
+
+
+class RevisionMasivaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username="admin")
+        cls.admin.groups.add(Group.objects.create(name="Administrador"))
+        cls.anio = Anio.objects.create(anio=2026)
+        cls.asociaciones = [
+            Asociacion.objects.create(anio=cls.anio, nombre=f"Asociación {numero:02d}", codigo=f"a{numero}")
+            for numero in range(12)
+        ]
+        for asociacion in cls.asociaciones:
+            for mes in (1, 2):
+                InformeMensual.objects.create(asociacion=asociacion, mes=mes, estado=InformeMensual.ESTADO_EN_REVISION)
+        cls.aprobado = InformeMensual.objects.create(
+            asociacion=cls.asociaciones[0], mes=3, estado=InformeMensual.ESTADO_APROBADO
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.url = reverse("asociaciones:informes_revision_masiva")
+
+    def revisar(self, informes, estado, observacion=""):
+        return self.client.post(
+            self.url,
+            {"informes": informes, "estado": estado, "observacion_admin": observacion},
+            HTTP_ACCEPT="application/json",
+        )
+
+    def test_resultado_por_informe(self):
+        rosa = self.asociaciones[0]
+        response = self.revisar([f"{rosa.pk}-1", f"{rosa.pk}-2", f"{rosa.pk}-3", f"{rosa.pk}-4", f"{rosa.pk}-13"], "APROBADO")
+        resultados = response.json()["resultados"]
+        self.assertEqual(
+            [(resultado["mes"], resultado["aplicado"], resultado["mensaje"]) for resultado in resultados],
+            [
+                (1, True, "Actualizado."),
+                (2, True, "Actualizado."),
+                (3, False, "Ya estaba en ese estado."),
+                (4, False, "No existe el informe."),
+                (13, False, "Mes inválido."),
+            ],
+        )
+        informe = rosa.informes_mensuales.get(mes=1)
+        self.assertEqual((informe.estado, informe.aprobado_por, informe.actualizado_por), ("APROBADO", self.admin, self.admin))
+        self.assertIsNotNone(informe.aprobado_en)
+        self.assertEqual(InformeEstadoHistorial.objects.filter(informe__asociacion=rosa, estado_nuevo="APROBADO").count(), 2)
+        self.assertEqual(ResumenAsociacion.objects.get(asociacion=rosa).informes_aprobado, 3)
+
+    def test_mismas_validaciones_que_un_informe(self):
+        rosa = self.asociaciones[0]
+        response = self.revisar([f"{rosa.pk}-1"], "RECHAZADO")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "Debe indicar la observación del rechazo.")
+        self.assertEqual(self.revisar([f"{rosa.pk}-1"], "PERDIDO").json()["error"], "Estado inválido.")
+        self.assertEqual(self.revisar(["x-1"], "APROBADO").status_code, 400)
+        self.assertFalse(InformeEstadoHistorial.objects.exists())
+
+        self.revisar([f"{rosa.pk}-1"], "RECHAZADO", "Falta firma")
+        informe = rosa.informes_mensuales.get(mes=1)
+        self.assertEqual((informe.estado, informe.observacion_admin, informe.aprobado_por), ("RECHAZADO", "Falta firma", None))
+
+    def test_consultas_no_crecen_con_la_seleccion(self):
+        pocos = [f"{asociacion.pk}-1" for asociacion in self.asociaciones[:2]]
+        muchos = [f"{asociacion.pk}-{mes}" for asociacion in self.asociaciones[2:] for mes in (1, 2)]
+        with CaptureQueriesContext(connection) as primera:
+            self.revisar(pocos, "APROBADO")
+        with CaptureQueriesContext(connection) as segunda:
+            self.revisar(muchos, "APROBADO")
+        self.assertEqual(len(primera), len(segunda))
+        self.assertEqual(InformeMensual.objects.filter(estado="EN_REVISION").count(), 2)
+
+    def test_pagina_lista_pendientes_y_muestra_resultados(self):
+        response = self.client.get(self.url, {"mes": 2})
+        self.assertEqual(len(response.context["informes"]), 12)
+        rosa = self.asociaciones[0]
+        response = self.client.post(self.url + "?mes=2", {"informes": [f"{rosa.pk}-2"], "estado": "APROBADO"})
+        self.assertEqual(response.context["resultados"][0].mensaje, "Actualizado.")
+        self.assertEqual(len(response.context["informes"]), 11)
+        self.assertEqual([str(mensaje) for mensaje in get_messages(response.wsgi_request)], ["1 de 1 informes actualizados."])
+
+
+class AprobacionExpedientesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username="admin", is_staff=True, is_superuser=True)
+        cls.admin.groups.add(Group.objects.create(name="Administrador"))
+        cls.anio = Anio.objects.create(anio=2026)
+        cls.expedientes = [
+            ExpedienteCAIMUS.objects.create(
+                asociacion=Asociacion.objects.create(anio=cls.anio, nombre=f"Asociación {numero:02d}", codigo=f"a{numero}"),
+                estado=ExpedienteCAIMUS.ESTADO_EN_REVISION,
+            )
+            for numero in reversed(range(12))
+        ]
+        cls.aprobado = ExpedienteCAIMUS.objects.create(
+            asociacion=Asociacion.objects.create(anio=cls.anio, nombre="Aprobada", codigo="ap"),
+            estado=ExpedienteCAIMUS.ESTADO_APROBADO,
+        )
+        ResolucionExpediente.objects.create(
+            expediente=cls.aprobado, correlativo="UPCV-CAIMUS-2026-0003", fecha_emision=date(2026, 1, 5)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def aprobar(self, expedientes):
+        with mock.patch("asociaciones_app.dossier.encolar_tarea") as encolar:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    reverse("asociaciones:expedientes_aprobar"),
+                    {"expedientes": [expediente.pk for expediente in expedientes], "filtros": "estado=EN_REVISION"},
+                )
+        self.assertRedirects(response, reverse("asociaciones:bandeja_revision") + "?estado=EN_REVISION")
+        return encolar
+
+    def test_aprueba_y_reserva_correlativos_consecutivos(self):
+        encolar = self.aprobar([*self.expedientes[:3], self.aprobado])
+        # Los correlativos siguen al último del año, en el orden alfabético de las asociaciones.
+        self.assertEqual(
+            list(
+                ResolucionExpediente.objects.exclude(expediente=self.aprobado)
+                .order_by("correlativo")
+                .values_list("expediente__asociacion__nombre", "correlativo", "generado_por")
+            ),
+            [
+                ("Asociación 09", "UPCV-CAIMUS-2026-0004", self.admin.pk),
+                ("Asociación 10", "UPCV-CAIMUS-2026-0005", self.admin.pk),
+                ("Asociación 11", "UPCV-CAIMUS-2026-0006", self.admin.pk),
+            ],
+        )
+        expediente = ExpedienteCAIMUS.objects.get(pk=self.expedientes[0].pk)
+        self.assertEqual((expediente.estado, expediente.aprobado_por), ("APROBADO", self.admin))
+        self.assertEqual(ExpedienteEstadoHistorial.objects.filter(estado_nuevo="APROBADO").count(), 3)
+        self.assertEqual(
+            sorted(llamada.args[1] for llamada in encolar.call_args_list),
+            sorted(expediente.pk for expediente in self.expedientes[:3]),
+        )
+        self.assertEqual(generar_correlativo(2026), "UPCV-CAIMUS-2026-0007")
+        self.assertEqual(reservar_correlativos(2027, 2), ["UPCV-CAIMUS-2027-0001", "UPCV-CAIMUS-2027-0002"])
+
+    def test_consultas_no_crecen_con_la_seleccion(self):
+        with CaptureQueriesContext(connection) as pocos:
+            self.aprobar(self.expedientes[:2])
+        with CaptureQueriesContext(connection) as muchos:
+            self.aprobar(self.expedientes[2:])
+        self.assertEqual(len(pocos), len(muchos))
+        self.assertEqual(ResolucionExpediente.objects.count(), 13)
+
+    def test_accion_del_admin(self):
+        self.client.post(
+            reverse("admin:asociaciones_app_expedientecaimus_changelist"),
+            {"action": "aprobar", "_selected_action": [self.expedientes[0].pk, self.aprobado.pk]},
+        )
+        resolucion = ResolucionExpediente.objects.get(expediente=self.expedientes[0])
+        self.assertEqual(resolucion.correlativo, "UPCV-CAIMUS-2026-0004")
+        self.assertEqual(ExpedienteEstadoHistorial.objects.count(), 1)
+
+    def test_aprobacion_individual_inserta_la_resolucion_con_el_anio_bloqueado(self):
+        expediente = self.expedientes[0]
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.post(
+                reverse("asociaciones:expediente_revision", args=[expediente.pk]),
+                {"estado": ExpedienteCAIMUS.ESTADO_APROBADO},
+            )
+        self.assertEqual(expediente.resolucion.correlativo, "UPCV-CAIMUS-2026-0004")
+        # El INSERT de la resolución ocurre con la transacción de la reserva todavía abierta.
+        sentencias = [consulta["sql"] for consulta in consultas.captured_queries]
+        insercion = next(
+            numero for numero, sql in enumerate(sentencias) if sql.startswith('INSERT INTO "asociaciones_app_resolucionexpediente"')
+        )
+        abiertas = sum(
+            1 if sql.startswith("SAVEPOINT") else -1 if sql.startswith("RELEASE SAVEPOINT") else 0
+            for sql in sentencias[:insercion]
+        )
+        self.assertGreater(abiertas, 0)
+
+
+@skipUnlessDBFeature("has_select_for_update")
+class ReservaCorrelativosConcurrenteTests(TransactionTestCase):
+    """Dos emisiones simultáneas del mismo año; en SQLite no hay bloqueo de filas y se omite."""
+
+    def test_reservas_simultaneas_no_repiten_correlativo(self):
+        anio = Anio.objects.create(anio=2031)
+        expedientes = [
+            ExpedienteCAIMUS.objects.create(asociacion=Asociacion.objects.create(anio=anio, nombre=nombre, codigo=nombre))
+            for nombre in ("a", "b")
+        ]
+        reservado = threading.Event()
+        errores = []
+
+        def emitir(expediente, esperar):
+            try:
+                with transaction.atomic():
+                    correlativo = generar_correlativo(2031)
+                    if esperar:
+                        # La segunda reserva arranca mientras esta sigue sin insertar su resolución.
+                        reservado.set()
+                        time.sleep(0.5)
+                    ResolucionExpediente.objects.create(
+                        expediente=expediente, correlativo=correlativo, fecha_emision=date(2031, 1, 2)
+                    )
+            except Exception as exc:
+                errores.append(exc)
+            finally:
+                connection.close()
+
+        primero = threading.Thread(target=emitir, args=(expedientes[0], True))
+        primero.start()
+        self.assertTrue(reservado.wait(5))
+        segundo = threading.Thread(target=emitir, args=(expedientes[1], False))
+        segundo.start()
+        primero.join()
+        segundo.join()
+
+        self.assertEqual(errores, [])
+        self.assertEqual(
+            list(ResolucionExpediente.objects.order_by("correlativo").values_list("expediente_id", "correlativo")),
+            [(expedientes[0].pk, "UPCV-CAIMUS-2031-0001"), (expedientes[1].pk, "UPCV-CAIMUS-2031-0002")],
+        )
+
+
+class AperturaAnioTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username="admin", is_staff=True, is_superuser=True)
+        cls.usuaria = User.objects.create_user(username="usuaria")
+        cls.otra = User.objects.create_user(username="otra")
+        cls.origen = Anio.objects.create(anio=2025)
+        cls.rosa = Asociacion.objects.create(anio=cls.origen, nombre="Rosa", codigo="rosa")
+        cls.lila = Asociacion.objects.create(anio=cls.origen, nombre="Lila", codigo="lila")
+        Asociacion.objects.create(anio=cls.origen, nombre="Cerrada", codigo="cerrada", activo=False)
+        AsociacionUsuario.objects.create(asociacion=cls.rosa, usuario=cls.usuaria, rol_en_asociacion="Presidenta")
+        AsociacionUsuario.objects.create(asociacion=cls.lila, usuario=cls.otra, rol_en_asociacion="Miembro", activo=False)
+        ExpedienteCAIMUS.objects.create(asociacion=cls.rosa, estado=ExpedienteCAIMUS.ESTADO_APROBADO)
+
+    def test_simular_no_escribe(self):
+        totales = abrir_anio(2025, 2026, simular=True)
+        self.assertEqual(
+            totales,
+            {"asociaciones": 2, "omitidas": 0, "asignaciones": 1, "expedientes": 2, "items": 24, "informes": 24},
+        )
+        self.assertFalse(Anio.objects.filter(anio=2026).exists())
+
+    def test_copia_asociaciones_con_expedientes_e_informes(self):
+        totales = abrir_anio(2025, 2026, self.admin)
+        self.assertEqual(totales["asociaciones"], 2)
+        nuevas = Asociacion.objects.filter(anio__anio=2026).order_by("codigo")
+        self.assertEqual(list(nuevas.values_list("codigo", "nombre")), [("lila", "Lila"), ("rosa", "Rosa")])
+        asignacion = AsociacionUsuario.objects.get(asociacion__anio__anio=2026)
+        self.assertEqual(
+            (asignacion.asociacion.codigo, asignacion.usuario, asignacion.rol_en_asociacion, asignacion.activo),
+            ("rosa", self.usuaria, "Presidenta", True),
+        )
+        for asociacion in nuevas:
+            expediente = asociacion.expediente_caimus
+            self.assertEqual((expediente.estado, expediente.creado_por), ("BORRADOR", self.admin))
+            self.assertEqual(sorted(expediente.items.values_list("numero", flat=True)), list(range(1, 13)))
+            self.assertEqual(sorted(asociacion.informes_mensuales.values_list("mes", flat=True)), list(range(1, 13)))
+            self.assertEqual((asociacion.resumen.items_total, asociacion.resumen.informes_borrador), (12, 12))
+
+        # Repetir la apertura no duplica asociaciones ni asignaciones.
+        self.assertEqual(abrir_anio(2025, 2026)["omitidas"], 2)
+        self.assertEqual(Asociacion.objects.filter(anio__anio=2026).count(), 2)
+        self.assertEqual(AsociacionUsuario.objects.filter(asociacion__anio__anio=2026).count(), 1)
+
+    def test_consultas_no_crecen_con_las_asociaciones(self):
+        grande = Anio.objects.create(anio=2030)
+        # Pocas filas: SQLite parte los INSERT al pasar de 999 parámetros.
+        for numero in range(6):
+            asociacion = Asociacion.objects.create(anio=grande, nombre=f"Asociación {numero:02d}", codigo=f"a{numero}")
+            usuario = User.objects.create_user(username=f"usuaria{numero}")
+            AsociacionUsuario.objects.create(asociacion=asociacion, usuario=usuario, rol_en_asociacion="Miembro")
+        with CaptureQueriesContext(connection) as pocas:
+            abrir_anio(2025, 2026)
+        with CaptureQueriesContext(connection) as muchas:
+            abrir_anio(2030, 2031)
+        self.assertEqual(len(pocas), len(muchas))
+
+    def test_comando_y_accion_del_admin(self):
+        salida = StringIO()
+        call_command("abrir_anio", "2025", "2026", "--simular", stdout=salida)
+        self.assertIn("Simulación", salida.getvalue())
+        with self.assertRaises(CommandError):
+            call_command("abrir_anio", "2024", "2026", stdout=StringIO())
+
+        self.client.force_login(self.admin)
+        self.client.post(
+            reverse("admin:asociaciones_app_anio_changelist"),
+            {"action": "abrir_siguiente", "_selected_action": [self.origen.pk]},
+        )
+        self.assertEqual(Asociacion.objects.filter(anio__anio=2026).count(), 2)
+
+
+class PruebaCargaTests(TransactionTestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            CAIMUS_TAREAS_SINCRONAS=True,
+            CAIMUS_MOTOR_PDF="xhtml2pdf",
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_sin_datos_sinteticos_falla(self):
+        with self.assertRaises(ValueError):
+            ejecutar_carga(usuarios_asociacion=1, admins=0, iteraciones=1)
+
+    def test_reporta_latencias_por_url(self):
+        sembrar_caimus(asociaciones_por_anio=2, semilla=3, anio_inicial=2030)
+        resultado = ejecutar_carga(usuarios_asociacion=2, admins=1, iteraciones=1, tamano_pdf=2048, hilos=3)
+        self.assertEqual(resultado["configuracion"]["usuarios_asociacion"], 2)
+        self.assertEqual(resultado["configuracion"]["hilos"], 3)
+        metricas = resultado["resultados"]
+        for url_name in (
+            "almacen:signin",
+            "asociaciones:expediente_caimus",
+            "asociaciones:item_upload",
+            "asociaciones:item_observacion",
+            "asociaciones:informes_mensuales",
+            "asociaciones:bandeja_revision",
+            "asociaciones:expediente_revision",
+        ):
+            self.assertIn(url_name, metricas)
+            self.assertEqual(metricas[url_name]["errores"], 0, url_name)
+            self.assertLessEqual(metricas[url_name]["p50_ms"], metricas[url_name]["p99_ms"])
+        self.assertEqual(metricas["asociaciones:item_upload"]["solicitudes"], 2)
+        self.assertEqual(ItemChecklistCAIMUS.objects.filter(pdf__contains="documento").count(), 2)
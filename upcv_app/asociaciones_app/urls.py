@@ -17,6 +17,7 @@ urlpatterns = [
     path("<int:pk>/informes/", views.informes_mensuales, name="informes_mensuales"),
     path("expedientes/<int:pk>/revision/", views.expediente_revision, name="expediente_revision"),
     path("expedientes/<int:pk>/resolucion/pdf/", views.resolucion_pdf, name="resolucion_pdf"),
+    path("expedientes/<int:pk>/dossier/pdf/", views.dossier_pdf, name="dossier_pdf"),
     path(
         "expedientes/<int:expediente_id>/items/<int:item_id>/upload/",
         views.item_upload,
@@ -43,5 +44,11 @@ urlpatterns = [
         name="informe_estado",
     ),
     path("bandeja-revision/", views.bandeja_revision, name="bandeja_revision"),
+    path("bandeja-revision/aprobar/", views.expedientes_aprobar, name="expedientes_aprobar"),
+    path("informes/revision-masiva/", views.informes_revision_masiva, name="informes_revision_masiva"),
     path("asignaciones/", views.asignaciones_list, name="asignaciones_list"),
+    path("reportes/cumplimiento/", views.matriz_cumplimiento, name="matriz_cumplimiento"),
+    path("autocompletar/usuarios/", views.autocompletar_usuarios, name="autocompletar_usuarios"),
+    path("autocompletar/asociaciones/", views.autocompletar_asociaciones, name="autocompletar_asociaciones"),
+    path("autocompletar/anios/", views.autocompletar_anios, name="autocompletar_anios"),
 ]
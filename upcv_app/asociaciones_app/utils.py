@@ -2,13 +2,15 @@ from __future__ import annotations
 
 from typing import Optional
 
+from almacen_app.utils import nombres_grupos
+
 from .models import Asociacion, AsociacionUsuario
 
 
 def is_admin(user) -> bool:
     if not user.is_authenticated:
         return False
-    return user.groups.filter(name="Administrador").exists() or user.is_superuser
+    return "Administrador" in nombres_grupos(user) or user.is_superuser
 
 
 def usuario_puede_ver_asociacion(user, asociacion: Asociacion) -> bool:
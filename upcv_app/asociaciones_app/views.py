@@ -1,17 +1,38 @@
 from __future__ import annotations
 
+from dataclasses import asdict
+
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
 from django.core.exceptions import ValidationError
-from django.http import HttpResponse
+from django.db import transaction
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, QueryDict, StreamingHttpResponse
 from django.views.decorators.http import require_POST
 from django.shortcuts import get_object_or_404, redirect, render
-from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
-from weasyprint import HTML
 
+from .autocompletar import (
+    buscar_anios,
+    buscar_asociaciones,
+    buscar_usuarios,
+    etiqueta_asociacion,
+    etiqueta_usuario,
+    resultados,
+)
+from .bandeja import (
+    ORDEN_ASOCIACIONES,
+    ORDEN_INFORMES_REVISION,
+    ORDEN_PREDETERMINADO,
+    ORDENES,
+    TAMANO_PAGINA,
+    TAMANO_PAGINA_ASOCIACIONES,
+    TAMANO_PAGINA_MAXIMO,
+    asociaciones_con_resumen,
+    expedientes_bandeja,
+)
+from .dossier import programar_dossier
 from .forms import (
     AnioForm,
     AsociacionForm,
@@ -21,6 +42,7 @@ from .forms import (
     RevisionExpedienteForm,
 )
 from .models import (
+    MESES_CHOICES,
     Anio,
     Asociacion,
     AsociacionUsuario,
@@ -33,7 +55,12 @@ from .models import (
     crear_informes_mensuales,
     generar_correlativo,
 )
+from .matriz import ABREVIATURAS_ESTADO, exportar_csv, exportar_xlsx, filas_matriz
 from .mixins import admin_required, asociacion_required
+from .paginacion import paginar_keyset
+from .pdf import obtener_resolucion_pdf
+from .revision import aplicar_estado, aprobar_expedientes, leer_pares, revisar_informes, validar_estado
+from .tablas import AniosTabla, AsignacionesTabla, AsociacionesTabla, UsuariosAsociacionTabla
 from .permissions import (
     get_asociaciones_usuario,
     is_admin,
@@ -48,8 +75,10 @@ from .permissions import (
 @login_required
 @admin_required
 def anio_list(request):
-    anios = Anio.objects.all()
-    return render(request, "asociaciones_app/anio_list.html", {"anios": anios})
+    tabla = AniosTabla(Anio.objects.all(), "tabla-anios")
+    if tabla.es_peticion(request):
+        return tabla.respuesta(request)
+    return render(request, "asociaciones_app/anio_list.html", {"tabla": tabla})
 
 
 @login_required
@@ -85,11 +114,13 @@ def anio_edit(request, pk):
 @admin_required
 def asociacion_list(request, anio_id):
     anio = get_object_or_404(Anio, pk=anio_id)
-    asociaciones = anio.asociaciones.all()
+    tabla = AsociacionesTabla(anio.asociaciones.all(), "tabla-asociaciones")
+    if tabla.es_peticion(request):
+        return tabla.respuesta(request)
     return render(
         request,
         "asociaciones_app/asociacion_list.html",
-        {"anio": anio, "asociaciones": asociaciones},
+        {"anio": anio, "tabla": tabla},
     )
 
 
@@ -134,35 +165,50 @@ def asociacion_edit(request, pk):
 @login_required
 @admin_required
 def asociacion_usuarios(request, pk):
-    asociacion = get_object_or_404(Asociacion, pk=pk)
+    asociacion = get_object_or_404(Asociacion.objects.select_related("anio"), pk=pk)
+    tabla = UsuariosAsociacionTabla(asociacion.usuarios.all(), "tabla-asignaciones")
+    if tabla.es_peticion(request):
+        return tabla.respuesta(request)
     if request.method == "POST":
-        form = AsociacionUsuarioForm(request.POST)
+        form = AsociacionUsuarioForm(request.POST, anio=asociacion.anio)
         if form.is_valid():
             asignacion = form.save()
             messages.success(request, "Usuario asignado correctamente.")
             return redirect("asociaciones:asociacion_usuarios", pk=asociacion.pk)
     else:
-        form = AsociacionUsuarioForm(initial={"asociacion": asociacion})
-    asignaciones = asociacion.usuarios.select_related("usuario")
+        form = AsociacionUsuarioForm(initial={"asociacion": asociacion}, anio=asociacion.anio)
     return render(
         request,
         "asociaciones_app/asociacion_usuarios.html",
-        {"asociacion": asociacion, "form": form, "asignaciones": asignaciones},
+        {"asociacion": asociacion, "form": form, "tabla": tabla},
     )
 
 
 @asociacion_required
 def mis_asociaciones(request):
-    if is_admin(request.user):
+    es_admin = is_admin(request.user)
+    if es_admin:
         asociaciones = Asociacion.objects.all()
     elif is_asociacion(request.user):
-        asociaciones = get_asociaciones_usuario(request.user)
+        asociaciones = Asociacion.objects.filter(pk__in=get_asociaciones_usuario(request.user).values("pk"))
     else:
         raise PermissionDenied
+    pagina = paginar_keyset(
+        asociaciones_con_resumen(asociaciones),
+        ORDEN_ASOCIACIONES,
+        request.GET.get("despues"),
+        TAMANO_PAGINA_ASOCIACIONES,
+    )
+    estados_expediente = dict(ExpedienteCAIMUS.ESTADOS)
+    for asociacion in pagina.objetos:
+        asociacion.estado_expediente_display = estados_expediente.get(asociacion.estado_expediente, "Sin expediente")
+        asociacion.informes_por_estado = [
+            (etiqueta, getattr(asociacion, f"informes_{estado.lower()}")) for estado, etiqueta in InformeMensual.ESTADOS
+        ]
     return render(
         request,
         "asociaciones_app/mis_asociaciones.html",
-        {"asociaciones": asociaciones, "es_admin": is_admin(request.user)},
+        {"asociaciones": pagina.objetos, "pagina": pagina, "es_admin": es_admin},
     )
 
 
@@ -187,10 +233,14 @@ def expediente_caimus(request, pk):
             queryset=expediente.items.order_by("numero"),
         )
         if form.is_valid() and formset.is_valid():
-            expediente = form.save(commit=False)
-            expediente.actualizado_por = request.user
-            expediente.save()
-            formset.save()
+            # En una transacción: el resumen de la asociación se recalcula una vez al confirmar, no por item.
+            with transaction.atomic():
+                expediente = form.save(commit=False)
+                expediente.actualizado_por = request.user
+                expediente.save()
+                formset.save()
+            if expediente.dossier_pdf:
+                programar_dossier(expediente)
             if request.POST.get("save_item"):
                 messages.success(request, "Observación guardada correctamente.")
             else:
@@ -211,6 +261,7 @@ def expediente_caimus(request, pk):
             "form": form,
             "formset": formset,
             "progress": progress,
+            "historial_estados": expediente.historial_estados.select_related("cambiado_por"),
             "es_admin": is_admin(request.user),
         },
     )
@@ -239,6 +290,7 @@ def item_upload(request, expediente_id, item_id):
         messages.error(request, "; ".join(exc.messages))
         return redirect("asociaciones:expediente_caimus", pk=expediente.asociacion.pk)
     item.save()
+    programar_dossier(expediente)
     messages.success(request, "Archivo subido correctamente.")
     return redirect("asociaciones:expediente_caimus", pk=expediente.asociacion.pk)
 
@@ -252,6 +304,8 @@ def item_observacion(request, expediente_id, item_id):
     item = get_object_or_404(expediente.items, pk=item_id)
     item.observaciones = request.POST.get("observaciones", "")
     item.save()
+    if expediente.dossier_pdf:
+        programar_dossier(expediente)
     messages.success(request, "Observación guardada correctamente.")
     return redirect("asociaciones:expediente_caimus", pk=expediente.asociacion.pk)
 
@@ -298,6 +352,7 @@ def informe_upload(request, asociacion_id, mes):
         messages.error(request, "El archivo debe ser un PDF válido.")
         return redirect("asociaciones:informes_mensuales", pk=asociacion.pk)
 
+    estado_anterior = informe.estado
     informe.pdf = archivo
     informe.estado = InformeMensual.ESTADO_EN_REVISION
     informe.observacion_admin = ""
@@ -310,6 +365,14 @@ def informe_upload(request, asociacion_id, mes):
         messages.error(request, "; ".join(exc.messages))
         return redirect("asociaciones:informes_mensuales", pk=asociacion.pk)
     informe.save()
+    if estado_anterior != InformeMensual.ESTADO_EN_REVISION:
+        # La entrada a revisión marca el inicio del tiempo de respuesta en el tablero.
+        InformeEstadoHistorial.objects.create(
+            informe=informe,
+            estado_anterior=estado_anterior,
+            estado_nuevo=InformeMensual.ESTADO_EN_REVISION,
+            cambiado_por=request.user,
+        )
     messages.success(request, f"Informe de {informe.get_mes_display()} cargado correctamente.")
     return redirect("asociaciones:informes_mensuales", pk=asociacion.pk)
 
@@ -344,24 +407,13 @@ def informe_estado(request, asociacion_id, mes):
     informe = get_object_or_404(asociacion.informes_mensuales, mes=mes)
     estado_anterior = informe.estado
     estado_nuevo = request.POST.get("estado")
-    if estado_nuevo not in dict(InformeMensual.ESTADOS):
-        messages.error(request, "Estado inválido.")
-        return redirect("asociaciones:informes_mensuales", pk=asociacion.pk)
     observacion_admin = request.POST.get("observacion_admin", "")
-    if estado_nuevo == InformeMensual.ESTADO_RECHAZADO and not observacion_admin:
-        messages.error(request, "Debe indicar la observación del rechazo.")
+    error = validar_estado(estado_nuevo, observacion_admin)
+    if error:
+        messages.error(request, error)
         return redirect("asociaciones:informes_mensuales", pk=asociacion.pk)
 
-    informe.estado = estado_nuevo
-    if estado_nuevo == InformeMensual.ESTADO_APROBADO:
-        informe.aprobado_por = request.user
-        informe.aprobado_en = timezone.now()
-        informe.observacion_admin = ""
-    else:
-        informe.aprobado_por = None
-        informe.aprobado_en = None
-        informe.observacion_admin = observacion_admin
-    informe.actualizado_por = request.user
+    aplicar_estado(informe, estado_nuevo, observacion_admin, request.user, timezone.now())
     informe.save()
 
     InformeEstadoHistorial.objects.create(
@@ -384,39 +436,47 @@ def expediente_revision(request, pk):
     if request.method == "POST":
         form = RevisionExpedienteForm(request.POST, instance=expediente)
         if form.is_valid():
-            expediente = form.save(commit=False)
-            if expediente.estado == ExpedienteCAIMUS.ESTADO_APROBADO:
-                expediente.aprobado_por = request.user
-                expediente.aprobado_en = timezone.now()
-                expediente.observacion_admin = ""
-            else:
-                expediente.aprobado_por = None
-                expediente.aprobado_en = None
-            expediente.actualizado_por = request.user
-            expediente.save()
-
-            ExpedienteEstadoHistorial.objects.create(
-                expediente=expediente,
-                estado_anterior=estado_anterior,
-                estado_nuevo=expediente.estado,
-                observacion=expediente.observacion_admin,
-                cambiado_por=request.user,
-            )
-
-            if expediente.estado == ExpedienteCAIMUS.ESTADO_APROBADO and not hasattr(expediente, "resolucion"):
-                correlativo = generar_correlativo(expediente.asociacion.anio.anio)
-                ResolucionExpediente.objects.create(
+            # Estado, historial, correlativo y resolución en una transacción: la reserva bloquea el año
+            # hasta que la resolución queda insertada.
+            with transaction.atomic():
+                list(ExpedienteCAIMUS.objects.select_for_update().filter(pk=expediente.pk).values_list("pk", flat=True))
+                expediente = form.save(commit=False)
+                if expediente.estado == ExpedienteCAIMUS.ESTADO_APROBADO:
+                    expediente.aprobado_por = request.user
+                    expediente.aprobado_en = timezone.now()
+                    expediente.observacion_admin = ""
+                else:
+                    expediente.aprobado_por = None
+                    expediente.aprobado_en = None
+                expediente.actualizado_por = request.user
+                expediente.save()
+
+                ExpedienteEstadoHistorial.objects.create(
                     expediente=expediente,
-                    correlativo=correlativo,
-                    fecha_emision=timezone.now().date(),
-                    generado_por=request.user,
-                    contenido_snapshot={
-                        "asociacion": expediente.asociacion.nombre,
-                        "anio": expediente.asociacion.anio.anio,
-                        "estado": expediente.estado,
-                    },
+                    estado_anterior=estado_anterior,
+                    estado_nuevo=expediente.estado,
+                    observacion=expediente.observacion_admin,
+                    cambiado_por=request.user,
                 )
 
+                if (
+                    expediente.estado == ExpedienteCAIMUS.ESTADO_APROBADO
+                    and not ResolucionExpediente.objects.filter(expediente=expediente).exists()
+                ):
+                    correlativo = generar_correlativo(expediente.asociacion.anio.anio)
+                    ResolucionExpediente.objects.create(
+                        expediente=expediente,
+                        correlativo=correlativo,
+                        fecha_emision=timezone.now().date(),
+                        generado_por=request.user,
+                        contenido_snapshot={
+                            "asociacion": expediente.asociacion.nombre,
+                            "anio": expediente.asociacion.anio.anio,
+                            "estado": expediente.estado,
+                        },
+                    )
+                    programar_dossier(expediente)
+
             messages.success(request, "Estado actualizado correctamente.")
             return redirect("asociaciones:expediente_caimus", pk=expediente.asociacion.pk)
     else:
@@ -434,45 +494,225 @@ def expediente_revision(request, pk):
 def bandeja_revision(request):
     estado = request.GET.get("estado")
     anio_id = request.GET.get("anio")
-    asociaciones = Asociacion.objects.select_related("anio")
-    expedientes = ExpedienteCAIMUS.objects.select_related("asociacion", "asociacion__anio")
-    if estado:
-        expedientes = expedientes.filter(estado=estado)
-    if anio_id:
-        expedientes = expedientes.filter(asociacion__anio_id=anio_id)
+    if anio_id and not anio_id.isdigit():
+        anio_id = None
+    con_pendientes = request.GET.get("pendientes") == "1"
+    orden = request.GET.get("orden")
+    if orden not in ORDENES:
+        orden = ORDEN_PREDETERMINADO
+    try:
+        tamano = min(max(int(request.GET.get("por_pagina", TAMANO_PAGINA)), 1), TAMANO_PAGINA_MAXIMO)
+    except ValueError:
+        tamano = TAMANO_PAGINA
+
+    expedientes = expedientes_bandeja(anio_id=anio_id, estado=estado, con_pendientes=con_pendientes)
+    pagina = paginar_keyset(expedientes, ORDENES[orden], request.GET.get("despues"), tamano)
+
+    filtros = request.GET.copy()
+    for parametro in ("despues", "orden"):
+        filtros.pop(parametro, None)
+    siguiente = None
+    if pagina.tiene_siguiente:
+        parametros = filtros.copy()
+        parametros["orden"] = orden
+        parametros["despues"] = pagina.cursor_siguiente
+        siguiente = parametros.urlencode()
 
     anios = Anio.objects.all()
     return render(
         request,
         "asociaciones_app/bandeja_revision.html",
         {
-            "expedientes": expedientes,
+            "expedientes": pagina.objetos,
+            "pagina": pagina,
+            "siguiente": siguiente,
+            "filtros": filtros.urlencode(),
+            "orden": orden,
             "anios": anios,
             "estado": estado,
             "anio_id": anio_id,
+            "con_pendientes": con_pendientes,
             "estados": ExpedienteCAIMUS.ESTADOS,
         },
     )
 
 
+@login_required
+@admin_required
+@require_POST
+def expedientes_aprobar(request):
+    filtros = QueryDict(request.POST.get("filtros", ""))
+    destino = f"{reverse('asociaciones:bandeja_revision')}?{filtros.urlencode()}"
+    valores = request.POST.getlist("expedientes")
+    if not all(valor.isdigit() for valor in valores):
+        messages.error(request, "Expediente inválido.")
+        return redirect(destino)
+    try:
+        resultados = aprobar_expedientes([int(valor) for valor in valores], request.user)
+    except ValueError as exc:
+        messages.error(request, str(exc))
+        return redirect(destino)
+
+    aprobados = [resultado for resultado in resultados if resultado.aplicado]
+    messages.success(request, f"{len(aprobados)} de {len(resultados)} expedientes aprobados.")
+    omitidos = [
+        f"{resultado.asociacion or resultado.expediente_id}: {resultado.mensaje}"
+        for resultado in resultados
+        if not resultado.aplicado
+    ]
+    if omitidos:
+        messages.warning(request, "Sin cambios: " + "; ".join(omitidos))
+    return redirect(destino)
+
+
+@login_required
+@admin_required
+def informes_revision_masiva(request):
+    quiere_json = "application/json" in request.headers.get("Accept", "")
+    resultados = None
+    if request.method == "POST":
+        try:
+            resultados = revisar_informes(
+                leer_pares(request.POST.getlist("informes")),
+                request.POST.get("estado"),
+                request.POST.get("observacion_admin", ""),
+                request.user,
+            )
+        except ValueError as exc:
+            if quiere_json:
+                return JsonResponse({"error": str(exc)}, status=400)
+            messages.error(request, str(exc))
+        else:
+            if quiere_json:
+                return JsonResponse({"resultados": [asdict(resultado) for resultado in resultados]})
+            aplicados = sum(resultado.aplicado for resultado in resultados)
+            messages.success(request, f"{aplicados} de {len(resultados)} informes actualizados.")
+
+    anio_id = request.GET.get("anio", "")
+    mes = request.GET.get("mes", "")
+    informes = InformeMensual.objects.filter(estado=InformeMensual.ESTADO_EN_REVISION).select_related(
+        "asociacion", "asociacion__anio"
+    )
+    if anio_id.isdigit():
+        informes = informes.filter(asociacion__anio_id=anio_id)
+    if mes.isdigit():
+        informes = informes.filter(mes=mes)
+    pagina = paginar_keyset(informes, ORDEN_INFORMES_REVISION, request.GET.get("despues"), TAMANO_PAGINA_MAXIMO)
+    filtros = request.GET.copy()
+    filtros.pop("despues", None)
+    siguiente = None
+    if pagina.tiene_siguiente:
+        parametros = filtros.copy()
+        parametros["despues"] = pagina.cursor_siguiente
+        siguiente = parametros.urlencode()
+
+    return render(
+        request,
+        "asociaciones_app/informes_revision_masiva.html",
+        {
+            "informes": pagina.objetos,
+            "pagina": pagina,
+            "siguiente": siguiente,
+            "filtros": filtros.urlencode(),
+            "resultados": resultados,
+            "anios": Anio.objects.all(),
+            "anio_id": anio_id,
+            "mes": mes,
+            "meses": MESES_CHOICES,
+            "estados": InformeMensual.ESTADOS,
+        },
+    )
+
+
+@login_required
+@admin_required
+def matriz_cumplimiento(request):
+    anios = Anio.objects.all()
+    anio_id = request.GET.get("anio", "")
+    anio = anios.filter(pk=anio_id).first() if anio_id.isdigit() else None
+    anio = anio or anios.filter(activo=True).first() or anios.first()
+    if anio is None:
+        return render(request, "asociaciones_app/matriz_cumplimiento.html", {"anio": None, "anios": anios})
+
+    formato = request.GET.get("formato")
+    nombre_archivo = f"cumplimiento_{anio.anio}"
+    if formato == "csv":
+        response = StreamingHttpResponse(exportar_csv(anio.pk), content_type="text/csv; charset=utf-8")
+        response["Content-Disposition"] = f'attachment; filename="{nombre_archivo}.csv"'
+        return response
+    if formato == "xlsx":
+        return FileResponse(
+            exportar_xlsx(anio.pk),
+            as_attachment=True,
+            filename=f"{nombre_archivo}.xlsx",
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+    return render(
+        request,
+        "asociaciones_app/matriz_cumplimiento.html",
+        {
+            "anio": anio,
+            "anios": anios,
+            "filas": filas_matriz(anio.pk),
+            "meses": MESES_CHOICES,
+            "leyenda": [(ABREVIATURAS_ESTADO[estado], etiqueta) for estado, etiqueta in InformeMensual.ESTADOS],
+        },
+    )
+
+
 @login_required
 @admin_required
 def asignaciones_list(request):
     anio_id = request.GET.get("anio")
-    asignaciones = AsociacionUsuario.objects.select_related("asociacion", "asociacion__anio", "usuario")
+    asignaciones = AsociacionUsuario.objects.all()
     if anio_id:
         asignaciones = asignaciones.filter(asociacion__anio_id=anio_id)
+    tabla = AsignacionesTabla(asignaciones, "tabla-asignaciones")
+    if tabla.es_peticion(request):
+        return tabla.respuesta(request)
     anios = Anio.objects.all()
     return render(
         request,
         "asociaciones_app/asignaciones_list.html",
-        {"asignaciones": asignaciones, "anios": anios, "anio_id": anio_id},
+        {"tabla": tabla, "anios": anios, "anio_id": anio_id},
+    )
+
+
+def parametros_autocompletar(request):
+    """``(término, año, página)`` de una búsqueda de select2; el año y la página inválidos se ignoran."""
+    anio_id = request.GET.get("anio", "")
+    pagina = request.GET.get("page", "")
+    return (
+        request.GET.get("term", "").strip()[:100],
+        int(anio_id) if anio_id.isdigit() else None,
+        max(int(pagina), 1) if pagina.isdigit() else 1,
     )
 
 
+@login_required
+@admin_required
+def autocompletar_usuarios(request):
+    termino, anio_id, pagina = parametros_autocompletar(request)
+    return JsonResponse(resultados(buscar_usuarios(termino, anio_id), etiqueta_usuario, pagina))
+
+
+@login_required
+@admin_required
+def autocompletar_asociaciones(request):
+    termino, anio_id, pagina = parametros_autocompletar(request)
+    return JsonResponse(resultados(buscar_asociaciones(termino, anio_id), etiqueta_asociacion, pagina))
+
+
+@login_required
+@admin_required
+def autocompletar_anios(request):
+    termino, _anio_id, pagina = parametros_autocompletar(request)
+    return JsonResponse(resultados(buscar_anios(termino), str, pagina))
+
+
 @asociacion_required
 def resolucion_pdf(request, pk):
-    expediente = get_object_or_404(ExpedienteCAIMUS, pk=pk)
+    expediente = get_object_or_404(ExpedienteCAIMUS.objects.select_related("asociacion__anio"), pk=pk)
 
     if not user_can_download_resolucion(request.user, expediente):
         raise PermissionDenied
@@ -484,31 +724,46 @@ def resolucion_pdf(request, pk):
         return redirect("asociaciones:expediente_caimus", pk=expediente.asociacion.pk)
 
     if is_admin(request.user) and resolucion is None:
-        correlativo = generar_correlativo(expediente.asociacion.anio.anio)
-        resolucion = ResolucionExpediente.objects.create(
-            expediente=expediente,
-            correlativo=correlativo,
-            fecha_emision=timezone.now().date(),
-            generado_por=request.user,
-            contenido_snapshot={
-                "asociacion": expediente.asociacion.nombre,
-                "anio": expediente.asociacion.anio.anio,
-                "estado": expediente.estado,
-            },
-        )
-
-    html = render_to_string(
-        "asociaciones_app/resolucion_pdf.html",
-        {
-            "expediente": expediente,
-            "resolucion": resolucion,
-            "items": expediente.items.all(),
-        },
-        request=request,
-    )
+        # Como en ``expediente_revision``: el año queda bloqueado hasta insertar la resolución, y el
+        # expediente, para que dos administradores que la abren a la vez emitan una sola.
+        with transaction.atomic():
+            list(ExpedienteCAIMUS.objects.select_for_update().filter(pk=expediente.pk).values_list("pk", flat=True))
+            resolucion = ResolucionExpediente.objects.filter(expediente=expediente).first()
+            if resolucion is None:
+                correlativo = generar_correlativo(expediente.asociacion.anio.anio)
+                resolucion = ResolucionExpediente.objects.create(
+                    expediente=expediente,
+                    correlativo=correlativo,
+                    fecha_emision=timezone.now().date(),
+                    generado_por=request.user,
+                    contenido_snapshot={
+                        "asociacion": expediente.asociacion.nombre,
+                        "anio": expediente.asociacion.anio.anio,
+                        "estado": expediente.estado,
+                    },
+                )
+                programar_dossier(expediente)
 
-    pdf = HTML(string=html, base_url=request.build_absolute_uri("/")).write_pdf()
+    pdf = obtener_resolucion_pdf(expediente, resolucion, base_url=request.build_absolute_uri("/"))
 
     response = HttpResponse(pdf, content_type="application/pdf")
     response["Content-Disposition"] = f"inline; filename=Resolucion-{resolucion.correlativo}.pdf"
     return response
+
+
+@asociacion_required
+def dossier_pdf(request, pk):
+    expediente = get_object_or_404(ExpedienteCAIMUS.objects.select_related("asociacion"), pk=pk)
+    if not user_has_expediente_access(request.user, expediente):
+        raise PermissionDenied
+    if not expediente.dossier_pdf:
+        raise Http404("El expediente completo aún no está disponible.")
+    try:
+        archivo = expediente.dossier_pdf.open("rb")
+    except FileNotFoundError:
+        raise Http404("El expediente completo aún no está disponible.")
+    return FileResponse(
+        archivo,
+        content_type="application/pdf",
+        filename=f"Expediente-{expediente.asociacion.codigo}.pdf",
+    )
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from django.contrib import admin
+from django.db.models import Avg, Count, Max
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+
+from .models import ConsultaLenta, TrazaMemoria
+
+
+@admin.register(ConsultaLenta)
+class ConsultaLentaAdmin(admin.ModelAdmin):
+    list_display = ("capturada_en", "vista", "duracion_ms", "huella_corta", "tiene_plan")
+    list_filter = ("vista", "base_datos")
+    search_fields = ("huella", "vista")
+    readonly_fields = [campo.name for campo in ConsultaLenta._meta.fields]
+    date_hierarchy = "capturada_en"
+    change_list_template = "admin/monitoreo_app/consultalenta/change_list.html"
+
+    @admin.display(description="Huella")
+    def huella_corta(self, obj):
+        return obj.huella[:120]
+
+    @admin.display(description="Plan", boolean=True)
+    def tiene_plan(self, obj):
+        return bool(obj.plan)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                "huellas/",
+                self.admin_site.admin_view(self.huellas_view),
+                name="monitoreo_app_consultalenta_huellas",
+            ),
+        ] + super().get_urls()
+
+    def huellas_view(self, request):
+        """Consultas lentas agrupadas por huella, de la que más tiempo acumula a la que menos."""
+        huellas = (
+            ConsultaLenta.objects.values("huella_hash", "huella")
+            .annotate(
+                veces=Count("id"),
+                media_ms=Avg("duracion_ms"),
+                maxima_ms=Max("duracion_ms"),
+                ultima=Max("capturada_en"),
+                vistas=Count("vista", distinct=True),
+            )
+            .order_by("-veces", "-maxima_ms")
+        )
+        changelist = reverse("admin:monitoreo_app_consultalenta_changelist")
+        contexto = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Consultas lentas por huella",
+            "huellas": huellas,
+            "changelist": changelist,
+        }
+        return TemplateResponse(request, "admin/monitoreo_app/consultalenta/huellas.html", contexto)
+
+
+@admin.register(TrazaMemoria)
+class TrazaMemoriaAdmin(admin.ModelAdmin):
+    list_display = ("capturada_en", "vista", "metodo", "estado", "pico_kb", "final_kb", "bytes_peticion")
+    list_filter = ("vista",)
+    readonly_fields = [campo.name for campo in TrazaMemoria._meta.fields]
+    date_hierarchy = "capturada_en"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class MonitoreoAppConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "monitoreo_app"
+    verbose_name = "Monitoreo"
+
+    def ready(self):
+        from asociaciones_app.signals import pdf_generado
+
+        from .metricas import registrar_pdf
+
+        pdf_generado.connect(registrar_pdf, dispatch_uid="monitoreo_metricas_pdf")
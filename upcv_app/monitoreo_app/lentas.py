@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from datetime import timedelta
+from typing import List
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+
+from .models import ConsultaLenta
+from .sql import CapturaLenta, huella_sql
+
+logger = logging.getLogger(__name__)
+
+
+def explicar(sql: str, parametros, alias: str) -> str:
+    """Plan estimado de ``sql``: ``EXPLAIN`` en PostgreSQL y ``EXPLAIN QUERY PLAN`` en SQLite.
+
+    Nunca ``ANALYZE``: volvería a ejecutar la sentencia, con sus bloqueos ``FOR UPDATE`` y sus
+    efectos. Por si acaso, la transacción se revierte siempre.
+    """
+    connection = connections[alias]
+    if connection.vendor == "postgresql":
+        prefijo = "EXPLAIN "
+    elif connection.vendor == "sqlite":
+        prefijo = "EXPLAIN QUERY PLAN "
+    else:
+        return ""
+    try:
+        with transaction.atomic(using=alias), connection.cursor() as cursor:
+            cursor.execute(prefijo + sql, parametros)
+            filas = cursor.fetchall()
+            transaction.set_rollback(True, using=alias)
+    except DatabaseError as exc:
+        return f"No se pudo obtener el plan: {exc}"
+    if connection.vendor == "sqlite":
+        # (id, padre, no usado, detalle)
+        return "\n".join(str(fila[-1]) for fila in filas)
+    return "\n".join(str(fila[0]) for fila in filas)
+
+
+def registrar_consultas_lentas(capturas: List[CapturaLenta], vista: str) -> None:
+    """Guarda las consultas lentas de una request; el plan se pide una vez por huella y periodo."""
+    periodo = timedelta(minutes=getattr(settings, "MONITOREO_CONSULTA_LENTA_PLAN_CADA_MIN", 60))
+    con_plan_reciente = set(
+        ConsultaLenta.objects.filter(capturada_en__gte=timezone.now() - periodo)
+        .exclude(plan="")
+        .values_list("huella_hash", flat=True)
+    )
+    consultas = []
+    for captura in capturas:
+        huella = huella_sql(captura.sql)
+        huella_hash = hashlib.sha256(huella.encode("utf-8")).hexdigest()
+        plan = ""
+        if huella_hash not in con_plan_reciente:
+            plan = explicar(captura.sql, captura.parametros, captura.base_datos)
+            con_plan_reciente.add(huella_hash)
+        consultas.append(
+            ConsultaLenta(
+                huella=huella,
+                huella_hash=huella_hash,
+                sql=captura.sql,
+                duracion_ms=round(captura.duracion_ms, 2),
+                vista=vista,
+                base_datos=captura.base_datos,
+                pila=captura.pila,
+                plan=plan,
+            )
+        )
+    ConsultaLenta.objects.bulk_create(consultas)
+    logger.info("%s consultas lentas registradas en %s.", len(consultas), vista)
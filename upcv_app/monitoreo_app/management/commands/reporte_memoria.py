@@ -0,0 +1,80 @@
+import json
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from asociaciones_app.management.commands.benchmark_resolucion_pdf import percentil
+from monitoreo_app.models import TrazaMemoria
+
+
+def resumir_trazas(trazas, top=10):
+    """Agrupa las trazas por vista: picos p50/p95/máximo y los sitios con más memoria acumulada."""
+    por_vista = defaultdict(list)
+    for traza in trazas:
+        por_vista[traza.vista].append(traza)
+    techos = getattr(settings, "MONITOREO_MEMORIA_TECHOS_KB", {})
+    resumen = {}
+    for vista, lista in sorted(por_vista.items()):
+        picos = [traza.pico_kb for traza in lista]
+        sitios = defaultdict(lambda: {"kb": 0.0, "requests": 0})
+        for traza in lista:
+            for sitio in traza.sitios:
+                sitios[sitio["sitio"]]["kb"] += sitio["kb"]
+                sitios[sitio["sitio"]]["requests"] += 1
+        resumen[vista] = {
+            "requests": len(lista),
+            "pico_p50_kb": percentil(picos, 50),
+            "pico_p95_kb": percentil(picos, 95),
+            "pico_max_kb": max(picos),
+            "bytes_peticion_max": max(traza.bytes_peticion for traza in lista),
+            "techo_kb": techos.get(vista),
+            "sitios": [
+                {"sitio": sitio, "kb_total": round(datos["kb"], 1), "requests": datos["requests"]}
+                for sitio, datos in sorted(sitios.items(), key=lambda item: -item[1]["kb"])[:top]
+            ],
+        }
+    return resumen
+
+
+class Command(BaseCommand):
+    help = "Resume las trazas de memoria de subidas y PDF por vista y las compara con MONITOREO_MEMORIA_TECHOS_KB"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dias", type=int, default=7, help="Trazas de los últimos N días")
+        parser.add_argument("--vista", type=str, help="Solo esta vista (p. ej. asociaciones:item_upload)")
+        parser.add_argument("--top", type=int, default=10, help="Sitios de asignación por vista")
+        parser.add_argument("--json", action="store_true", help="Imprime el resumen como JSON")
+        parser.add_argument("--estricto", action="store_true", help="Falla si alguna vista supera su techo")
+
+    def handle(self, *args, **options):
+        trazas = TrazaMemoria.objects.filter(capturada_en__gte=timezone.now() - timedelta(days=options["dias"]))
+        if options["vista"]:
+            trazas = trazas.filter(vista=options["vista"])
+        resumen = resumir_trazas(trazas.only("vista", "pico_kb", "bytes_peticion", "sitios"), options["top"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(resumen, indent=2, ensure_ascii=False))
+        else:
+            if not resumen:
+                self.stdout.write("No hay trazas de memoria en el periodo.")
+            for vista, datos in resumen.items():
+                techo = f"{datos['techo_kb']:.0f}KB" if datos["techo_kb"] else "-"
+                self.stdout.write(
+                    f"{vista}: {datos['requests']} requests, pico p50={datos['pico_p50_kb']:.1f}KB "
+                    f"p95={datos['pico_p95_kb']:.1f}KB max={datos['pico_max_kb']:.1f}KB techo={techo}"
+                )
+                for sitio in datos["sitios"]:
+                    self.stdout.write(f"    {sitio['kb_total']:>10.1f}KB en {sitio['requests']:>4} requests  {sitio['sitio']}")
+
+        excedidas = [
+            f"{vista}: {datos['pico_max_kb']:.1f}KB > {datos['techo_kb']}KB"
+            for vista, datos in resumen.items()
+            if datos["techo_kb"] and datos["pico_max_kb"] > datos["techo_kb"]
+        ]
+        if excedidas and options["estricto"]:
+            raise CommandError("Vistas sobre su techo de memoria:\n" + "\n".join(excedidas))
+        for excedida in excedidas:
+            self.stdout.write(self.style.WARNING(f"Sobre el techo: {excedida}"))
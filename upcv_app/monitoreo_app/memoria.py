@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import os
+import threading
+import tracemalloc
+from typing import Dict, List
+
+from django.conf import settings
+
+from .models import TrazaMemoria
+
+FILTROS_PROPIOS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def ruta_legible(archivo: str) -> str:
+    raiz = str(settings.BASE_DIR)
+    if archivo.startswith(raiz):
+        return archivo[len(raiz) + 1:]
+    partes = archivo.replace("\\", "/").split("/site-packages/", 1)
+    return partes[-1] if len(partes) == 2 else os.path.basename(archivo)
+
+
+def sitios_principales(snapshot: tracemalloc.Snapshot, top: int) -> List[Dict[str, object]]:
+    """Las ``top`` líneas con más memoria todavía asignada en ``snapshot``."""
+    sitios = []
+    for estadistica in snapshot.filter_traces(FILTROS_PROPIOS).statistics("lineno")[:top]:
+        marco = estadistica.traceback[0]
+        sitios.append(
+            {
+                "sitio": f"{ruta_legible(marco.filename)}:{marco.lineno}",
+                "kb": round(estadistica.size / 1024, 1),
+                "bloques": estadistica.count,
+            }
+        )
+    return sitios
+
+
+class TrazadorMemoria:
+    """Mide con ``tracemalloc`` una request a la vez; ``tracemalloc`` es global al proceso.
+
+    Si ya hay una request trazándose, o ``tracemalloc`` lo inició otra herramienta, ``iniciar``
+    devuelve ``False`` y la request se atiende sin trazar.
+    """
+
+    bloqueo = threading.Lock()
+
+    def __init__(self, marcos: int = 1):
+        self.marcos = marcos
+
+    def iniciar(self) -> bool:
+        if not self.bloqueo.acquire(blocking=False):
+            return False
+        if tracemalloc.is_tracing():
+            self.bloqueo.release()
+            return False
+        tracemalloc.start(self.marcos)
+        return True
+
+    def terminar(self, top: int) -> Dict[str, object]:
+        try:
+            final, pico = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+            self.bloqueo.release()
+        return {
+            "pico_kb": round(pico / 1024, 1),
+            "final_kb": round(final / 1024, 1),
+            "sitios": sitios_principales(snapshot, top),
+        }
+
+
+def guardar_traza(datos: Dict[str, object]) -> None:
+    TrazaMemoria.objects.create(**datos)
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+
+from asociaciones_app.tareas import tareas_pendientes
+
+logger = logging.getLogger(__name__)
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BUCKETS_BYTES = tuple(kb * 1024 for kb in (10, 100, 500, 1024, 5 * 1024, 10 * 1024, 25 * 1024, 50 * 1024))
+
+Etiquetas = Tuple[Tuple[str, str], ...]
+
+
+@dataclass(frozen=True)
+class Metrica:
+    nombre: str
+    tipo: str
+    ayuda: str
+    buckets: Tuple[float, ...] = ()
+
+
+METRICAS: Dict[str, Metrica] = {}
+
+
+def _definir(nombre: str, tipo: str, ayuda: str, buckets: Tuple[float, ...] = ()) -> str:
+    METRICAS[nombre] = Metrica(nombre, tipo, ayuda, buckets)
+    return nombre
+
+
+SOLICITUDES = _definir("caimus_http_solicitudes_total", "counter", "Requests atendidas por URL, método y estado.")
+LATENCIA = _definir("caimus_http_duracion_segundos", "histogram", "Duración de las requests por URL.", BUCKETS_SEGUNDOS)
+DURACION_DB = _definir(
+    "caimus_db_duracion_segundos", "histogram", "Tiempo de base de datos por request y URL.", BUCKETS_SEGUNDOS
+)
+DURACION_PDF = _definir(
+    "caimus_pdf_duracion_segundos", "histogram", "Tiempo de generación de PDF por documento y motor.", BUCKETS_SEGUNDOS
+)
+SUBIDA_BYTES = _definir("caimus_subida_bytes", "histogram", "Tamaño de las subidas de archivos por URL.", BUCKETS_BYTES)
+SUBIDA_DURACION = _definir(
+    "caimus_subida_duracion_segundos", "histogram", "Duración de las subidas de archivos por URL.", BUCKETS_SEGUNDOS
+)
+TAREAS_PENDIENTES = _definir("caimus_tareas_pendientes", "gauge", "Tareas en la cola de segundo plano.")
+
+
+def directorio_metricas() -> Path:
+    return Path(getattr(settings, "MONITOREO_METRICAS_DIR", Path(settings.BASE_DIR) / "metricas"))
+
+
+def _etiquetas(etiquetas: Dict[str, object]) -> Etiquetas:
+    return tuple(sorted((clave, str(valor)) for clave, valor in etiquetas.items()))
+
+
+def _copiar(valor):
+    return {**valor, "buckets": list(valor["buckets"])} if isinstance(valor, dict) else valor
+
+
+class RegistroMetricas:
+    """Métricas de este proceso, guardadas en ``MONITOREO_METRICAS_DIR`` para agregarlas entre procesos.
+
+    Cada proceso escribe su propio archivo JSON como mucho cada ``MONITOREO_METRICAS_INTERVALO``
+    segundos; ``exportar`` suma los archivos de todos los procesos. Los contadores e histogramas de
+    procesos que ya terminaron se siguen sumando; los indicadores (gauges) solo cuentan si su archivo
+    se actualizó dentro de ``MONITOREO_METRICAS_VIGENCIA``.
+
+    El nombre del archivo se calcula al guardar: el registro se crea al importar el módulo y un
+    servidor que hace fork después reparte la misma instancia entre varios procesos hijos.
+    """
+
+    def __init__(self):
+        self.bloqueo = threading.Lock()
+        self.valores: Dict[str, Dict[Etiquetas, object]] = defaultdict(dict)
+        self.sufijo = uuid.uuid4().hex[:8]
+        self.ultimo_guardado = 0.0
+
+    def reiniciar(self) -> None:
+        self.bloqueo = threading.Lock()
+        self.valores = defaultdict(dict)
+        self.ultimo_guardado = 0.0
+
+    @property
+    def archivo(self) -> str:
+        return f"metricas-{os.getpid()}-{self.sufijo}.json"
+
+    def incrementar(self, nombre: str, etiquetas: Dict[str, object], valor: float = 1) -> None:
+        clave = _etiquetas(etiquetas)
+        with self.bloqueo:
+            serie = self.valores[nombre]
+            serie[clave] = serie.get(clave, 0) + valor
+
+    def fijar(self, nombre: str, etiquetas: Dict[str, object], valor: float) -> None:
+        with self.bloqueo:
+            self.valores[nombre][_etiquetas(etiquetas)] = valor
+
+    def observar(self, nombre: str, etiquetas: Dict[str, object], valor: float) -> None:
+        buckets = METRICAS[nombre].buckets
+        clave = _etiquetas(etiquetas)
+        with self.bloqueo:
+            serie = self.valores[nombre]
+            if clave not in serie:
+                serie[clave] = {"buckets": [0] * (len(buckets) + 1), "suma": 0.0, "cuenta": 0}
+            histograma = serie[clave]
+            histograma["buckets"][bisect_left(buckets, valor)] += 1
+            histograma["suma"] += valor
+            histograma["cuenta"] += 1
+
+    def instantanea(self) -> Dict[str, object]:
+        self.fijar(TAREAS_PENDIENTES, {}, tareas_pendientes())
+        with self.bloqueo:
+            metricas = {
+                nombre: [[list(map(list, clave)), _copiar(valor)] for clave, valor in serie.items()]
+                for nombre, serie in self.valores.items()
+            }
+        return {"pid": os.getpid(), "actualizado": time.time(), "metricas": metricas}
+
+    def guardar(self, forzar: bool = False) -> None:
+        ahora = time.monotonic()
+        if not forzar and ahora - self.ultimo_guardado < getattr(settings, "MONITOREO_METRICAS_INTERVALO", 5):
+            return
+        self.ultimo_guardado = ahora
+        directorio = directorio_metricas()
+        archivo = self.archivo
+        temporal = directorio / f"{archivo}.{threading.get_ident()}.tmp"
+        try:
+            directorio.mkdir(parents=True, exist_ok=True)
+            temporal.write_text(json.dumps(self.instantanea()), encoding="utf-8")
+            os.replace(temporal, directorio / archivo)
+        except OSError:
+            # Un disco lleno o sin permisos no debe tumbar la request que disparó el guardado.
+            logger.warning("No se pudieron guardar las métricas en %s", directorio, exc_info=True)
+            try:
+                temporal.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    def exportar(self) -> str:
+        """Texto en formato de exposición de Prometheus con las métricas de todos los procesos."""
+        self.guardar(forzar=True)
+        return formatear(agregar_archivos(directorio_metricas()))
+
+
+def agregar_archivos(directorio: Path) -> Dict[str, Dict[Etiquetas, object]]:
+    vigencia = getattr(settings, "MONITOREO_METRICAS_VIGENCIA", 300)
+    retencion = getattr(settings, "MONITOREO_METRICAS_RETENCION_DIAS", 7) * 86400
+    ahora = time.time()
+    total: Dict[str, Dict[Etiquetas, object]] = defaultdict(dict)
+    for ruta in sorted(directorio.glob("metricas-*.json")):
+        try:
+            datos = json.loads(ruta.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        antiguedad = ahora - datos["actualizado"]
+        if antiguedad > retencion:
+            ruta.unlink(missing_ok=True)
+            continue
+        for nombre, series in datos["metricas"].items():
+            metrica = METRICAS.get(nombre)
+            if metrica is None or (metrica.tipo == "gauge" and antiguedad > vigencia):
+                continue
+            for clave, valor in series:
+                clave = tuple(tuple(par) for par in clave)
+                actual = total[nombre].get(clave)
+                if metrica.tipo == "histogram":
+                    if actual is None:
+                        actual = total[nombre][clave] = {"buckets": [0] * len(valor["buckets"]), "suma": 0.0, "cuenta": 0}
+                    actual["buckets"] = [a + b for a, b in zip(actual["buckets"], valor["buckets"])]
+                    actual["suma"] += valor["suma"]
+                    actual["cuenta"] += valor["cuenta"]
+                else:
+                    total[nombre][clave] = (actual or 0) + valor
+    return total
+
+
+def _numero(valor: float) -> str:
+    valor = float(valor)
+    return str(int(valor)) if valor.is_integer() else repr(valor)
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatear_etiquetas(etiquetas: Etiquetas) -> str:
+    if not etiquetas:
+        return ""
+    return "{" + ",".join(f'{clave}="{_escapar(valor)}"' for clave, valor in etiquetas) + "}"
+
+
+def formatear(total: Dict[str, Dict[Etiquetas, object]]) -> str:
+    lineas: List[str] = []
+    for nombre, metrica in METRICAS.items():
+        lineas.append(f"# HELP {nombre} {metrica.ayuda}")
+        lineas.append(f"# TYPE {nombre} {metrica.tipo}")
+        for clave, valor in sorted(total.get(nombre, {}).items()):
+            if metrica.tipo != "histogram":
+                lineas.append(f"{nombre}{_formatear_etiquetas(clave)} {_numero(valor)}")
+                continue
+            acumulado = 0
+            for limite, cantidad in zip([*map(repr, metrica.buckets), "+Inf"], valor["buckets"]):
+                acumulado += cantidad
+                lineas.append(f"{nombre}_bucket{_formatear_etiquetas(clave + (('le', limite),))} {acumulado}")
+            lineas.append(f"{nombre}_sum{_formatear_etiquetas(clave)} {_numero(valor['suma'])}")
+            lineas.append(f"{nombre}_count{_formatear_etiquetas(clave)} {valor['cuenta']}")
+    return "\n".join(lineas) + "\n"
+
+
+registro = RegistroMetricas()
+
+if hasattr(os, "register_at_fork"):
+    # Un hijo recién creado no debe volver a sumar lo que el padre contó antes del fork.
+    os.register_at_fork(after_in_child=registro.reiniciar)
+
+
+def registrar_pdf(sender, documento: str, motor: str, duracion: float, **kwargs) -> None:
+    registro.observar(DURACION_PDF, {"documento": documento, "motor": motor}, duracion)
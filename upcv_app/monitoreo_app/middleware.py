@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import cProfile
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from asociaciones_app.tareas import encolar_tarea
+
+from .lentas import registrar_consultas_lentas
+from .memoria import TrazadorMemoria, guardar_traza
+from .metricas import DURACION_DB, LATENCIA, SOLICITUDES, SUBIDA_BYTES, SUBIDA_DURACION, registro as registro_metricas
+from .perfiles import guardar_perfil
+from .plantillas import RegistroPlantillas, instalar as instalar_plantillas, registro_actual as plantillas_actual
+from .sql import RegistroSQL, huella_sql
+
+logger = logging.getLogger("monitoreo.sql")
+logger_muestras = logging.getLogger("monitoreo.sql.muestras")
+
+
+def nombre_url(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match and match.view_name else "sin_resolver"
+
+
+def puede_ver_tiempos(request) -> bool:
+    """``Server-Timing`` revela tiempos y cantidad de consultas: solo en DEBUG o para el personal."""
+    if settings.DEBUG:
+        return True
+    usuario = getattr(request, "user", None)
+    return bool(usuario is not None and usuario.is_staff)
+
+
+def agregar_server_timing(response, *metricas: str) -> None:
+    existente = response.get("Server-Timing")
+    response["Server-Timing"] = ", ".join(filter(None, [existente, *metricas]))
+
+
+class InstrumentacionSQLMiddleware:
+    """Cuenta consultas y tiempo de base de datos por request.
+
+    Los publica en una línea JSON del logger ``monitoreo.sql`` y, en DEBUG o para el personal, en
+    ``Server-Timing``. Las requests que superan ``MONITOREO_SQL_UMBRAL_CONSULTAS`` o
+    ``MONITOREO_SQL_UMBRAL_MS`` se muestrean en ``monitoreo.sql.muestras`` con la huella y la
+    duración de cada sentencia; nunca con sus parámetros, que pueden traer sesiones o contraseñas.
+    Las sentencias que tardan al menos ``MONITOREO_CONSULTA_LENTA_MS`` se guardan como
+    ``ConsultaLenta`` con su plan, en la cola de tareas para no demorar la respuesta. Con
+    ``MONITOREO_PLANTILLAS_ACTIVO`` mide además el render de cada plantilla e ``{% include %}`` y
+    atribuye las consultas hechas durante el render a la línea de plantilla que las disparó. Con
+    ``MONITOREO_SQL_ACTIVO = False`` Django descarta el middleware al arrancar y no queda ningún
+    costo por request.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "MONITOREO_SQL_ACTIVO", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.umbral_consultas = getattr(settings, "MONITOREO_SQL_UMBRAL_CONSULTAS", 50)
+        self.umbral_ms = getattr(settings, "MONITOREO_SQL_UMBRAL_MS", 500)
+        self.muestreo = getattr(settings, "MONITOREO_SQL_MUESTREO", 1.0)
+        self.umbral_lenta_ms = getattr(settings, "MONITOREO_CONSULTA_LENTA_MS", None)
+        self.plantillas = getattr(settings, "MONITOREO_PLANTILLAS_ACTIVO", False)
+        if self.plantillas:
+            instalar_plantillas()
+
+    def __call__(self, request):
+        registro = RegistroSQL(umbral_lenta_ms=self.umbral_lenta_ms)
+        plantillas = RegistroPlantillas() if self.plantillas else None
+        inicio = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(registro))
+                if plantillas is not None:
+                    stack.enter_context(connections[alias].execute_wrapper(plantillas))
+            if plantillas is not None:
+                token = plantillas_actual.set(plantillas)
+                stack.callback(plantillas_actual.reset, token)
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - inicio) * 1000
+        request.registro_sql = registro
+        request.registro_plantillas = plantillas
+
+        repetidas = registro.repetidas()
+        metricas = [
+            f'db;dur={registro.duracion_ms:.1f};desc="{registro.consultas} consultas"',
+            f"app;dur={total_ms - registro.duracion_ms:.1f}",
+        ]
+        if plantillas is not None:
+            metricas.append(f'tpl;dur={plantillas.total_ms:.1f};desc="plantillas"')
+        if puede_ver_tiempos(request):
+            agregar_server_timing(response, *metricas)
+        datos = {
+            "url": nombre_url(request),
+            "metodo": request.method,
+            "estado": response.status_code,
+            "consultas": registro.consultas,
+            "db_ms": round(registro.duracion_ms, 2),
+            "total_ms": round(total_ms, 2),
+            "repetidas": sum(veces for veces, _huella in repetidas),
+        }
+        if plantillas is not None:
+            datos["plantillas_ms"] = round(plantillas.total_ms, 2)
+            datos["plantillas_db_ms"] = round(plantillas.db_ms, 2)
+        logger.info(json.dumps(datos, ensure_ascii=False), extra={"monitoreo": datos})
+
+        supera_umbral = registro.consultas >= self.umbral_consultas or registro.duracion_ms >= self.umbral_ms
+        if supera_umbral and random.random() < self.muestreo:
+            huellas = {sql: huella_sql(sql) for sql in {sql for sql, _params, _duracion in registro.sentencias}}
+            muestra = {
+                **datos,
+                "ruta": request.get_full_path(),
+                "huellas_repetidas": [{"veces": veces, "sql": huella} for veces, huella in repetidas],
+                "sentencias": [
+                    {"ms": round(duracion * 1000, 2), "sql": huellas[sql]}
+                    for sql, _params, duracion in registro.sentencias
+                ],
+            }
+            if plantillas is not None:
+                muestra.update(plantillas.resumen())
+            logger_muestras.warning(json.dumps(muestra, ensure_ascii=False))
+        if registro.lentas:
+            encolar_tarea(registrar_consultas_lentas, registro.lentas, datos["url"])
+        return response
+
+
+class PerfiladorMiddleware:
+    """Perfila requests individuales con ``cProfile`` y guarda el resultado en ``MONITOREO_PERFIL_DIR``.
+
+    Un superusuario lo pide con ``?<MONITOREO_PERFIL_PARAMETRO>=1`` o con la cabecera
+    ``X-Perfilar``; además, con ``MONITOREO_PERFIL_MUESTREO`` se perfila una fracción de todas las
+    requests. Sin ``MONITOREO_PERFIL_ACTIVO`` el middleware no se instala. Debe ir después de
+    ``AuthenticationMiddleware``.
+    """
+
+    # cProfile no admite dos perfiladores activos a la vez en el mismo proceso; si ya hay uno
+    # corriendo en otro hilo, la request se atiende sin perfilar.
+    bloqueo = threading.Lock()
+
+    def __init__(self, get_response):
+        if not getattr(settings, "MONITOREO_PERFIL_ACTIVO", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.parametro = getattr(settings, "MONITOREO_PERFIL_PARAMETRO", "_perfilar")
+        self.muestreo = getattr(settings, "MONITOREO_PERFIL_MUESTREO", 0.0)
+
+    def modo(self, request):
+        usuario = getattr(request, "user", None)
+        if usuario is not None and usuario.is_superuser:
+            if self.parametro in request.GET or "HTTP_X_PERFILAR" in request.META:
+                return "demanda"
+        if self.muestreo and random.random() < self.muestreo:
+            return "muestreo"
+        return None
+
+    def __call__(self, request):
+        modo = self.modo(request)
+        if modo is None or not self.bloqueo.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            perfil = cProfile.Profile()
+            inicio = time.perf_counter()
+            perfil.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                perfil.disable()
+            duracion_ms = (time.perf_counter() - inicio) * 1000
+        finally:
+            self.bloqueo.release()
+
+        nombre = guardar_perfil(
+            perfil,
+            {
+                "url": nombre_url(request),
+                "ruta": request.get_full_path(),
+                "metodo": request.method,
+                "estado": response.status_code,
+                "modo": modo,
+                "usuario": request.user.get_username() if getattr(request, "user", None) else "",
+                "duracion_ms": round(duracion_ms, 2),
+            },
+        )
+        if modo == "demanda":
+            response["X-Perfil"] = nombre
+        return response
+
+
+class MetricasMiddleware:
+    """Alimenta el registro de ``monitoreo_app.metricas`` con latencia, estado y tiempo de base de datos.
+
+    Va antes de ``InstrumentacionSQLMiddleware`` para leer ``request.registro_sql`` cuando este
+    termina. Las URLs de ``MONITOREO_METRICAS_SUBIDAS`` registran además bytes y duración de la subida.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "MONITOREO_METRICAS_ACTIVO", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.subidas = set(getattr(settings, "MONITOREO_METRICAS_SUBIDAS", ()))
+
+    def __call__(self, request):
+        inicio = time.perf_counter()
+        response = self.get_response(request)
+        duracion = time.perf_counter() - inicio
+
+        url = nombre_url(request)
+        if url == "metricas":
+            return response
+        registro_metricas.incrementar(SOLICITUDES, {"url": url, "metodo": request.method, "estado": response.status_code})
+        registro_metricas.observar(LATENCIA, {"url": url}, duracion)
+        registro_sql = getattr(request, "registro_sql", None)
+        if registro_sql is not None:
+            registro_metricas.observar(DURACION_DB, {"url": url}, registro_sql.duracion)
+        if url in self.subidas and request.method == "POST":
+            registro_metricas.observar(SUBIDA_BYTES, {"url": url}, int(request.META.get("CONTENT_LENGTH") or 0))
+            registro_metricas.observar(SUBIDA_DURACION, {"url": url}, duracion)
+        registro_metricas.guardar()
+        return response
+
+
+class TrazadorMemoriaMiddleware:
+    """Traza con ``tracemalloc`` las vistas de ``MONITOREO_MEMORIA_URLS`` y guarda una ``TrazaMemoria``.
+
+    Registra el pico de memoria de la request y las líneas con más memoria asignada al terminar la
+    vista (el PDF de la respuesta incluido). El trazado empieza en ``process_view``, así que el
+    middleware debe ir antes de ``CsrfViewMiddleware``, que es quien lee el cuerpo de los POST.
+    Solo se instala con ``MONITOREO_MEMORIA_ACTIVO``.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "MONITOREO_MEMORIA_ACTIVO", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.urls = set(getattr(settings, "MONITOREO_MEMORIA_URLS", ()))
+        self.top = getattr(settings, "MONITOREO_MEMORIA_TOP", 10)
+        self.trazador = TrazadorMemoria(getattr(settings, "MONITOREO_MEMORIA_MARCOS", 1))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if nombre_url(request) in self.urls and self.trazador.iniciar():
+            request.trazando_memoria = True
+        return None
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            resultado = self.trazador.terminar(self.top) if getattr(request, "trazando_memoria", False) else None
+        if resultado is not None:
+            encolar_tarea(
+                guardar_traza,
+                {
+                    "vista": nombre_url(request),
+                    "ruta": request.get_full_path()[:500],
+                    "metodo": request.method,
+                    "estado": response.status_code,
+                    "bytes_peticion": int(request.META.get("CONTENT_LENGTH") or 0),
+                    **resultado,
+                },
+            )
+        return response
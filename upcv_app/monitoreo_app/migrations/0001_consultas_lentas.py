@@ -0,0 +1,36 @@
+# Generated by Django 5.1.4 on 2026-10-19 04:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ConsultaLenta",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("huella", models.TextField()),
+                ("huella_hash", models.CharField(db_index=True, max_length=64)),
+                ("sql", models.TextField()),
+                ("parametros", models.TextField(blank=True)),
+                ("duracion_ms", models.FloatField()),
+                ("vista", models.CharField(blank=True, db_index=True, max_length=150)),
+                ("base_datos", models.CharField(default="default", max_length=50)),
+                ("pila", models.TextField(blank=True)),
+                ("plan", models.TextField(blank=True)),
+                ("capturada_en", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Consulta lenta",
+                "verbose_name_plural": "Consultas lentas",
+                "ordering": ["-capturada_en"],
+                "indexes": [models.Index(fields=["-capturada_en"], name="consulta_lenta_fecha_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.4 on 2026-10-19 04:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoreo_app", "0001_consultas_lentas"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrazaMemoria",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("vista", models.CharField(db_index=True, max_length=150)),
+                ("ruta", models.CharField(max_length=500)),
+                ("metodo", models.CharField(max_length=10)),
+                ("estado", models.PositiveSmallIntegerField()),
+                ("bytes_peticion", models.PositiveBigIntegerField(default=0)),
+                ("pico_kb", models.FloatField()),
+                ("final_kb", models.FloatField()),
+                ("sitios", models.JSONField(default=list)),
+                ("capturada_en", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Traza de memoria",
+                "verbose_name_plural": "Trazas de memoria",
+                "ordering": ["-capturada_en"],
+                "indexes": [models.Index(fields=["vista", "-capturada_en"], name="traza_memoria_vista_idx")],
+            },
+        ),
+    ]
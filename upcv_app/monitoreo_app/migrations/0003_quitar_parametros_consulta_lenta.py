@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-19 05:50
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoreo_app", "0002_trazas_memoria"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="consultalenta",
+            name="parametros",
+        ),
+    ]
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from django.db import models
+
+
+class ConsultaLenta(models.Model):
+    huella = models.TextField()
+    huella_hash = models.CharField(max_length=64, db_index=True)
+    sql = models.TextField()
+    duracion_ms = models.FloatField()
+    vista = models.CharField(max_length=150, blank=True, db_index=True)
+    base_datos = models.CharField(max_length=50, default="default")
+    pila = models.TextField(blank=True)
+    plan = models.TextField(blank=True)
+    capturada_en = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Consulta lenta"
+        verbose_name_plural = "Consultas lentas"
+        indexes = [
+            models.Index(fields=["-capturada_en"], name="consulta_lenta_fecha_idx"),
+        ]
+        ordering = ["-capturada_en"]
+
+    def __str__(self) -> str:
+        return f"{self.vista or 'sin vista'} {self.duracion_ms:.0f} ms"
+
+
+class TrazaMemoria(models.Model):
+    vista = models.CharField(max_length=150, db_index=True)
+    ruta = models.CharField(max_length=500)
+    metodo = models.CharField(max_length=10)
+    estado = models.PositiveSmallIntegerField()
+    bytes_peticion = models.PositiveBigIntegerField(default=0)
+    pico_kb = models.FloatField()
+    final_kb = models.FloatField()
+    sitios = models.JSONField(default=list)
+    capturada_en = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Traza de memoria"
+        verbose_name_plural = "Trazas de memoria"
+        indexes = [
+            models.Index(fields=["vista", "-capturada_en"], name="traza_memoria_vista_idx"),
+        ]
+        ordering = ["-capturada_en"]
+
+    def __str__(self) -> str:
+        return f"{self.vista} {self.pico_kb:.0f} KB"
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import pstats
+import re
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+RE_NOMBRE_PERFIL = re.compile(r"^[\w.-]+$")
+
+
+def directorio_perfiles() -> Path:
+    return Path(getattr(settings, "MONITOREO_PERFIL_DIR", Path(settings.BASE_DIR) / "perfiles"))
+
+
+def resumen_perfil(estadisticas: pstats.Stats, top: int) -> List[Dict[str, object]]:
+    """Las ``top`` funciones con mayor tiempo acumulado, listas para mostrar en una tabla."""
+    estadisticas.sort_stats(pstats.SortKey.CUMULATIVE)
+    filas = []
+    for funcion in estadisticas.fcn_list[:top]:
+        primitivas, llamadas, propio, acumulado, _llamadores = estadisticas.stats[funcion]
+        archivo, linea, nombre = funcion
+        filas.append(
+            {
+                "funcion": nombre if archivo == "~" else f"{archivo}:{linea}({nombre})",
+                "llamadas": llamadas if llamadas == primitivas else f"{llamadas}/{primitivas}",
+                "propio_ms": round(propio * 1000, 2),
+                "acumulado_ms": round(acumulado * 1000, 2),
+            }
+        )
+    return filas
+
+
+def guardar_perfil(perfil, metadatos: Dict[str, object]) -> str:
+    """Guarda ``<nombre>.prof`` y ``<nombre>.json`` (metadatos y resumen) y devuelve ``nombre``."""
+    directorio = directorio_perfiles()
+    directorio.mkdir(parents=True, exist_ok=True)
+    url = re.sub(r"[^\w-]", "_", str(metadatos.get("url", "sin_resolver")))
+    nombre = f"{timezone.now():%Y%m%d-%H%M%S}_{url}_{uuid.uuid4().hex[:8]}"
+
+    perfil.dump_stats(directorio / f"{nombre}.prof")
+    estadisticas = pstats.Stats(perfil)
+    datos = {
+        **metadatos,
+        "nombre": nombre,
+        "creado_en": timezone.now().isoformat(),
+        "funciones": estadisticas.total_calls,
+        "resumen": resumen_perfil(estadisticas, getattr(settings, "MONITOREO_PERFIL_TOP", 40)),
+    }
+    (directorio / f"{nombre}.json").write_text(json.dumps(datos, ensure_ascii=False), encoding="utf-8")
+    depurar_perfiles(getattr(settings, "MONITOREO_PERFIL_MAXIMO", 200))
+    return nombre
+
+
+def depurar_perfiles(maximo: int) -> None:
+    """Borra los perfiles más antiguos cuando hay más de ``maximo``."""
+    resumenes = sorted(directorio_perfiles().glob("*.json"), reverse=True)
+    for resumen in resumenes[maximo:]:
+        resumen.with_suffix(".prof").unlink(missing_ok=True)
+        resumen.unlink(missing_ok=True)
+
+
+def ruta_perfil(nombre: str, extension: str) -> Optional[Path]:
+    """Ruta del archivo del perfil ``nombre``; ``None`` si el nombre no es válido o no existe."""
+    if not RE_NOMBRE_PERFIL.match(nombre):
+        return None
+    ruta = directorio_perfiles() / f"{nombre}{extension}"
+    return ruta if ruta.is_file() else None
+
+
+def leer_perfil(nombre: str) -> Optional[Dict[str, object]]:
+    ruta = ruta_perfil(nombre, ".json")
+    if ruta is None:
+        return None
+    return json.loads(ruta.read_text(encoding="utf-8"))
+
+
+def listar_perfiles() -> List[Dict[str, object]]:
+    """Metadatos de los perfiles guardados, del más reciente al más antiguo."""
+    directorio = directorio_perfiles()
+    if not directorio.is_dir():
+        return []
+    perfiles = []
+    for ruta in sorted(directorio.glob("*.json"), reverse=True):
+        datos = json.loads(ruta.read_text(encoding="utf-8"))
+        datos.pop("resumen", None)
+        perfiles.append(datos)
+    return perfiles
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import sys
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from django.template.base import Node, Template
+
+registro_actual: ContextVar[Optional["RegistroPlantillas"]] = ContextVar("registro_plantillas", default=None)
+
+_CODIGO_RENDER_NODO = Node.render_annotated.__code__
+_render_original = None
+
+
+def nombre_plantilla(template: Template) -> str:
+    return template.origin.template_name or template.name or "<cadena>"
+
+
+def linea_en_render() -> Optional[Tuple[str, int]]:
+    """``(plantilla, línea)`` del nodo de plantilla que se está renderizando, según la pila de Python."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_code is _CODIGO_RENDER_NODO:
+            nodo = frame.f_locals.get("self")
+            token = getattr(nodo, "token", None)
+            if token is not None:
+                origen = getattr(nodo, "origin", None)
+                return (getattr(origen, "template_name", None) or "<cadena>", token.lineno)
+        frame = frame.f_back
+    return None
+
+
+class RegistroPlantillas:
+    """Tiempos de render por plantilla y consultas atribuidas a la línea de plantilla que las disparó.
+
+    También es un ``execute_wrapper``: mientras hay una plantilla en render, cada consulta se suma a
+    esa plantilla y a la línea cuyo nodo la provocó (por ejemplo un ``{% for %}`` sobre un queryset).
+    """
+
+    def __init__(self):
+        self.pila: List[list] = []
+        self.total_ms = 0.0
+        self.plantillas: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"renders": 0, "ms": 0.0, "propio_ms": 0.0, "consultas": 0, "db_ms": 0.0}
+        )
+        self.lineas: Dict[Tuple[str, int], Dict[str, float]] = defaultdict(lambda: {"consultas": 0, "db_ms": 0.0})
+
+    def entrar(self, nombre: str) -> None:
+        self.pila.append([nombre, time.perf_counter(), 0.0])
+
+    def salir(self) -> None:
+        nombre, inicio, hijos_ms = self.pila.pop()
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+        datos = self.plantillas[nombre]
+        datos["renders"] += 1
+        datos["ms"] += duracion_ms
+        datos["propio_ms"] += duracion_ms - hijos_ms
+        if self.pila:
+            self.pila[-1][2] += duracion_ms
+        else:
+            self.total_ms += duracion_ms
+
+    def __call__(self, execute, sql, params, many, context):
+        if not self.pila:
+            return execute(sql, params, many, context)
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion_ms = (time.perf_counter() - inicio) * 1000
+            datos = self.plantillas[self.pila[-1][0]]
+            datos["consultas"] += 1
+            datos["db_ms"] += duracion_ms
+            linea = linea_en_render()
+            if linea is not None:
+                self.lineas[linea]["consultas"] += 1
+                self.lineas[linea]["db_ms"] += duracion_ms
+
+    @property
+    def db_ms(self) -> float:
+        return sum(datos["db_ms"] for datos in self.plantillas.values())
+
+    def resumen(self) -> Dict[str, object]:
+        return {
+            "plantillas": [
+                {"plantilla": nombre, **{clave: round(valor, 2) for clave, valor in datos.items()}}
+                for nombre, datos in sorted(self.plantillas.items(), key=lambda item: -item[1]["propio_ms"])
+            ],
+            "consultas_por_linea": [
+                {"plantilla": plantilla, "linea": linea, "consultas": datos["consultas"], "db_ms": round(datos["db_ms"], 2)}
+                for (plantilla, linea), datos in sorted(self.lineas.items(), key=lambda item: -item[1]["consultas"])
+            ],
+        }
+
+
+def _render_medido(self, context):
+    registro = registro_actual.get()
+    if registro is None:
+        return _render_original(self, context)
+    registro.entrar(nombre_plantilla(self))
+    try:
+        return _render_original(self, context)
+    finally:
+        registro.salir()
+
+
+def instalar() -> None:
+    """Envuelve ``Template._render``, por donde pasan el render principal, ``{% extends %}`` e ``{% include %}``.
+
+    Sin un ``RegistroPlantillas`` activo en ``registro_actual`` el costo es una lectura de ContextVar.
+    Se instala al crear el middleware y no en ``ready()`` porque el runner de pruebas reemplaza
+    ``Template._render`` al preparar el entorno.
+    """
+    global _render_original
+    if Template._render is not _render_medido:
+        _render_original = Template._render
+        Template._render = _render_medido
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import os
+import re
+import time
+import traceback
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+
+RE_CADENA = re.compile(r"'(?:[^']|'')*'")
+RE_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+RE_MARCADOR = re.compile(r"%s|\?")
+RE_LISTA_IN = re.compile(r"\bIN \((?:\?\s*,\s*)*\?\)")
+RE_ESPACIOS = re.compile(r"\s+")
+ARCHIVOS_PROPIOS = {os.path.abspath(__file__), os.path.join(os.path.dirname(os.path.abspath(__file__)), "middleware.py")}
+
+
+def huella_sql(sql: str) -> str:
+    """SQL sin literales ni marcadores, para agrupar las consultas que solo difieren en sus parámetros."""
+    sql = RE_CADENA.sub("?", sql)
+    sql = RE_NUMERO.sub("?", sql)
+    sql = RE_MARCADOR.sub("?", sql)
+    sql = RE_LISTA_IN.sub("IN (...)", sql)
+    return RE_ESPACIOS.sub(" ", sql).strip()
+
+
+def huellas_repetidas(sentencias) -> List[Tuple[int, str]]:
+    """``[(veces, huella)]`` de las huellas que aparecen más de una vez, de la más repetida a la menos."""
+    huellas = Counter()
+    for sql, veces in Counter(sentencias).items():
+        huellas[huella_sql(sql)] += veces
+    return [(veces, huella) for huella, veces in huellas.most_common() if veces > 1]
+
+
+@dataclass
+class CapturaLenta:
+    sql: str
+    parametros: object
+    duracion_ms: float
+    base_datos: str
+    pila: str
+
+
+def resumen_pila(limite: int = 8) -> str:
+    """Últimos marcos de la pila que pertenecen al proyecto, sin Django ni el propio middleware."""
+    raiz = str(settings.BASE_DIR)
+    marcos = [
+        marco
+        for marco in traceback.extract_stack()
+        if marco.filename.startswith(raiz)
+        and "site-packages" not in marco.filename
+        and os.path.abspath(marco.filename) not in ARCHIVOS_PROPIOS
+    ]
+    return "\n".join(f"{marco.filename[len(raiz) + 1:]}:{marco.lineno} en {marco.name}" for marco in marcos[-limite:])
+
+
+class RegistroSQL:
+    """``execute_wrapper`` que acumula las sentencias ejecutadas y su duración.
+
+    Guarda el SQL parametrizado tal cual; las huellas se calculan al final y una sola vez por
+    sentencia distinta, para no pagar las expresiones regulares en cada consulta. Las sentencias que
+    tardan al menos ``umbral_lenta_ms`` se guardan aparte, con su pila, en ``lentas``.
+    """
+
+    def __init__(self, max_sentencias: int = 1000, umbral_lenta_ms: Optional[float] = None, max_lentas: int = 10):
+        self.max_sentencias = max_sentencias
+        self.umbral_lenta_ms = umbral_lenta_ms
+        self.max_lentas = max_lentas
+        self.consultas = 0
+        self.duracion = 0.0
+        self.sentencias: List[Tuple[str, object, float]] = []
+        self.lentas: List[CapturaLenta] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            self.consultas += 1
+            self.duracion += duracion
+            if len(self.sentencias) < self.max_sentencias:
+                self.sentencias.append((sql, params, duracion))
+            if (
+                self.umbral_lenta_ms is not None
+                and duracion * 1000 >= self.umbral_lenta_ms
+                and len(self.lentas) < self.max_lentas
+                and not many
+            ):
+                self.lentas.append(
+                    CapturaLenta(sql, params, duracion * 1000, context["connection"].alias, resumen_pila())
+                )
+
+    @property
+    def duracion_ms(self) -> float:
+        return self.duracion * 1000
+
+    def repetidas(self) -> List[Tuple[int, str]]:
+        return huellas_repetidas(sql for sql, _params, _duracion in self.sentencias)
@@ -0,0 +1,411 @@
+from __future__ import annotations
+
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from asociaciones_app.models import ExpedienteCAIMUS
+from asociaciones_app.semillas import pdf_ficticio, sembrar_caimus
+from asociaciones_app.signals import pdf_generado
+
+from .metricas import LATENCIA, SOLICITUDES, TAREAS_PENDIENTES, RegistroMetricas
+from .lentas import explicar
+from .middleware import InstrumentacionSQLMiddleware, PerfiladorMiddleware
+from .models import ConsultaLenta, TrazaMemoria
+from .perfiles import directorio_perfiles, listar_perfiles, ruta_perfil
+from .sql import huella_sql, huellas_repetidas
+
+
+def vista_con_n_mas_uno(request):
+    for usuario in User.objects.all():
+        User.objects.filter(pk=usuario.pk).exists()
+    return HttpResponse("ok")
+
+
+class HuellaSQLTests(TestCase):
+    def test_agrupa_consultas_que_solo_cambian_parametros(self):
+        sentencias = [
+            'SELECT * FROM "auth_user" WHERE "id" = 1',
+            'SELECT *  FROM "auth_user" WHERE "id" = %s',
+            "SELECT * FROM \"anio\" WHERE \"nombre\" IN ('a', 'b') AND x = 'it''s'",
+        ]
+        self.assertEqual(huellas_repetidas(sentencias), [(2, 'SELECT * FROM "auth_user" WHERE "id" = ?')])
+        self.assertEqual(huella_sql(sentencias[2]), 'SELECT * FROM "anio" WHERE "nombre" IN (...) AND x = ?')
+
+
+@override_settings(MONITOREO_SQL_ACTIVO=True, MONITOREO_SQL_UMBRAL_CONSULTAS=5, MONITOREO_SQL_UMBRAL_MS=10_000)
+class InstrumentacionSQLTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create([User(username=f"usuario{numero}") for numero in range(6)])
+
+    def test_server_timing_y_log_por_request(self):
+        middleware = InstrumentacionSQLMiddleware(vista_con_n_mas_uno)
+        request = RequestFactory().get("/lista/")
+        request.user = User(is_staff=True)
+        with self.assertLogs("monitoreo.sql", level="INFO") as logs:
+            response = middleware(request)
+
+        self.assertIn('db;dur=', response["Server-Timing"])
+        self.assertIn('desc="7 consultas"', response["Server-Timing"])
+        datos = json.loads(logs.records[0].getMessage())
+        self.assertEqual(datos["consultas"], 7)
+        self.assertEqual(datos["repetidas"], 6)
+        self.assertEqual(datos["url"], "sin_resolver")
+
+    def test_muestra_con_sql_completo_al_superar_umbral(self):
+        middleware = InstrumentacionSQLMiddleware(vista_con_n_mas_uno)
+        with self.assertLogs("monitoreo.sql.muestras", level="WARNING") as logs:
+            middleware(RequestFactory().get("/lista/?pagina=2"))
+        muestra = json.loads(logs.records[0].getMessage())
+        self.assertEqual(muestra["ruta"], "/lista/?pagina=2")
+        self.assertEqual(len(muestra["sentencias"]), 7)
+        self.assertEqual(muestra["huellas_repetidas"][0]["veces"], 6)
+        # Solo huella y duración: los parámetros pueden traer sesiones, usuarios o hashes de contraseña.
+        self.assertEqual(set(muestra["sentencias"][1]), {"ms", "sql"})
+        self.assertEqual(muestra["sentencias"][1]["sql"], muestra["huellas_repetidas"][0]["sql"])
+        self.assertNotIn("usuario0", logs.records[0].getMessage())
+
+    def test_usa_nombre_de_url_resuelto(self):
+        self.client.get("/asociaciones/mis-asociaciones/")
+        with self.assertLogs("monitoreo.sql", level="INFO") as logs:
+            response = self.client.get("/asociaciones/mis-asociaciones/")
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(json.loads(logs.records[0].getMessage())["url"], "asociaciones:mis_asociaciones")
+
+    def test_server_timing_solo_en_debug_o_para_el_personal(self):
+        middleware = InstrumentacionSQLMiddleware(vista_con_n_mas_uno)
+        request = RequestFactory().get("/lista/")
+        request.user = User(is_staff=False)
+        with self.assertLogs("monitoreo.sql", level="INFO"):
+            self.assertNotIn("Server-Timing", middleware(request))
+        with self.settings(DEBUG=True), self.assertLogs("monitoreo.sql", level="INFO"):
+            self.assertIn("Server-Timing", middleware(request))
+
+    @override_settings(MONITOREO_SQL_ACTIVO=False)
+    def test_desactivado_no_se_instala(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            InstrumentacionSQLMiddleware(vista_con_n_mas_uno)
+
+
+class PerfiladorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.superusuario = User.objects.create_superuser("raiz", password="pass")
+        cls.usuario = User.objects.create_user("comun", password="pass")
+
+    def setUp(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        ajustes = override_settings(
+            MONITOREO_PERFIL_ACTIVO=True,
+            MONITOREO_PERFIL_DIR=directorio,
+            MONITOREO_PERFIL_MUESTREO=0.0,
+            MONITOREO_PERFIL_TOP=5,
+        )
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def request(self, usuario, ruta="/lista/?_perfilar=1", **extra):
+        request = RequestFactory().get(ruta, **extra)
+        request.user = usuario
+        return request
+
+    def test_superusuario_perfila_a_pedido(self):
+        response = PerfiladorMiddleware(vista_con_n_mas_uno)(self.request(self.superusuario))
+
+        nombre = response["X-Perfil"]
+        self.assertIsNotNone(ruta_perfil(nombre, ".prof"))
+        perfil = json.loads(ruta_perfil(nombre, ".json").read_text(encoding="utf-8"))
+        self.assertEqual(perfil["modo"], "demanda")
+        self.assertEqual(perfil["usuario"], "raiz")
+        self.assertEqual(len(perfil["resumen"]), 5)
+
+    def test_cabecera_tambien_activa_el_perfil(self):
+        request = self.request(self.superusuario, "/lista/", HTTP_X_PERFILAR="1")
+        response = PerfiladorMiddleware(vista_con_n_mas_uno)(request)
+        self.assertIn("X-Perfil", response)
+
+    def test_usuario_comun_no_puede_perfilar(self):
+        response = PerfiladorMiddleware(vista_con_n_mas_uno)(self.request(self.usuario))
+        self.assertNotIn("X-Perfil", response)
+        self.assertEqual(listar_perfiles(), [])
+
+    def test_muestreo_perfila_sin_pedirlo(self):
+        with override_settings(MONITOREO_PERFIL_MUESTREO=1.0):
+            response = PerfiladorMiddleware(vista_con_n_mas_uno)(self.request(self.usuario, "/lista/"))
+        self.assertNotIn("X-Perfil", response)
+        self.assertEqual([perfil["modo"] for perfil in listar_perfiles()], ["muestreo"])
+
+    def test_conserva_solo_los_mas_recientes(self):
+        middleware = PerfiladorMiddleware(vista_con_n_mas_uno)
+        with override_settings(MONITOREO_PERFIL_MAXIMO=2):
+            for _ in range(3):
+                middleware(self.request(self.superusuario))
+        self.assertEqual(len(list(directorio_perfiles().glob("*.prof"))), 2)
+
+    @override_settings(MONITOREO_PERFIL_ACTIVO=False)
+    def test_desactivado_por_defecto_no_se_instala(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            PerfiladorMiddleware(vista_con_n_mas_uno)
+
+    def test_paginas_solo_para_superusuarios(self):
+        nombre = PerfiladorMiddleware(vista_con_n_mas_uno)(self.request(self.superusuario))["X-Perfil"]
+
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get(reverse("monitoreo:perfiles_list")).status_code, 403)
+        self.assertEqual(self.client.get(reverse("monitoreo:perfil_descargar", args=[nombre])).status_code, 403)
+
+        self.client.force_login(self.superusuario)
+        response = self.client.get(reverse("monitoreo:perfiles_list"))
+        self.assertContains(response, nombre)
+        self.assertContains(self.client.get(reverse("monitoreo:perfil_detalle", args=[nombre])), "vista_con_n_mas_uno")
+        descarga = self.client.get(reverse("monitoreo:perfil_descargar", args=[nombre]))
+        self.assertEqual(descarga["Content-Disposition"], f'attachment; filename="{nombre}.prof"')
+        self.assertEqual(self.client.get(reverse("monitoreo:perfil_detalle", args=["..evil"])).status_code, 404)
+
+
+def valor_metrica(texto: str, serie: str) -> float:
+    for linea in texto.splitlines():
+        nombre, _, valor = linea.rpartition(" ")
+        if nombre == serie:
+            return float(valor)
+    raise AssertionError(f"No se encontró la serie {serie}")
+
+
+@override_settings(MONITOREO_METRICAS_ACTIVO=True)
+class MetricasTests(TestCase):
+    def setUp(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        ajustes = override_settings(MONITOREO_METRICAS_DIR=directorio)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def test_suma_las_metricas_de_todos_los_procesos(self):
+        proceso_a, proceso_b = RegistroMetricas(), RegistroMetricas()
+        for proceso, duraciones in ((proceso_a, [0.02, 0.3]), (proceso_b, [7.0])):
+            for duracion in duraciones:
+                proceso.incrementar(SOLICITUDES, {"url": "asociaciones:bandeja_revision", "metodo": "GET", "estado": 200})
+                proceso.observar(LATENCIA, {"url": "asociaciones:bandeja_revision"}, duracion)
+        proceso_b.guardar(forzar=True)
+
+        texto = proceso_a.exportar()
+        etiquetas = 'url="asociaciones:bandeja_revision"'
+        self.assertEqual(valor_metrica(texto, f'{SOLICITUDES}{{estado="200",metodo="GET",{etiquetas}}}'), 3)
+        self.assertEqual(valor_metrica(texto, f'{LATENCIA}_bucket{{{etiquetas},le="0.025"}}'), 1)
+        self.assertEqual(valor_metrica(texto, f'{LATENCIA}_bucket{{{etiquetas},le="0.5"}}'), 2)
+        self.assertEqual(valor_metrica(texto, f'{LATENCIA}_bucket{{{etiquetas},le="+Inf"}}'), 3)
+        self.assertEqual(valor_metrica(texto, f"{LATENCIA}_count{{{etiquetas}}}"), 3)
+        self.assertAlmostEqual(valor_metrica(texto, f"{LATENCIA}_sum{{{etiquetas}}}"), 7.32)
+        self.assertEqual(valor_metrica(texto, TAREAS_PENDIENTES), 0)
+        self.assertIn(f"# TYPE {LATENCIA} histogram", texto)
+
+    def test_endpoint_expone_requests_subidas_y_pdf(self):
+        self.client.get(reverse("asociaciones:mis_asociaciones"))
+        self.client.post(reverse("asociaciones:item_upload", args=[1, 1]), {"pdf": "x" * 2048})
+        pdf_generado.send(sender=None, documento="resolucion", motor="xhtml2pdf", duracion=0.4)
+
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        texto = response.content.decode()
+        self.assertGreaterEqual(
+            valor_metrica(texto, f'{SOLICITUDES}{{estado="302",metodo="GET",url="asociaciones:mis_asociaciones"}}'), 1
+        )
+        self.assertGreaterEqual(
+            valor_metrica(texto, 'caimus_subida_bytes_bucket{url="asociaciones:item_upload",le="10240"}'), 1
+        )
+        self.assertGreaterEqual(
+            valor_metrica(texto, 'caimus_pdf_duracion_segundos_count{documento="resolucion",motor="xhtml2pdf"}'), 1
+        )
+        self.assertIn('caimus_db_duracion_segundos_count{url="asociaciones:mis_asociaciones"}', texto)
+        self.assertNotIn('url="metricas"', texto)
+
+    def test_restringido_por_ip(self):
+        self.assertEqual(self.client.get("/metrics", REMOTE_ADDR="10.1.2.3").status_code, 403)
+        with override_settings(MONITOREO_METRICAS_IPS=["10.0.0.0/8"]):
+            self.assertEqual(self.client.get("/metrics", REMOTE_ADDR="10.1.2.3").status_code, 200)
+
+    def test_archivo_usa_el_pid_del_proceso_que_guarda(self):
+        proceso = RegistroMetricas()
+        proceso.incrementar(SOLICITUDES, {"url": "x", "metodo": "GET", "estado": 200})
+        with mock.patch("monitoreo_app.metricas.os.getpid", return_value=4242):
+            proceso.guardar(forzar=True)
+        archivos = [ruta.name for ruta in Path(settings.MONITOREO_METRICAS_DIR).glob("metricas-*.json")]
+        self.assertEqual(archivos, [f"metricas-4242-{proceso.sufijo}.json"])
+
+    def test_error_de_disco_se_registra_sin_propagar(self):
+        proceso = RegistroMetricas()
+        with mock.patch("monitoreo_app.metricas.os.replace", side_effect=PermissionError("sin permiso")):
+            with self.assertLogs("monitoreo_app.metricas", level="WARNING"):
+                proceso.guardar(forzar=True)
+
+    @override_settings(MONITOREO_METRICAS_ACTIVO=False)
+    def test_desactivado_no_expone_nada(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
+
+
+@override_settings(
+    MONITOREO_SQL_ACTIVO=True,
+    MONITOREO_CONSULTA_LENTA_MS=0,
+    MONITOREO_SQL_UMBRAL_CONSULTAS=1000,
+    CAIMUS_TAREAS_SINCRONAS=True,
+)
+class ConsultasLentasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create([User(username=f"usuario{numero}") for numero in range(3)])
+
+    def test_registra_consultas_sobre_el_umbral_con_plan_por_huella(self):
+        InstrumentacionSQLMiddleware(vista_con_n_mas_uno)(RequestFactory().get("/lista/"))
+
+        consultas = list(ConsultaLenta.objects.all())
+        self.assertEqual(len(consultas), 4)
+        self.assertEqual({consulta.vista for consulta in consultas}, {"sin_resolver"})
+        self.assertEqual(len({consulta.huella_hash for consulta in consultas}), 2)
+        con_plan = [consulta for consulta in consultas if consulta.plan]
+        self.assertEqual(len(con_plan), 2)
+        self.assertTrue(all("SCAN" in consulta.plan or "SEARCH" in consulta.plan for consulta in con_plan))
+        self.assertIn("monitoreo_app/tests.py", consultas[0].pila)
+        self.assertNotIn("middleware.py", consultas[0].pila)
+
+    def test_no_repite_el_plan_de_una_huella_reciente(self):
+        middleware = InstrumentacionSQLMiddleware(vista_con_n_mas_uno)
+        middleware(RequestFactory().get("/lista/"))
+        middleware(RequestFactory().get("/lista/"))
+        self.assertEqual(ConsultaLenta.objects.exclude(plan="").count(), 2)
+
+    def test_sin_umbral_no_registra(self):
+        with override_settings(MONITOREO_CONSULTA_LENTA_MS=None):
+            InstrumentacionSQLMiddleware(vista_con_n_mas_uno)(RequestFactory().get("/lista/"))
+        self.assertFalse(ConsultaLenta.objects.exists())
+
+    def test_plan_de_sentencia_invalida_no_rompe(self):
+        self.assertIn("No se pudo obtener el plan", explicar("SELECT * FROM tabla_inexistente", [], "default"))
+        self.assertTrue(User.objects.exists())
+
+    def test_plan_no_ejecuta_la_sentencia(self):
+        self.assertTrue(explicar('DELETE FROM "auth_user" WHERE "username" = %s', ["usuario0"], "default"))
+        self.assertTrue(User.objects.filter(username="usuario0").exists())
+
+    def test_admin_agrupa_por_huella(self):
+        InstrumentacionSQLMiddleware(vista_con_n_mas_uno)(RequestFactory().get("/lista/"))
+        self.client.force_login(User.objects.create_superuser("raiz", password="pass"))
+
+        response = self.client.get(reverse("admin:monitoreo_app_consultalenta_huellas"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["huellas"]), 2)
+        self.assertEqual(response.context["huellas"][0]["veces"], 3)
+        consulta = ConsultaLenta.objects.first()
+        response = self.client.get(
+            reverse("admin:monitoreo_app_consultalenta_changelist"), {"huella_hash": consulta.huella_hash}
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(MONITOREO_SQL_ACTIVO=True, MONITOREO_PLANTILLAS_ACTIVO=True, MONITOREO_SQL_UMBRAL_CONSULTAS=0)
+class PlantillasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        sembrar_caimus(asociaciones_por_anio=1, anio_inicial=2030)
+        cls.admin = User.objects.create_user("revisor", password="pass", is_staff=True)
+        cls.admin.groups.add(Group.objects.get_or_create(name="Administrador")[0])
+
+    def test_atribuye_consultas_a_la_linea_de_plantilla(self):
+        expediente = ExpedienteCAIMUS.objects.get()
+        self.client.force_login(self.admin)
+        with self.assertLogs("monitoreo.sql.muestras", level="WARNING") as logs:
+            response = self.client.get(reverse("asociaciones:expediente_caimus", args=[expediente.asociacion_id]))
+
+        self.assertIn("tpl;dur=", response["Server-Timing"])
+        muestra = json.loads(logs.records[0].getMessage())
+        plantillas = {fila["plantilla"]: fila for fila in muestra["plantillas"]}
+        self.assertEqual(plantillas["asociaciones_app/expediente_caimus_form.html"]["renders"], 1)
+        self.assertEqual(plantillas["almacen/base.html"]["renders"], 1)
+        self.assertGreater(muestra["plantillas_ms"], 0)
+
+        fuente = Path(__file__).resolve().parent.parent / "asociaciones_app/templates/asociaciones_app/expediente_caimus_form.html"
+        linea_historial = next(
+            numero
+            for numero, texto in enumerate(fuente.read_text(encoding="utf-8").splitlines(), start=1)
+            if "for historial in historial_estados" in texto
+        )
+        lineas = {(fila["plantilla"], fila["linea"]): fila for fila in muestra["consultas_por_linea"]}
+        self.assertEqual(lineas[("asociaciones_app/expediente_caimus_form.html", linea_historial)]["consultas"], 1)
+        self.assertEqual(
+            sum(fila["consultas"] for fila in muestra["consultas_por_linea"]),
+            sum(fila["consultas"] for fila in muestra["plantillas"]),
+        )
+
+    @override_settings(MONITOREO_PLANTILLAS_ACTIVO=False)
+    def test_desactivado_no_mide_plantillas(self):
+        self.client.force_login(self.admin)
+        with self.assertLogs("monitoreo.sql", level="INFO") as logs:
+            response = self.client.get(reverse("asociaciones:bandeja_revision"))
+        self.assertNotIn("tpl;", response["Server-Timing"])
+        self.assertNotIn("plantillas_ms", json.loads(logs.records[0].getMessage()))
+
+
+@override_settings(MONITOREO_MEMORIA_ACTIVO=True, CAIMUS_TAREAS_SINCRONAS=True)
+class TrazadorMemoriaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        sembrar_caimus(asociaciones_por_anio=1, anio_inicial=2030)
+        cls.expediente = ExpedienteCAIMUS.objects.select_related("asociacion").get()
+        cls.usuario = cls.expediente.asociacion.usuarios.get().usuario
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def subir(self, tamano):
+        self.client.force_login(self.usuario)
+        item = self.expediente.items.first()
+        archivo = SimpleUploadedFile("documento.pdf", pdf_ficticio(tamano), content_type="application/pdf")
+        return self.client.post(reverse("asociaciones:item_upload", args=[self.expediente.pk, item.pk]), {"pdf": archivo})
+
+    def test_traza_subida_con_pico_y_sitios(self):
+        self.subir(1024 * 1024)
+
+        traza = TrazaMemoria.objects.get()
+        self.assertEqual(traza.vista, "asociaciones:item_upload")
+        self.assertGreater(traza.bytes_peticion, 1024 * 1024)
+        self.assertGreater(traza.pico_kb, 0)
+        self.assertLess(traza.pico_kb, settings.MONITOREO_MEMORIA_TECHOS_KB["asociaciones:item_upload"])
+        self.assertTrue(traza.sitios)
+        self.assertEqual(set(traza.sitios[0]), {"sitio", "kb", "bloques"})
+
+    def test_no_traza_otras_vistas(self):
+        self.client.force_login(self.usuario)
+        self.client.get(reverse("asociaciones:mis_asociaciones"))
+        self.assertFalse(TrazaMemoria.objects.exists())
+
+    def test_reporte_agrega_por_vista_y_verifica_techos(self):
+        self.subir(200 * 1024)
+        self.subir(200 * 1024)
+
+        salida = StringIO()
+        call_command("reporte_memoria", "--json", stdout=salida)
+        resumen = json.loads(salida.getvalue())
+        self.assertEqual(resumen["asociaciones:item_upload"]["requests"], 2)
+        self.assertTrue(resumen["asociaciones:item_upload"]["sitios"])
+
+        with override_settings(MONITOREO_MEMORIA_TECHOS_KB={"asociaciones:item_upload": 0.001}):
+            with self.assertRaises(CommandError):
+                call_command("reporte_memoria", "--estricto", stdout=StringIO())
@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import views
+
+app_name = "monitoreo"
+
+urlpatterns = [
+    path("perfiles/", views.perfiles_list, name="perfiles_list"),
+    path("perfiles/<str:nombre>/", views.perfil_detalle, name="perfil_detalle"),
+    path("perfiles/<str:nombre>/descargar/", views.perfil_descargar, name="perfil_descargar"),
+]
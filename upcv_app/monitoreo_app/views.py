@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import ipaddress
+from functools import wraps
+
+from django.conf import settings
+
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404, HttpResponse
+from django.shortcuts import render
+
+from .metricas import registro as registro_metricas
+from .perfiles import leer_perfil, listar_perfiles, ruta_perfil
+
+
+def superusuario_required(view_func):
+    @login_required
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        if not request.user.is_superuser:
+            raise PermissionDenied
+        return view_func(request, *args, **kwargs)
+
+    return _wrapped
+
+
+def ip_permitida(ip: str, redes) -> bool:
+    try:
+        direccion = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(direccion in ipaddress.ip_network(red, strict=False) for red in redes)
+
+
+def metricas(request):
+    """Métricas en formato de Prometheus, solo para las IP de ``MONITOREO_METRICAS_IPS``."""
+    if not getattr(settings, "MONITOREO_METRICAS_ACTIVO", False):
+        raise Http404
+    if not ip_permitida(request.META.get("REMOTE_ADDR", ""), getattr(settings, "MONITOREO_METRICAS_IPS", ())):
+        raise PermissionDenied
+    return HttpResponse(registro_metricas.exportar(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@superusuario_required
+def perfiles_list(request):
+    return render(request, "monitoreo_app/perfiles_list.html", {"perfiles": listar_perfiles()})
+
+
+@superusuario_required
+def perfil_detalle(request, nombre):
+    perfil = leer_perfil(nombre)
+    if perfil is None:
+        raise Http404("Perfil no encontrado.")
+    return render(request, "monitoreo_app/perfil_detalle.html", {"perfil": perfil})
+
+
+@superusuario_required
+def perfil_descargar(request, nombre):
+    ruta = ruta_perfil(nombre, ".prof")
+    if ruta is None:
+        raise Http404("Perfil no encontrado.")
+    return FileResponse(ruta.open("rb"), as_attachment=True, filename=ruta.name)
@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 import os
+import sys
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -26,6 +28,9 @@ SECRET_KEY = 'django-insecure-av1$b$x&1_-3naz=js=74&=(s&5ph00m4t1_c&9190ar3cm%ok
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+# `manage.py test`: los archivos que escribe el sitio (logs, métricas, caché) van a un directorio temporal
+TESTING = sys.argv[1:2] == ['test']
+
 ALLOWED_HOSTS = ['192.168.93.114', 'localhost', '127.0.0.1', '181.174.112.19',]
 
 
@@ -41,15 +46,20 @@ INSTALLED_APPS = [
     
     'almacen_app.apps.AlmacenAppConfig',  # ✅ solo esta línea
     'asociaciones_app.apps.AsociacionesAppConfig',
+    'monitoreo_app.apps.MonitoreoAppConfig',
 ]
 
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'monitoreo_app.middleware.MetricasMiddleware',
+    'monitoreo_app.middleware.InstrumentacionSQLMiddleware',
+    'monitoreo_app.middleware.TrazadorMemoriaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'monitoreo_app.middleware.PerfiladorMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -100,6 +110,22 @@ DATABASES = {
     }
 }
 
+# Caché. 'reportes' debe ser compartida entre los procesos de IIS: los reportes en caché (matriz de
+# cumplimiento) se invalidan con una generación por año que todos los procesos tienen que ver.
+# FileBasedCache no tiene operaciones atómicas entre procesos (incr es un get + set), por eso la
+# generación no se incrementa: cada invalidación escribe un valor nuevo (el reloj en nanosegundos) y
+# dos invalidaciones simultáneas solo pueden pisarse entre sí, nunca volver a un valor anterior.
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'reportes': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'reportes',
+        'OPTIONS': {'MAX_ENTRIES': 2000},
+    },
+}
+if TESTING:
+    CACHES['reportes'] = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'reportes'}
+
 
 
 # Password validation
@@ -157,6 +183,24 @@ STATICFILES_DIRS = [BASE_DIR / 'static']  # Asegúrate de tener una carpeta 'sta
 # En producción, `collectstatic` moverá los archivos estáticos a esta carpeta
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# `collectstatic` solo publica los archivos referenciados desde las plantillas (y lo que
+# importan sus hojas de estilo), con huella en el nombre y copias .gz/.br.
+# Ejecutar `python manage.py collectstatic --clear` para podar lo que ya no se usa.
+STATICFILES_FINDERS = ['almacen_app.estaticos.ReferenciadosFinder']
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'almacen_app.estaticos.EstaticosComprimidosStorage'},
+}
+# Patrones adicionales a publicar siempre: archivos que no aparecen en ningún `{% static %}`.
+# - assets/json: idioma y datos de ejemplo que carga datatable.custom.js por AJAX.
+# - icon-sprite.svg: varias plantillas lo enlazan con `href="../assets/svg/..."` sin `{% static %}`.
+ESTATICOS_INCLUIR_SIEMPRE = [
+    'assets/json/*.json',
+    'assets/svg/icon-sprite.svg',
+]
+# Sirve STATIC_ROOT desde Django cuando no hay un proxy (IIS/nginx) delante
+ESTATICOS_SERVIR_EN_PROCESO = True
+
 # Configuración para manejar archivos de medios
 MEDIA_URL = '/media/'  # La URL pública donde los archivos de medios serán accesibles
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')  # El directorio donde se almacenan los archivos subidos
@@ -175,3 +219,78 @@ EMAIL_HOST_USER = 'informatica@upcv.gob.gt'
 EMAIL_HOST_PASSWORD = 'xtdj nvwz ymyw lqyr'  
 
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+
+
+# Monitoreo: consultas y tiempo de base de datos por request (Server-Timing + log JSON)
+MONITOREO_SQL_ACTIVO = True
+# Umbrales a partir de los cuales se guarda la request con todo su SQL en logs/sql_muestras.log
+MONITOREO_SQL_UMBRAL_CONSULTAS = 50
+MONITOREO_SQL_UMBRAL_MS = 500
+MONITOREO_SQL_MUESTREO = 1.0  # fracción de las requests sobre el umbral que se guardan
+# Sentencias que tardan al menos este tiempo se guardan como ConsultaLenta, con su plan (None desactiva)
+MONITOREO_CONSULTA_LENTA_MS = 200
+MONITOREO_CONSULTA_LENTA_PLAN_CADA_MIN = 60  # minutos entre planes de una misma huella
+# Tiempo de render por plantilla e include, y consultas atribuidas a la línea de plantilla que las dispara.
+# Envuelve cada nodo de plantilla y recorre la pila por consulta: activarlo solo para investigar.
+MONITOREO_PLANTILLAS_ACTIVO = False
+
+# Perfilado con cProfile: un superusuario agrega ?_perfilar=1 (o la cabecera X-Perfilar) a la URL.
+# Los perfiles se consultan en /monitoreo/perfiles/. Desactivado por defecto.
+MONITOREO_PERFIL_ACTIVO = False
+MONITOREO_PERFIL_PARAMETRO = '_perfilar'
+MONITOREO_PERFIL_MUESTREO = 0.0  # fracción de todas las requests que se perfilan sin pedirlo
+MONITOREO_PERFIL_DIR = BASE_DIR / 'perfiles'
+MONITOREO_PERFIL_TOP = 40  # funciones que se muestran en el resumen
+MONITOREO_PERFIL_MAXIMO = 200  # perfiles que se conservan; los más antiguos se borran
+
+# Métricas en formato de Prometheus en /metrics. Cada proceso guarda las suyas en MONITOREO_METRICAS_DIR
+# (debe ser el mismo directorio para todos los procesos del sitio) y /metrics las suma.
+MONITOREO_METRICAS_ACTIVO = True
+MONITOREO_METRICAS_DIR = Path(tempfile.mkdtemp(prefix='upcv-metricas-')) if TESTING else BASE_DIR / 'metricas'
+MONITOREO_METRICAS_IPS = ['127.0.0.1', '::1']  # IP o redes (CIDR) que pueden leer /metrics
+MONITOREO_METRICAS_INTERVALO = 5  # segundos entre escrituras del archivo de cada proceso
+MONITOREO_METRICAS_VIGENCIA = 300  # segundos tras los que se ignoran los indicadores de un proceso inactivo
+MONITOREO_METRICAS_RETENCION_DIAS = 7  # archivos de procesos inactivos que se borran
+MONITOREO_METRICAS_SUBIDAS = ['asociaciones:item_upload', 'asociaciones:informe_upload']
+
+# Trazado de memoria con tracemalloc de subidas y PDF (python manage.py reporte_memoria). Desactivado por defecto.
+MONITOREO_MEMORIA_ACTIVO = False
+MONITOREO_MEMORIA_URLS = ['asociaciones:item_upload', 'asociaciones:informe_upload', 'asociaciones:resolucion_pdf']
+MONITOREO_MEMORIA_MARCOS = 1  # marcos de pila por asignación; más marcos, más costo
+MONITOREO_MEMORIA_TOP = 10  # sitios de asignación que se guardan por request
+# Pico máximo aceptable por vista; lo usan reporte_memoria y benchmark_resolucion_pdf
+MONITOREO_MEMORIA_TECHOS_KB = {
+    'asociaciones:item_upload': 8 * 1024,
+    'asociaciones:informe_upload': 8 * 1024,
+    'asociaciones:resolucion_pdf': 64 * 1024,
+}
+
+LOGS_DIR = Path(tempfile.mkdtemp(prefix='upcv-logs-')) if TESTING else BASE_DIR / 'logs'
+os.makedirs(LOGS_DIR, exist_ok=True)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'solicitudes': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': LOGS_DIR / 'solicitudes.log',
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            'delay': True,
+        },
+        'sql_muestras': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': LOGS_DIR / 'sql_muestras.log',
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'monitoreo.sql': {'handlers': ['solicitudes'], 'level': 'INFO', 'propagate': False},
+        'monitoreo.sql.muestras': {'handlers': ['sql_muestras'], 'level': 'WARNING', 'propagate': False},
+    },
+}
@@ -1,16 +1,26 @@
 from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf.urls.static import static
 from django.contrib.auth import views as auth_views
 
+from almacen_app.estaticos import servir_estatico
+from monitoreo_app.views import metricas
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('almacen/', include('almacen_app.urls')),  # Incluye las URLs de tu aplicación
     path('', include('almacen_app.urls')),  # Esto redirige la raíz al signin o vista principal
     path('asociaciones/', include('asociaciones_app.urls')),
+    path('monitoreo/', include('monitoreo_app.urls')),
+    path('metrics', metricas, name='metricas'),
     path('password_reset/', auth_views.PasswordResetView.as_view(template_name='registration/password_reset_form.html'), name='password_reset'),
     path('password_reset/done/', auth_views.PasswordResetDoneView.as_view(template_name='registration/password_reset_done.html'), name='password_reset_done'),
     path('reset/<uidb64>/<token>/', auth_views.PasswordResetConfirmView.as_view(template_name='registration/password_reset_confirm.html'), name='password_reset_confirm'),
     path('reset/done/', auth_views.PasswordResetCompleteView.as_view(template_name='registration/password_reset_complete.html'), name='password_reset_complete'),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT) + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+if settings.ESTATICOS_SERVIR_EN_PROCESO:
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'), servir_estatico),
+    ]